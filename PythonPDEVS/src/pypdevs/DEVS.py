@@ -19,6 +19,7 @@ Classes and tools for DEVS model specification
 
 from pypdevs.logger import debug, warn, info, error
 from pypdevs.util import *
+from pypdevs.statesavers import TransitionRecord
 import pypdevs.accurate_time as time
 
 class BaseDEVS(object):
@@ -227,6 +228,11 @@ class AtomicDEVS(BaseDEVS):
         self.state = None
         self.relocatable = True
         self.last_read_time = (0, 0)
+        # Infrequent state saving: the state is saved every state_interval transitions
+        self.state_interval = 1
+        self.unsaved_transitions = 0
+        # Conservative simulation: minimal delay between an input and the resulting output, None to use the default of the simulator
+        self.lookahead = None
 
     def setLocation(self, location, force=False):
         """
@@ -275,14 +281,31 @@ class AtomicDEVS(BaseDEVS):
         if self.old_states == []:
             # We have no memory, so we are normally in sequential simulation
             self.old_states = []
-        elif copy is None:
-            self.old_states = [self.old_states[-1]]
         else:
+            if copy is None:
+                copy = len(self.old_states) - 1
+            # Recorded transitions are replayed from the last saved state before them, so keep that state too
+            while copy > 0 and isinstance(self.old_states[copy], TransitionRecord):
+                copy -= 1
             self.old_states = self.old_states[copy:]
+        if self.old_states and hasattr(self.old_states[0], "compact"):
+            # States saved as changes to the states before them, which are now fossil collected
+            self.old_states[0].compact()
         if last_state_only:
             activity = self.old_states[0].activity
         activities[self.model_id] = activity
 
+    def loadSavedState(self, saved):
+        """
+        Load a state saved for this model, recorded transitions are replayed on a copy of the model
+
+        :param saved: the saved state (or transition record)
+        :returns: state -- the saved state
+        """
+        if isinstance(saved, TransitionRecord):
+            return saved.loadState(self)
+        return saved.loadState()
+
     def revert(self, time, memorize):
         """
         Revert the model to the specified time. All necessary cleanup for this
@@ -301,11 +324,18 @@ class AtomicDEVS(BaseDEVS):
         self.time_last = state.time_last
         self.time_next = state.time_next
 
-        self.state = state.loadState()
+        self.state = self.loadSavedState(state)
         if memorize:
             # Reverse it too
             self.memo = self.old_states[:-len(self.old_states) + new_state - 1:-1]
         self.old_states = self.old_states[:new_state + 1]
+        # Save the state more frequently after a rollback, so the next one replays less transitions
+        self.state_interval = max(1, self.state_interval // 2)
+        self.unsaved_transitions = 0
+        for state in reversed(self.old_states):
+            if not isinstance(state, TransitionRecord):
+                break
+            self.unsaved_transitions += 1
 
         # Check if one of the reverted states was ever read for the termination condition
         if self.last_read_time > time:
@@ -335,7 +365,7 @@ class AtomicDEVS(BaseDEVS):
         while 1:
             for state in self.old_states:
                 if state.time_last > request_time:
-                    return state.loadState()
+                    return self.loadSavedState(state)
             # State not yet available... wait some time before trying again...
             time.sleep(0.01)
 
@@ -743,12 +773,16 @@ class RootDEVS(BaseDEVS):
 
         :param ports: the ports that have changed.
         """
-        # Find all changed ports and redo their direct connection
-        worklist = list(ports)
-        for outport in worklist:
-            worklist.extend(outport.inline)
-        
-        for p in set(worklist):
+        # Find all changed ports and the ports connected to them (transitively), each of them only once
+        affected = set(ports)
+        worklist = list(affected)
+        for port in worklist:
+            for inline in port.inline:
+                if inline not in affected:
+                    affected.add(inline)
+                    worklist.append(inline)
+
+        for p in worklist:
             directConnectPort(p, self.listeners)
 
     def directConnect(self):
@@ -852,6 +886,17 @@ class Port(object):
     def __repr__(self):
         return "%s (%s)" % (self.type(), self.getPortFullName())
 
+    def __getstate__(self):
+        """
+        For pickling, leaves out the routing table: it refers to the destination models directly, which makes pickling
+        recurse too deep for large models. It is rebuilt from the routing_outline when needed, see *routingTable*.
+
+        :returns: dict -- the state of the port
+        """
+        state = dict(self.__dict__)
+        state.pop("routing_table", None)
+        return state
+
     def getPortName(self):
         """
         Returns the name of the port
@@ -903,6 +948,7 @@ def directConnect(component_set, listeners):
     Perform direct connection on this CoupledDEVS model
 
     :param component_set: the iterable to direct connect
+    :param listeners: the listeners that exist, on any port
     :returns: the direct connected component_set
     """
     new_list = []
@@ -915,82 +961,57 @@ def directConnect(component_set, listeners):
     component_set = new_list
 
     # All and only all atomic models are now direct children of this model
-    listener_keys = set(listeners.keys())
     for i in component_set:
         # Remap the output ports
         for outport in i.OPorts:
-            # The new contents of the line
-            outport.routing_outline = []
-            worklist = [(p, outport.z_functions.get(p, None)) 
-                        for p in outport.outline]
-            for outline, z in worklist:
-                if outline in listener_keys:
-                    # This port is being listened on, so just add it as a fake model
-                    fake_port = Port(is_input=False,name="Fake")
-                    fake_port.host_DEVS = ExternalWrapper(listeners[outline])
-                    outport.routing_outline.append((fake_port, z))
-                # If it is a coupled model, we must expand this model
-                if isinstance(outline.host_DEVS, CoupledDEVS):
-                    for inline in outline.outline:
-                        # Add it to the current iterating list, so we can just continue
-                        entry = (inline, appendZ(z, outline.z_functions[inline]))
-                        worklist.append(entry)
-                        # If it is a Coupled model, we should just continue 
-                        # expanding it and not add it to the finished line
-                        if not isinstance(inline.host_DEVS, CoupledDEVS):
-                            entry = (inline, appendZ(z, outline.z_functions[inline]))
-                            outport.routing_outline.append(entry)
-                else:
-                    for ol, z in outport.routing_outline:
-                        if ol == outline:
-                            break
-                    else:
-                        # Add to the new line if it isn't already there
-                        # Note that it isn't really mandatory to check for this, 
-                        # it is a lot cleaner to do so.
-                        # This will greatly increase the complexity of the connector though
-                        outport.routing_outline.append((outline, z))
+            directConnectPort(outport, listeners)
     return component_set
 
 def directConnectPort(outport, listeners):
     """
     Perform direct connection on a single port.
 
-    :param outpurt: the port to reconnect
+    :param outport: the port to reconnect
     :param listeners: the listeners that exist, potentially on this port
     :returns: None
     """
-
     # The new contents of the line
-    outport.routing_outline = []
+    routing_outline = []
+    # Ports that are already in the line, ports are hashed on their identity
+    routed = set()
     worklist = [(p, outport.z_functions.get(p, None)) 
                 for p in outport.outline]
-    listener_keys = set(listeners.keys())
     for outline, z in worklist:
-        if outline in listener_keys:
+        if outline in listeners:
             # This port is being listened on, so just add it as a fake model
             fake_port = Port(is_input=False,name="Fake")
             fake_port.host_DEVS = ExternalWrapper(listeners[outline])
-            outport.routing_outline.append((fake_port, z))
+            routing_outline.append((fake_port, z))
 
         # If it is a coupled model, we must expand this model
         if isinstance(outline.host_DEVS, CoupledDEVS):
+            z_functions = outline.z_functions
             for inline in outline.outline:
                 # Add it to the current iterating list, so we can just continue
-                entry = (inline, appendZ(z, outline.z_functions.get(inline, None)))
+                entry = (inline, appendZ(z, z_functions.get(inline, None)))
                 worklist.append(entry)
                 # If it is a Coupled model, we should just continue 
                 # expanding it and not add it to the finished line
                 if not isinstance(inline.host_DEVS, CoupledDEVS):
-                    entry = (inline, appendZ(z, outline.z_functions.get(inline, None)))
-                    outport.routing_outline.append(entry)
-        else:
-            for ol, z in outport.routing_outline:
-                if ol == outline:
-                    break
-            else:
-                # Add to the new line if it isn't already there
-                # Note that it isn't really mandatory to check for this, 
-                # it is a lot cleaner to do so.
-                # This will greatly increase the complexity of the connector though
-                outport.routing_outline.append((outline, z))
+                    routing_outline.append(entry)
+                    routed.add(inline)
+        elif outline not in routed:
+            # Add to the new line if it isn't already there
+            routing_outline.append((outline, z))
+            routed.add(outline)
+    outport.routing_outline = routing_outline
+    outport.routing_table = routingTable(outport)
+
+def routingTable(outport):
+    """
+    Precompile the routing of an output port after direct connection, used for output routing by the solver.
+
+    :param outport: the (direct connected) output port
+    :returns: tuple -- the input port, its model and the z-function of every entry in the routing_outline of the port
+    """
+    return tuple((inport, inport.host_DEVS, z) for inport, z in outport.routing_outline)
@@ -21,7 +21,7 @@ from pypdevs.solver import Solver
 from pypdevs.util import *
 from pypdevs.messageScheduler import MessageScheduler
 from pypdevs.message import NetworkMessage
-from pypdevs.DEVS import RootDEVS, CoupledDEVS, AtomicDEVS
+from pypdevs.DEVS import RootDEVS, CoupledDEVS, AtomicDEVS, routingTable
 from pypdevs.statesavers import *
 import threading
 from pypdevs.logger import *
@@ -69,6 +69,7 @@ class BaseSimulator(Solver):
         self.use_DSDEVS = False
         self.activity_tracking = False
         self.memoization = False
+        self.conservative = False
         self.total_activities = defaultdict(float)
         self.msg_sent = 0
         self.msg_recv = 0
@@ -489,7 +490,10 @@ class BaseSimulator(Solver):
                 accumulating_vector = {}
             if finished:
                 from math import floor
-                gvt = floor(min(m_clock, m_send))
+                gvt = min(m_clock, m_send)
+                # Python 3 can't floor infinity to an integer
+                if gvt != float('inf'):
+                    gvt = floor(gvt)
                 print("Got GVT")
                 if gvt < self.gvt:
                     raise DEVSException("GVT is decreasing")
@@ -608,7 +612,10 @@ class BaseSimulator(Solver):
             self.activities = {}
             self.model.setGVT(gvt, self.activities, last_state_only)
             addDict(self.total_activities, self.activities)
-            if self.temporary_irreversible:
+            if self.state_memory_budget is not None:
+                self.saved_states = sum([len(model.old_states) for model in self.model.component_set])
+                self.early_gvt_requested = False
+            if self.temporary_irreversible and not self.conservative:
                 #print("Setting new state for %s models" % len(self.model.component_set))
                 for model in self.model.component_set:
                     activity = self.total_activities[model.model_id]
@@ -732,6 +739,12 @@ class BaseSimulator(Solver):
         # Assume we have the simlock
         self.notifySend(remote_location, msg.timestamp[0], msg.color)
 
+        if self.conservative:
+            # Never cancelled, so no need to save the message
+            self.sent_to[remote_location] += 1
+            self.getProxy(remote_location).receive(msg)
+            return
+
         # The message should be saved, though it should not be a copy. This is because the middleware will make
         # a copy itself, making this old message unused. Furthermore, the receiver will always create a copy
         # of the message to be safe, making a copy at the source unnecessary
@@ -752,6 +765,9 @@ class BaseSimulator(Solver):
         # NOTE no need for locking, as all methods of a deque object is atomic
         self.inqueue.append(msg)
         self.should_run.set()
+        if self.conservative:
+            # A promise might have been waiting for this message
+            self.promise_event.set()
 
     def processIncommingMessages(self):
         """
@@ -775,6 +791,12 @@ class BaseSimulator(Solver):
             #assert debug("Processing external msg: " + str(msg))
             model = self.model_ids[dest_model]
             msg.content = {model.ports[e]: msg.content[e] for e in msg.content}
+            if self.conservative:
+                # The UUID starts with the name of the sending kernel
+                self.received_from[int(msg.uuid.split("-", 1)[0])] += 1
+                if msg.timestamp <= self.prevtime:
+                    raise DEVSException("Message at time %s arrived after simulating up to %s, the lookahead of the models was violated" 
+                                        % (msg.timestamp, self.prevtime))
             if msg.timestamp <= self.prevtime:
                 # Timestamp is before the prevtime
                 # so set the prevtime back in the past
@@ -835,6 +857,133 @@ class BaseSimulator(Solver):
                 if self.priorcount == 0:
                     self.priorevent.set()
 
+    def setupConservative(self, lookahead):
+        """
+        Prepare this kernel for conservative simulation: find the kernels it exchanges messages with, and its lookahead.
+
+        In conservative simulation, every kernel promises the kernels it sends messages to that it will not send them a message with a timestamp up to some time.
+        A kernel only generates output at a time if no message before that time can still arrive, and only transitions if no message at that time can still arrive,
+        so states never have to be saved and no rollbacks happen. This requires a lookahead: a model that receives an input at time t will not cause a message
+        to another kernel before time t + lookahead.
+
+        :param lookahead: lookahead of the models that don't define their own, or None for optimistic (time warp) simulation
+        """
+        self.default_lookahead = lookahead
+        self.conservative = lookahead is not None and self.kernels > 1
+        if not self.conservative:
+            return
+        self.in_kernels = set()
+        self.out_kernels = set()
+        lookaheads = []
+        for model in self.model_ids:
+            for port in model.OPorts:
+                # Not the routing_table attribute, which is not pickled with the model
+                for _, destination, _ in routingTable(port):
+                    if model.location == self.name and destination.location != self.name:
+                        self.out_kernels.add(destination.location)
+                    elif model.location != self.name and destination.location == self.name:
+                        self.in_kernels.add(model.location)
+                        lookaheads.append(lookahead if destination.lookahead is None else destination.lookahead)
+        # Only the models that receive messages from other kernels can cause a delay
+        self.lookahead = min(lookaheads) if lookaheads else float('inf')
+        if self.lookahead <= EPSILON:
+            raise DEVSException("Conservative simulation requires a positive lookahead")
+        # Last promise sent, and the promises received from every kernel (no message is sent before time 0)
+        self.promise = (-float('inf'), 0)
+        self.promises = {kernel: (0.0, 0) for kernel in self.in_kernels}
+        self.promise_queues = {kernel: [] for kernel in self.in_kernels}
+        self.pending_promises = deque()
+        self.promise_event = threading.Event()
+        self.sent_to = defaultdict(int)
+        self.received_from = defaultdict(int)
+        self.updateEIT()
+        # Never rolled back, so don't save any states
+        self.temporary_irreversible = True
+
+    def conservativeClock(self):
+        """
+        Get the time of the next transition of this kernel, taking into account external messages, without processing them.
+
+        :returns: timestamp of the next transition
+        """
+        tn = self.model.time_next
+        try:
+            tn = min(tn, self.input_scheduler.readFirst().timestamp)
+        except IndexError:
+            # No input messages
+            pass
+        return (round(tn[0], 6), tn[1])
+
+    def receivePromise(self, source, sent, promise):
+        """
+        Receive the promise of a kernel that it will not send messages with a timestamp up to the promised time.
+
+        :param source: the kernel that made the promise
+        :param sent: the number of messages the kernel sent to us before the promise, the promise is only valid after receiving all of them
+        :param promise: the promised time
+        """
+        self.pending_promises.append((source, sent, promise))
+        self.promise_event.set()
+        self.should_run.set()
+
+    def updateEIT(self):
+        """
+        Update the earliest input time of this kernel with the received promises of which all preceding messages were received.
+        No message will be received with a timestamp up to the earliest input time.
+        """
+        while self.pending_promises:
+            source, sent, promise = self.pending_promises.popleft()
+            self.promise_queues[source].append((sent, promise))
+        for source, queue in self.promise_queues.items():
+            if queue:
+                received = self.received_from[source]
+                for sent, promise in queue:
+                    if sent <= received and promise > self.promises[source]:
+                        self.promises[source] = promise
+                self.promise_queues[source] = [entry for entry in queue if entry[0] > received]
+        self.eit = min(self.promises.values()) if self.promises else (float('inf'), float('inf'))
+
+    def sendPromise(self, promise):
+        """
+        Promise the kernels we send messages to that we will not send them a message with a timestamp up to the promised time.
+
+        :param promise: the time up to which no messages are sent by the models, limited further by the lookahead
+        """
+        self.updateEIT()
+        # Messages that will still be received cause messages after the lookahead, up to the rounding of timestamps
+        promise = min(promise, 
+                      (self.eit[0] + self.lookahead - EPSILON, 0), 
+                      (self.termination_time[0], float('inf')))
+        if promise > self.promise:
+            self.promise = promise
+            for kernel in self.out_kernels:
+                self.getProxy(kernel).receivePromise(self.name, 
+                                                     self.sent_to[kernel], 
+                                                     promise)
+
+    def waitForPromises(self, time, promise):
+        """
+        Wait until no message with a timestamp up to the provided time can still be received. The simlock is released while waiting.
+
+        :param time: the time up to which all messages should be received
+        :param promise: the promise to make to the other kernels while waiting
+        :returns: bool -- whether or not it was necessary to wait
+        """
+        waited = False
+        while 1:
+            self.sendPromise(promise)
+            if self.eit >= time:
+                return waited
+            waited = True
+            # Not finished as long as we are waiting, see finishRing
+            self.should_run.set()
+            self.simlock.release()
+            self.promise_event.wait()
+            self.promise_event.clear()
+            self.simlock.acquire()
+            with self.Vlock:
+                self.processIncommingMessages()
+
     def check(self):
         """
         Checks wheter or not simulation should still continue. This will either
@@ -906,7 +1055,7 @@ class BaseSimulator(Solver):
 
         :param time: the simulation time at which this command was requested
         :param model_id: the model_id of the model that requested this command
-        :param action: the actual command to be executed as soon as it is safe
+        :param action: the trace to perform as soon as it is safe, as the UID of the tracer and the arguments of its trace function
         """
         #assert debug("Adding action for time " + str(time) + ", GVT = " + str(self.GVT))
         if time[0] < self.gvt:
@@ -966,11 +1115,12 @@ class BaseSimulator(Solver):
             # Release the lock ASAP, to allow other actions to be performed
 
         # Sort on time first, then on MESSAGE, not on model
-        lst.sort(key=lambda i: [i[0], i[2]])
+        lst.sort(key=actionOrder)
 
-        # Now execute each action in order
+        # Now perform each action in order
         for i in lst:
-            exec(i[2])
+            uid, args = i[2]
+            self.tracers.getByID(uid).trace(*args)
 
     def removeTracers(self):
         """
@@ -987,7 +1137,10 @@ class BaseSimulator(Solver):
                    kernels, 
                    msg_copy, 
                    memoization, 
-                   tracers):
+                   tracers,
+                   state_interval=1,
+                   state_memory_budget=None,
+                   lookahead=None):
         """
         Configure all 'global' variables for this kernel
 
@@ -999,6 +1152,9 @@ class BaseSimulator(Solver):
         :param kernels: number of simulation kernels in total
         :param msg_copy: message copy method
         :param memoization: use memoization or not
+        :param state_interval: maximal number of transitions between two saved states of a model
+        :param state_memory_budget: number of saved states and recorded transitions after which an early GVT calculation is requested, or None
+        :param lookahead: lookahead of the models for conservative simulation, or None for optimistic (time warp) simulation
         """
         for tracer in tracers:
             self.tracers.registerTracer(tracer, self.server, self.checkpoint_restored)
@@ -1015,8 +1171,11 @@ class BaseSimulator(Solver):
                                 3: CopyState, 
                                 4: AssignState, 
                                 5: CustomState, 
-                                6: MarshalState}
+                                6: MarshalState,
+                                7: DeltaState}
         self.state_saver = state_saving_options[statesaver]
+        # Delta state saving saves states relative to the previously saved state
+        self.delta_state_saving = self.state_saver is DeltaState
         # Save the integer value for checkpointing
         self.state_saving = statesaver
         self.msg_copy = msg_copy
@@ -1025,6 +1184,11 @@ class BaseSimulator(Solver):
         self.checkpoint_freq = checkpoint_frequency
         self.checkpoint_counter = 0
         self.memoization = memoization
+        self.max_state_interval = state_interval
+        self.state_memory_budget = state_memory_budget
+        self.saved_states = 0
+        self.early_gvt_requested = False
+        self.setupConservative(lookahead)
 
     def processMessage(self, clock):
         """
@@ -1157,9 +1321,17 @@ class BaseSimulator(Solver):
             while self.simlock_request:
                 time.sleep(0.00001)
             with self.simlock:
+                if self.conservative:
+                    # Promise not to send messages before the next transition
+                    clock = self.conservativeClock()
+                    self.sendPromise((clock[0], clock[1] - 1))
                 if self.check():
                     self.prevtime_finished = True
                     break
+                if self.conservative and self.waitForPromises((clock[0], clock[1] - 1), 
+                                                              (clock[0], clock[1] - 1)):
+                    # Messages might have been received in the meantime, possibly changing the next transition
+                    continue
                 # Process all incomming messages
                 if not self.irreversible:
                     # Check the external messages only if there is a possibility for them to arrive
@@ -1179,6 +1351,12 @@ class BaseSimulator(Solver):
                 # Don't interrupt the output generation, as these nodes WILL be marked as 'sent'
                 with self.Vlock:
                     reschedule = self.coupledOutputGeneration(self.current_clock)
+                if self.conservative:
+                    # All our messages for this time are sent, now wait for the messages of the others
+                    self.waitForPromises(self.current_clock, self.current_clock)
+                    if self.processMessage(self.current_clock) < self.current_clock:
+                        raise DEVSException("Message before time %s arrived after generating output, the lookahead of the models was violated" 
+                                            % (self.current_clock,))
                 try:
                     self.massAtomicTransitions(self.transitioning, self.current_clock)
                     cDEVS.scheduler.massReschedule(reschedule)
@@ -1279,7 +1457,10 @@ class BaseSimulator(Solver):
                         checkpoint_frequency=self.checkpoint_freq, 
                         statesaver=self.state_saving, 
                         kernels=self.kernels,
-                        msg_copy=self.msg_copy)
+                        msg_copy=self.msg_copy,
+                        state_interval=self.max_state_interval,
+                        state_memory_budget=self.state_memory_budget,
+                        lookahead=self.default_lookahead)
         # Still unflatten the model if it was flattened (due to pickling limit)
         if self.flattened:
             self.model.unflattenConnections()
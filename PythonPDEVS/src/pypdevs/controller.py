@@ -156,6 +156,13 @@ class Controller(BaseSimulator):
             # Limit the GVT algorithm, otherwise this will flood the ring
             print("Cleared")
             self.event_gvt.wait(freq)
+            self.event_gvt.clear()
+
+    def requestGVT(self):
+        """
+        Request a GVT calculation before the GVT interval has passed, e.g. because a kernel exceeds its state memory budget
+        """
+        self.event_gvt.set()
 
     def getVCDVariables(self):
         """
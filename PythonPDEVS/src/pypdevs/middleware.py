@@ -32,8 +32,13 @@ def startupMiddleware():
     global COMM_WORLD
     global MPI
 
+    from pypdevs.multiprocessingMPI import MPI as MultiprocessingMPI
     try:
-        from mpi4py import MPI
+        if MultiprocessingMPI.COMM_WORLD is not None:
+            # Started by the multiprocessing launcher, so use it instead of MPI
+            MPI = MultiprocessingMPI
+        else:
+            from mpi4py import MPI
         COMM_WORLD = MPI.COMM_WORLD
     except ImportError:
         # No MPI4Py found, so force local MPI simulation
@@ -290,7 +290,7 @@ class Server(object):
 
         :param time: the time at which the action happens
         :param model_id: the model_id that executed the action
-        :param action: the action to execute (as a string)
+        :param action: the action to execute (see *delayedAction*)
         """
         if self.queued_time is None:
             self.queued_time = time
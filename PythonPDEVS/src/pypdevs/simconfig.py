@@ -391,6 +391,18 @@ class SimulatorConfiguration(object):
             raise DEVSException("XML filename should be a string")
         self.setCustomTracer("tracerXML", "TracerXML", [filename])
 
+    def setBinary(self, filename):
+        """
+        Sets the use of a binary tracer, writing a compact trace that can be read with *pypdevs.tracers.tracerBinary.BinaryTrace*.
+
+        Calling this function multiple times will register a tracer for each of them (thus output to multiple files is possible, though more inefficient than simply (manually) copying the file at the end).
+
+        :param filename: string representing the filename to write the trace to
+        """
+        if not isinstance(filename, str):
+            raise DEVSException("Binary trace filename should be a string")
+        self.setCustomTracer("tracerBinary", "TracerBinary", [filename])
+
     def setVCD(self, filename):
         """
         Sets the use of a VCD tracer.
@@ -511,6 +523,9 @@ class SimulatorConfiguration(object):
 
            custom
                 define a custom 'copy' function in every state and use this
+
+           delta
+                only save the attributes that changed since the previously saved state (using the deepcopy module), for large states of which only a few attributes change per transition
         """
         if not isinstance(state_saving, int) and not isinstance(state_saving, str):
             raise DEVSException("State saving should be done using an integer or a string")
@@ -523,13 +538,66 @@ class SimulatorConfiguration(object):
                        "assign": 4, 
                        "none": 4, 
                        "custom": 5, 
-                       "marshal": 6}
+                       "marshal": 6, 
+                       "delta": 7}
             try:
                 state_saving = options[state_saving]
             except IndexError:
                 raise DEVSException("State saving option %s not recognized" % state_saving)
         self.simulator.state_saving = state_saving
 
+    def setInfrequentStateSaving(self, max_interval=10):
+        """
+        Only save the state of a model every few transitions, and replay the transitions since the last saved state when an unsaved state is needed (e.g. on a rollback).
+        The interval between two saved states is adapted per model: it grows by one after every saved state up to max_interval, and is halved whenever the model is rolled back.
+
+        .. note:: Transitions should be deterministic and should not modify their inputs, as they might be replayed
+
+        :param max_interval: maximal number of transitions between two saved states, 1 saves every state
+        """
+        if not isinstance(max_interval, int):
+            raise DEVSException("State saving interval should be an integer")
+        if max_interval < 1:
+            raise DEVSException("State saving interval should be at least one")
+        # Local simulation never saves states, so ignore it
+        if not local(self.simulator):
+            self.simulator.state_interval = max_interval
+
+    def setConservative(self, lookahead):
+        """
+        Use conservative instead of optimistic (time warp) distributed simulation: simulation kernels exchange promises not to send messages before some time,
+        and only simulate a time when no more messages for it can arrive. No states are saved and no rollbacks happen, which is faster for models with a large lookahead.
+
+        The lookahead of an atomic model is the minimal time between an input it receives and any message that this causes to another simulation kernel (e.g. the minimal
+        time advance after an external transition). Models can define their own in the *lookahead* attribute, the others use the lookahead passed here.
+
+        .. note:: Requires a termination time and is incompatible with relocations
+
+        :param lookahead: the lookahead of the models that don't define their own, should be positive
+        """
+        if not isinstance(lookahead, (float, int)):
+            raise DEVSException("Lookahead should be an integer or a float")
+        if lookahead <= 0:
+            raise DEVSException("Lookahead should be positive")
+        # Local simulation never rolls back, so ignore it
+        if not local(self.simulator):
+            self.simulator.lookahead = lookahead
+
+    def setStateMemoryBudget(self, budget):
+        """
+        Limit the number of saved states per simulation kernel, counting the transitions recorded by infrequent state saving too: a kernel that exceeds it requests a GVT calculation immediately,
+        instead of waiting for the GVT interval, so that its states can be fossil collected.
+
+        .. note:: This is a soft limit: the kernel keeps simulating while the GVT is calculated, and states after the GVT can never be removed. It is not enforced by blocking the kernel,
+                  as the GVT is rounded down and only changes when the slowest kernel progresses, so a blocked kernel could wait forever.
+
+        :param budget: number of saved states and recorded transitions per kernel, or None for no limit
+        """
+        if budget is not None and not isinstance(budget, int):
+            raise DEVSException("State memory budget should be an integer or None")
+        if not local(self.simulator):
+            self.simulator.state_memory_budget = budget
+
     def setMessageCopy(self, copy_method):
         """
         Sets the type of message copying to use, this will have an impact on performance. It is made customizable as some more general techniques will be much slower.
@@ -23,6 +23,7 @@ from pypdevs.DEVS import *
 
 from pypdevs.util import *
 from pypdevs.logger import *
+from pypdevs.statesavers import TransitionRecord
 
 from pypdevs.classicDEVSWrapper import ClassicDEVSWrapper
 
@@ -89,7 +90,7 @@ class Solver(object):
                     found = False
                     prev = aDEVS.memo.pop()
                     memo = aDEVS.memo[-1]
-                    if memo.time_last == clock and prev.loadState() == aDEVS.state:
+                    if memo.time_last == clock and aDEVS.loadSavedState(prev) == aDEVS.state:
                         if ttype == 1:
                             found = True
                         elif aDEVS.my_input == memo.my_input:
@@ -99,7 +100,7 @@ class Solver(object):
                             elif aDEVS.elapsed == memo.elapsed and ttype == 2:
                                 found = True
                     if found:
-                        aDEVS.state = memo.loadState()
+                        aDEVS.state = aDEVS.loadSavedState(memo)
                         aDEVS.time_last = clock
                         aDEVS.time_next = memo.time_next
                         # Just add the copy
@@ -177,19 +178,53 @@ class Solver(object):
                 # But only if there are multiple kernels, since otherwise there would be no other kernel to invoke a revertion
                 # This can save us lots of time for local simulation (however, all other code is written with parallellisation in mind...)
                 activity = aDEVS.postActivityCalculation(activity_tracking_prevalue)
-                aDEVS.old_states.append(self.state_saver(aDEVS.time_last,
-                                                         aDEVS.time_next,
-                                                         aDEVS.state,
-                                                         activity,
-                                                         aDEVS.my_input,
-                                                         aDEVS.elapsed))
+                if aDEVS.unsaved_transitions + 1 < aDEVS.state_interval and aDEVS.old_states:
+                    # Infrequent state saving: only record the transition, it is replayed if the state is needed
+                    aDEVS.unsaved_transitions += 1
+                    aDEVS.old_states.append(TransitionRecord(aDEVS.time_last,
+                                                             aDEVS.time_next,
+                                                             activity,
+                                                             aDEVS.my_input,
+                                                             aDEVS.elapsed,
+                                                             ttype,
+                                                             aDEVS.old_states[-1]))
+                else:
+                    if self.delta_state_saving:
+                        previous = aDEVS.old_states[-1] if aDEVS.old_states else None
+                        if isinstance(previous, TransitionRecord):
+                            previous = previous.snapshot
+                        aDEVS.old_states.append(self.state_saver(aDEVS.time_last,
+                                                                 aDEVS.time_next,
+                                                                 aDEVS.state,
+                                                                 activity,
+                                                                 aDEVS.my_input,
+                                                                 aDEVS.elapsed,
+                                                                 previous))
+                    else:
+                        aDEVS.old_states.append(self.state_saver(aDEVS.time_last,
+                                                                 aDEVS.time_next,
+                                                                 aDEVS.state,
+                                                                 activity,
+                                                                 aDEVS.my_input,
+                                                                 aDEVS.elapsed))
+                    aDEVS.unsaved_transitions = 0
+                    # Save less frequently as long as the model is not rolled back (halved in AtomicDEVS.revert)
+                    if aDEVS.state_interval < self.max_state_interval:
+                        aDEVS.state_interval += 1
+                if self.state_memory_budget is not None:
+                    # Recorded transitions count too, as they keep the input of the transition
+                    self.saved_states += 1
+                    if self.saved_states > self.state_memory_budget and not self.early_gvt_requested:
+                        # Over the budget, so fossil collect as soon as possible
+                        self.early_gvt_requested = True
+                        self.getProxy(0).requestGVT()
                 if self.relocation_pending:
                     # Quit ASAP by throwing an exception
                     for m in partialmod:
                         # Roll back these models to before the transitions
                         m.time_next = m.old_states[-1].time_next
                         m.time_last = m.old_states[-1].time_last
-                        m.state = m.old_states[-1].loadState()
+                        m.state = m.loadSavedState(m.old_states[-1])
                     self.model.scheduler.massReschedule(trans)
                     self.server.flushQueuedMessages()
                     raise QuickStopException()
@@ -299,26 +334,38 @@ class Solver(object):
         :returns: the models that should be rescheduled
         """
         cDEVS = self.model
+        local_model_ids = cDEVS.local_model_ids
+        transitioning = self.transitioning
         remotes = {}
         for child in cDEVS.scheduler.getImminent(time):
             outbag = self.atomicOutputGeneration(child, time)
             for outport in outbag:
                 payload = outbag[outport]
-                if not hasattr(outport, "routing_outline"):
-                    raise Exception(outport)
-                for inport, z in outport.routing_outline:
-                    aDEVS = inport.host_DEVS
-                    if z is not None:
-                        payload = [z(pickle.loads(pickle.dumps(m))) 
-                                   for m in payload]
-                    if aDEVS.model_id in self.model.local_model_ids:
-                        # This setdefault call is responsible for our non-linear runtime in several situations...
-                        aDEVS.my_input.setdefault(inport, []).extend(payload)
-                        self.transitioning[aDEVS] |= 2
+                try:
+                    # Precompiled after direct connection, see DEVS.routingTable
+                    routing_table = outport.routing_table
+                except AttributeError:
+                    # Not pickled with the model, so rebuild it
+                    routing_table = outport.routing_table = routingTable(outport)
+                for inport, aDEVS, z in routing_table:
+                    if z is None:
+                        messages = payload
+                    else:
+                        # The z-function gets a copy of every message, the payload itself is routed to other ports too
+                        messages = [z(pickle.loads(pickle.dumps(m, pickle.HIGHEST_PROTOCOL)))
+                                    for m in payload]
+                    if aDEVS.model_id in local_model_ids:
+                        bag = aDEVS.my_input
+                        if inport in bag:
+                            bag[inport].extend(messages)
+                        else:
+                            # Never share the list of the output bag
+                            bag[inport] = messages if z is not None else list(messages)
+                        transitioning[aDEVS] |= 2
                     else:
                         remotes.setdefault(aDEVS.model_id, 
                                            {}).setdefault(inport.port_id, 
-                                                          []).extend(payload)
+                                                          []).extend(messages)
         for destination in remotes:
             self.send(destination, time, remotes[destination])
         return self.transitioning
@@ -234,3 +234,189 @@ class MarshalState(object):
         :returns: state - copy of the state that was saved
         """
         return marshal.loads(self.state)
+
+class DeltaState(object):
+    """
+    Class to save the state as the attributes that changed since the previously saved state of the model, for states that are objects
+    with attributes (other states are saved using deepcopy). Changed attributes are detected by comparing them (with ==) to their
+    saved value, and saved using deepcopy. States are reconstructed from the chain of changes when they are loaded.
+
+    Attributes should not share mutable objects with each other, as they are copied separately.
+    """
+    # Maximal number of changes to a base state, after which a new base state is saved (sharing the unchanged attributes)
+    max_chain = 64
+
+    def __init__(self, time_last, time_next, state, activity, my_input, elapsed, previous=None):
+        """
+        Constructor
+
+        :param time_last: time_last to save
+        :param time_next: time_next to save
+        :param state: state to save
+        :param activity: the activity of the computation
+        :param my_input: the state input to save for memorisation
+        :param elapsed: the time elapsed
+        :param previous: the previously saved state of the model, or None
+        """
+        self.time_last = time_last
+        self.time_next = time_next
+        self.activity = activity
+        self.my_input = my_input
+        self.elapsed = elapsed
+        self.previous = None
+        # Saved values of all attributes, only kept by the last saved state of the model
+        self.attributes = None
+        try:
+            current = vars(state)
+        except TypeError:
+            # Not an object with attributes
+            self.cls = None
+            self.changes = deepcopy(state)
+            return
+        self.cls = state.__class__
+
+        if isinstance(previous, DeltaState) and previous.cls is self.cls:
+            attributes = previous.takeAttributes()
+            changes = {}
+            for name, value in current.items():
+                try:
+                    if name in attributes and bool(attributes[name] == value):
+                        continue
+                except Exception:
+                    # Not comparable (e.g. arrays), so consider it changed
+                    pass
+                changes[name] = attributes[name] = deepcopy(value)
+            removed = [name for name in attributes if name not in current]
+            for name in removed:
+                del attributes[name]
+        else:
+            attributes = None
+
+        if attributes is not None and previous.depth < self.max_chain:
+            self.previous = previous
+            self.depth = previous.depth + 1
+            self.changes = changes
+            self.removed = removed
+        else:
+            # Base state, saved values are never modified so they can be shared with the previous states
+            if attributes is None:
+                attributes = deepcopy(current)
+            self.depth = 0
+            self.changes = dict(attributes)
+            self.removed = []
+        self.attributes = attributes
+
+    def takeAttributes(self):
+        """
+        Take over the saved values of all attributes, to save the next state relative to this one
+
+        :returns: dict -- the saved value of every attribute, which must not be modified
+        """
+        attributes = self.attributes
+        if attributes is None:
+            # Not the last saved state (anymore), e.g. after a revert
+            attributes = self.reconstruct()
+        self.attributes = None
+        return attributes
+
+    def reconstruct(self):
+        """
+        Reconstruct the saved values of all attributes from the chain of changes
+
+        :returns: dict -- the saved value of every attribute, which must not be modified
+        """
+        if self.attributes is not None:
+            return dict(self.attributes)
+        chain = []
+        saved = self
+        while saved is not None:
+            chain.append(saved)
+            saved = saved.previous
+        attributes = {}
+        for saved in reversed(chain):
+            attributes.update(saved.changes)
+            for name in saved.removed:
+                del attributes[name]
+        return attributes
+
+    def compact(self):
+        """
+        Make this saved state a base state, so that all states saved before it can be fossil collected
+        """
+        if self.previous is not None:
+            self.changes = self.reconstruct()
+            self.removed = []
+            self.previous = None
+            self.depth = 0
+
+    def loadState(self):
+        """
+        Load the state from the class, this will make a copy
+
+        :returns: state - copy of the state that was saved
+        """
+        if self.cls is None:
+            return deepcopy(self.changes)
+        state = self.cls.__new__(self.cls)
+        state.__dict__.update(deepcopy(self.reconstruct()))
+        return state
+
+class TransitionRecord(object):
+    """
+    Class to record a transition without saving the resulting state, used for infrequent state saving. The state is reconstructed
+    when it is loaded, by replaying the transitions recorded since the last saved state on a copy of the model.
+
+    Transitions should be deterministic and should not modify their inputs, as they might be replayed. Attributes other than the
+    state should only be assigned, not modified in place, as the copy of the model shares their values with the model.
+    """
+    def __init__(self, time_last, time_next, activity, my_input, elapsed, ttype, previous):
+        """
+        Constructor
+
+        :param time_last: time_last to save
+        :param time_next: time_next to save
+        :param activity: the activity of the computation
+        :param my_input: the input of the transition
+        :param elapsed: the time elapsed
+        :param ttype: the type of the transition (1 internal, 2 external, 3 confluent)
+        :param previous: the previously saved state (or record) of the model
+        """
+        self.time_last = time_last
+        self.time_next = time_next
+        self.activity = activity
+        self.my_input = my_input
+        self.elapsed = elapsed
+        self.ttype = ttype
+        self.previous = previous
+        # The last saved state, from which the transitions are replayed
+        self.snapshot = previous.snapshot if isinstance(previous, TransitionRecord) else previous
+
+    def loadState(self, model):
+        """
+        Load the state from the class, by replaying the recorded transitions
+
+        :param model: the model that made the transitions
+        :returns: state - the reconstructed state
+        """
+        records = []
+        saved = self
+        while saved is not self.snapshot:
+            records.append(saved)
+            saved = saved.previous
+        # Replay on a copy of the model, so the model itself is not touched
+        model = copy(model)
+        model.old_states = []
+        model.memo = []
+        model.my_input = {}
+        model.state = self.snapshot.loadState()
+        model.time_last = self.snapshot.time_last
+        for record in reversed(records):
+            model.elapsed = record.elapsed
+            if record.ttype == 1:
+                model.state = model.intTransition()
+            elif record.ttype == 2:
+                model.state = model.extTransition(record.my_input)
+            else:
+                model.state = model.confTransition(record.my_input)
+            model.time_last = record.time_last
+        return model.state
@@ -13,7 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from util import runTraceAtController
+from util import traceAtController
 import sys
 
 class MyTracer(object):
@@ -63,7 +63,7 @@ class MyTracer(object):
         :param aDEVS: the model that transitioned
         """
         # You should only vary the 'myCustomParam_' part
-        runTraceAtController(self.server, self.uid, aDEVS, [myCustomParam1, myCustomParam2])
+        traceAtController(self.server, self.uid, aDEVS, [myCustomParam1, myCustomParam2])
 
     def traceConfluent(self, aDEVS):
         """
@@ -72,7 +72,7 @@ class MyTracer(object):
         :param aDEVS: the model that transitioned
         """
         # You should only vary the 'myCustomParam_' part
-        runTraceAtController(self.server, self.uid, aDEVS, [myCustomParam1, myCustomParam2])
+        traceAtController(self.server, self.uid, aDEVS, [myCustomParam1, myCustomParam2])
 
     def traceExternal(self, aDEVS):
         """
@@ -81,7 +81,7 @@ class MyTracer(object):
         :param aDEVS: the model that transitioned
         """
         # You should only vary the 'myCustomParam_' part
-        runTraceAtController(self.server, self.uid, aDEVS, [myCustomParam1, myCustomParam2])
+        traceAtController(self.server, self.uid, aDEVS, [myCustomParam1, myCustomParam2])
 
     def traceInit(self, aDEVS):
         """
@@ -90,4 +90,4 @@ class MyTracer(object):
         :param aDEVS: the model that was initialised
         """
         # You should only vary the 'myCustomParam_' part
-        runTraceAtController(self.server, self.uid, aDEVS, [myCustomParam1, myCustomParam2])
+        traceAtController(self.server, self.uid, aDEVS, [myCustomParam1, myCustomParam2])
@@ -0,0 +1,627 @@
+# Copyright 2014 Modelling, Simulation and Design Lab (MSDL) at
+# McGill University and the University of Antwerp (http://msdl.cs.mcgill.ca/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compact binary trace format, with its tracer and reader.
+
+A trace file starts with *MAGIC*, followed by the records (all little-endian):
+
+    - 'S' string: id (uint32), length (uint32) and the UTF-8 encoded string. Defines a name or state, before its first use.
+    - 'E' event: model name id (uint32), kind (uint8, see *KINDS*), time (float64), age (int64), number of ports (uint16),
+      the state of the model and then per port its name id (uint32), category (uint8, see *CATEGORIES*), number of
+      messages (uint32) and the messages. Ports without messages are left out.
+
+Messages and states are encoded values: type (uint8), count (uint32) and the payload, see *encodeValue*.
+
+When the tracer is stopped, the index is appended as an 'X' record: the number of events, messages, models and strings
+(uint64), a row per event (*EVENT_INDEX*) grouped by model and sorted on time, a row per message (*MESSAGE_INDEX*) in
+the order of their events, a row per model (*MODEL_INDEX*) with its range of events, the events in the order of time
+(uint32 per event) and the string table (length (uint32) and UTF-8 encoded string), followed by the offset of this record
+(uint64) and *INDEX_MAGIC*. Events are selected on model and time by binary search in this index, see *buildIndex*.
+A trace without index (e.g. of a crashed simulation) can still be read, the index is then rebuilt by scanning the records.
+"""
+
+from pypdevs.tracers.tracerBase import BaseTracer
+from pypdevs.util import traceAtController
+import struct
+import pickle
+import os
+
+MAGIC = b"PDEVSBT1"
+INDEX_MAGIC = b"PDEVSBX2"
+
+# In the order of the XML traces
+KINDS = ("EX", "IN")
+CATEGORIES = ("I", "O")
+
+# Value types, a STRING_ID refers to the string table (its count is the id)
+NONE, BOOL, INT, FLOAT, VECTOR, STRING, PICKLE, STRING_ID = range(8)
+# Vectors of int64 and vectors that are tuples instead of lists
+INT_VECTOR, TUPLE_VECTOR, INT_TUPLE_VECTOR = range(8, 11)
+# Element type and sequence type of the vectors
+VECTOR_TYPES = {VECTOR: ("d", list),
+                INT_VECTOR: ("q", list),
+                TUPLE_VECTOR: ("d", tuple),
+                INT_TUPLE_VECTOR: ("q", tuple)}
+
+# States that are strings up to this length are stored in the string table, as they are usually modes that repeat
+MAX_STRING_ID_LENGTH = 64
+
+STRING_RECORD = struct.Struct("<II")
+EVENT_RECORD = struct.Struct("<IBdqH")
+PORT_RECORD = struct.Struct("<IBI")
+VALUE_RECORD = struct.Struct("<BI")
+INDEX_RECORD = struct.Struct("<QQQQ")
+STRING_LENGTH = struct.Struct("<I")
+INDEX_TRAILER = struct.Struct("<Q")
+
+# Rows of the index: the offset of an event is that of its record, the offset of a message that of its value
+EVENT_INDEX = struct.Struct("<IBdQ")
+EVENT_DTYPE = [("model", "<u4"), ("kind", "u1"), ("time", "<f8"), ("offset", "<u8")]
+MESSAGE_INDEX = struct.Struct("<IIBQ")
+MESSAGE_DTYPE = [("event", "<u4"), ("port", "<u4"), ("category", "u1"), ("offset", "<u8")]
+MODEL_INDEX = struct.Struct("<III")
+MODEL_DTYPE = [("model", "<u4"), ("first", "<u4"), ("count", "<u4")]
+TIME_ORDER = struct.Struct("<I")
+
+# Offset of the state in an event record
+STATE_OFFSET = 1 + EVENT_RECORD.size
+
+def encodeValue(value):
+    """
+    Encode a message or state, at the time of the transition
+
+    :param value: the value to encode
+    :returns: tuple -- the type, count and payload of the value: numbers, and lists and tuples of only floats or only ints
+              (as float64 or int64 vectors) are stored as such, strings as UTF-8 and other values are pickled (or stored
+              as string if that fails)
+    """
+    if value is None:
+        return (NONE, 0, b"")
+    elif isinstance(value, bool):
+        return (BOOL, 1, struct.pack("<?", value))
+    elif isinstance(value, int) and -2**63 <= value < 2**63:
+        return (INT, 1, struct.pack("<q", value))
+    elif isinstance(value, float):
+        return (FLOAT, 1, struct.pack("<d", value))
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        return (STRING, len(data), data)
+    elif type(value) in (list, tuple):
+        # Exact types, so subclasses (e.g. named tuples) and mixed sequences are pickled and read back as they were
+        if all(type(v) is float for v in value):
+            value_type = VECTOR if type(value) is list else TUPLE_VECTOR
+            return (value_type, len(value), struct.pack("<%dd" % len(value), *value))
+        elif all(type(v) is int and -2**63 <= v < 2**63 for v in value):
+            value_type = INT_VECTOR if type(value) is list else INT_TUPLE_VECTOR
+            return (value_type, len(value), struct.pack("<%dq" % len(value), *value))
+    try:
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        return (PICKLE, len(data), data)
+    except Exception:
+        return encodeValue(str(value))
+
+def encodeState(state):
+    """
+    Encode the state of a model: primitive states are stored as values, others as their string representation (as in XML traces)
+
+    :param state: the state to encode
+    :returns: tuple -- the encoded state, see *encodeValue*
+    """
+    if state is None or isinstance(state, (bool, int, float, str)):
+        return encodeValue(state)
+    return encodeValue(str(state))
+
+def payloadSize(value_type, count):
+    """
+    Size of the payload of an encoded value
+
+    :param value_type: type of the value
+    :param count: count of the value
+    :returns: int -- the number of bytes of the payload
+    """
+    if value_type in (NONE, STRING_ID):
+        return 0
+    elif value_type == BOOL:
+        return 1
+    elif value_type in (INT, FLOAT):
+        return 8
+    elif value_type in VECTOR_TYPES:
+        return 8 * count
+    return count
+
+def decodeValue(value_type, count, data, strings):
+    """
+    Decode a value encoded with *encodeValue*
+
+    :param value_type: type of the value
+    :param count: count of the value
+    :param data: buffer containing the payload
+    :param strings: the string table
+    :returns: the value
+    """
+    if value_type == NONE:
+        return None
+    elif value_type == STRING_ID:
+        return strings[count]
+    data = bytes(data)
+    if value_type == BOOL:
+        return struct.unpack("<?", data)[0]
+    elif value_type == INT:
+        return struct.unpack("<q", data)[0]
+    elif value_type == FLOAT:
+        return struct.unpack("<d", data)[0]
+    elif value_type in VECTOR_TYPES:
+        element, sequence = VECTOR_TYPES[value_type]
+        return sequence(struct.unpack("<%d%s" % (count, element), data))
+    elif value_type == STRING:
+        return data.decode("utf-8")
+    elif value_type == PICKLE:
+        return pickle.loads(data)
+    raise ValueError("Unknown value type %s in binary trace" % value_type)
+
+def scanTrace(data):
+    """
+    Rebuild the string table and index of a trace by scanning its records
+
+    :param data: buffer containing the trace
+    :returns: tuple -- the strings, the event rows, the message rows and the offset of the end of the last complete record
+    """
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a binary trace")
+    strings = []
+    events = []
+    messages = []
+    offset = len(MAGIC)
+    size = len(data)
+    try:
+        while offset < size:
+            tag = bytes(data[offset:offset+1])
+            if tag == b"S":
+                _, length = STRING_RECORD.unpack_from(data, offset + 1)
+                end = offset + 1 + STRING_RECORD.size + length
+                if end > size:
+                    break
+                strings.append(bytes(data[end - length:end]).decode("utf-8"))
+            elif tag == b"E":
+                model, kind, time, _, nports = EVENT_RECORD.unpack_from(data, offset + 1)
+                end = offset + STATE_OFFSET
+                value_type, count = VALUE_RECORD.unpack_from(data, end)
+                end += VALUE_RECORD.size + payloadSize(value_type, count)
+                event_messages = []
+                for _ in range(nports):
+                    port, category, nmessages = PORT_RECORD.unpack_from(data, end)
+                    end += PORT_RECORD.size
+                    for _ in range(nmessages):
+                        value_type, count = VALUE_RECORD.unpack_from(data, end)
+                        event_messages.append((len(events), port, category, end))
+                        end += VALUE_RECORD.size + payloadSize(value_type, count)
+                if end > size:
+                    break
+                events.append((model, kind, time, offset))
+                messages.extend(event_messages)
+            else:
+                # The index
+                break
+            offset = end
+    except struct.error:
+        # Partially written record at the end
+        pass
+    return strings, events, messages, offset
+
+def buildIndex(events, messages):
+    """
+    Sort the index of a trace, so that events can be selected on model and time by binary search
+
+    :param events: the event rows, in the order of the trace
+    :param messages: the message rows, in the order of the trace
+    :returns: tuple -- the event rows grouped by model and sorted on time, the message rows referring to these event rows
+              in the same order, the model rows (model, first event row and number of events) and the event rows in the order of time
+    """
+    # Sorting is stable, so simultaneous events keep the order of the trace
+    order = sorted(range(len(events)), key=lambda i: (events[i][0], events[i][2]))
+    rows = [0] * len(events)
+    for row, i in enumerate(order):
+        rows[i] = row
+    sorted_events = [events[i] for i in order]
+    sorted_messages = sorted([(rows[m[0]],) + tuple(m[1:]) for m in messages], key=lambda m: m[0])
+    models = []
+    for row, event in enumerate(sorted_events):
+        if models and models[-1][0] == event[0]:
+            models[-1][2] += 1
+        else:
+            models.append([event[0], row, 1])
+    time_order = [rows[i] for i in sorted(range(len(events)), key=lambda i: events[i][2])]
+    return sorted_events, sorted_messages, [tuple(model) for model in models], time_order
+
+class TracerBinary(BaseTracer):
+    """
+    A tracer writing a compact binary trace, see *BinaryTrace* to read it
+    """
+    def __init__(self, uid, server, filename):
+        """
+        Constructor
+
+        :param uid: the UID of this tracer
+        :param server: the server to make remote calls on
+        :param filename: file to save the trace to
+        """
+        super(TracerBinary, self).__init__(uid, server)
+        if server.getName() == 0:
+            self.filename = filename
+        else:
+            self.filename = None
+
+    def startTracer(self, recover):
+        """
+        Starts up the tracer
+
+        :param recover: whether or not this is a recovery call (so whether or not the file should be appended to)
+        """
+        if self.filename is None:
+            # Nothing to do here as we aren't the controller
+            return
+        self.string_ids = {}
+        self.events = bytearray()
+        self.messages = bytearray()
+        self.event_count = 0
+        self.message_count = 0
+        if recover and os.path.exists(self.filename):
+            # Continue after the last complete record, dropping the index
+            with open(self.filename, 'rb') as f:
+                strings, events, messages, end = scanTrace(f.read())
+            self.string_ids = dict((string, i) for i, string in enumerate(strings))
+            for row in events:
+                self.events += EVENT_INDEX.pack(*row)
+            for row in messages:
+                self.messages += MESSAGE_INDEX.pack(*row)
+            self.event_count = len(events)
+            self.message_count = len(messages)
+            self.binary_file = open(self.filename, 'r+b')
+            self.binary_file.truncate(end)
+            self.binary_file.seek(end)
+        else:
+            self.binary_file = open(self.filename, 'wb')
+            self.binary_file.write(MAGIC)
+
+    def stopTracer(self):
+        """
+        Stop the tracer, appends the index
+        """
+        offset = self.binary_file.tell()
+        strings = sorted(self.string_ids, key=self.string_ids.get)
+        events, messages, models, time_order = buildIndex(list(EVENT_INDEX.iter_unpack(self.events)),
+                                                          list(MESSAGE_INDEX.iter_unpack(self.messages)))
+        self.binary_file.write(b"X" + INDEX_RECORD.pack(len(events), len(messages), len(models), len(strings)))
+        self.binary_file.write(b"".join(EVENT_INDEX.pack(*row) for row in events))
+        self.binary_file.write(b"".join(MESSAGE_INDEX.pack(*row) for row in messages))
+        self.binary_file.write(b"".join(MODEL_INDEX.pack(*row) for row in models))
+        self.binary_file.write(b"".join(TIME_ORDER.pack(row) for row in time_order))
+        for string in strings:
+            data = string.encode("utf-8")
+            self.binary_file.write(STRING_LENGTH.pack(len(data)) + data)
+        self.binary_file.write(INDEX_TRAILER.pack(offset) + INDEX_MAGIC)
+        self.binary_file.truncate()
+        self.binary_file.flush()
+        # Events of a continued simulation overwrite the index, which is appended again when stopping
+        self.binary_file.seek(offset)
+
+    def stringID(self, string, buf):
+        """
+        Get the id of a string, adding a string record to the buffer for new strings
+
+        :param string: the string
+        :param buf: the buffer of the record being written
+        :returns: int -- the id of the string
+        """
+        string_id = self.string_ids.get(string)
+        if string_id is None:
+            string_id = len(self.string_ids)
+            self.string_ids[string] = string_id
+            data = string.encode("utf-8")
+            buf += b"S" + STRING_RECORD.pack(string_id, len(data)) + data
+        return string_id
+
+    def trace(self, model_name, timestamp, event_kind, ports, state):
+        """
+        Save an event record for the provided parameters
+
+        :param model_name: name of the model
+        :param timestamp: timestamp of the transition
+        :param event_kind: kind of event that happened, an index in *KINDS*
+        :param ports: list of the name, category (index in *CATEGORIES*) and encoded messages of every port
+        :param state: the encoded state
+        """
+        buf = bytearray()
+        model_id = self.stringID(model_name, buf)
+        port_ids = [self.stringID(port[0], buf) for port in ports]
+        value_type, count, payload = state
+        if value_type == STRING and count <= MAX_STRING_ID_LENGTH:
+            value_type, count, payload = STRING_ID, self.stringID(payload.decode("utf-8"), buf), b""
+        offset = self.binary_file.tell() + len(buf)
+        self.events += EVENT_INDEX.pack(model_id, event_kind, timestamp[0], offset)
+        buf += b"E" + EVENT_RECORD.pack(model_id, event_kind, timestamp[0], timestamp[1], len(ports))
+        buf += VALUE_RECORD.pack(value_type, count) + payload
+        for port_id, (_, category, port_messages) in zip(port_ids, ports):
+            buf += PORT_RECORD.pack(port_id, category, len(port_messages))
+            for value_type, count, payload in port_messages:
+                self.messages += MESSAGE_INDEX.pack(self.event_count, port_id, category,
+                                                    self.binary_file.tell() + len(buf))
+                buf += VALUE_RECORD.pack(value_type, count) + payload
+            self.message_count += len(port_messages)
+        self.event_count += 1
+        self.binary_file.write(buf)
+
+    def traceEvent(self, aDEVS, time, event_kind, ports, bag):
+        """
+        Trace an event of a model, all values are encoded immediately
+
+        :param aDEVS: the model that transitioned
+        :param time: time at which it should be traced
+        :param event_kind: kind of the event, an index in *KINDS*
+        :param ports: the ports to trace, those without messages are left out
+        :param bag: the messages of the ports, my_input or my_output
+        """
+        category = 0 if bag is aDEVS.my_input else 1
+        port_info = [(port.getPortName(), category, [encodeValue(message) for message in bag[port]])
+                     for port in ports if bag.get(port)]
+        traceAtController(self.server,
+                          self.uid,
+                          aDEVS,
+                          [aDEVS.getModelFullName(),
+                              time,
+                              event_kind,
+                              port_info,
+                              encodeState(aDEVS.state)])
+
+    def traceInternal(self, aDEVS):
+        """
+        The trace functionality for binary output at an internal transition
+
+        :param aDEVS: the model that transitioned
+        """
+        self.traceEvent(aDEVS, aDEVS.time_last, 1, aDEVS.OPorts, aDEVS.my_output)
+
+    def traceExternal(self, aDEVS):
+        """
+        The trace functionality for binary output at an external transition
+
+        :param aDEVS: the model that transitioned
+        """
+        self.traceEvent(aDEVS, aDEVS.time_last, 0, aDEVS.IPorts, aDEVS.my_input)
+
+    def traceConfluent(self, aDEVS):
+        """
+        The trace functionality for binary output at a confluent transition
+
+        :param aDEVS: the model that transitioned
+        """
+        self.traceEvent(aDEVS, aDEVS.time_last, 0, aDEVS.IPorts, aDEVS.my_input)
+        self.traceEvent(aDEVS, aDEVS.time_last, 1, aDEVS.OPorts, aDEVS.my_output)
+
+    def traceInit(self, aDEVS, t):
+        """
+        The trace functionality for binary output at initialization
+
+        :param aDEVS: the model that transitioned
+        :param t: time at which it should be traced
+        """
+        self.traceEvent(aDEVS, t, 0, [], {})
+
+class BinaryTrace(object):
+    """
+    Reader of a binary trace, extracting events and values into NumPy arrays using the index of the trace
+    """
+    def __init__(self, filename):
+        """
+        Constructor, maps the trace file into memory
+
+        :param filename: the trace file
+        """
+        import numpy
+        self.numpy = numpy
+        if os.path.getsize(filename) > 0:
+            self.data = numpy.memmap(filename, dtype=numpy.uint8, mode='r')
+        else:
+            self.data = numpy.zeros(0, dtype=numpy.uint8)
+        data = self.data
+        index_offset = None
+        if (len(data) >= len(MAGIC) + INDEX_TRAILER.size + len(INDEX_MAGIC) and
+                bytes(data[-len(INDEX_MAGIC):]) == INDEX_MAGIC):
+            index_offset = INDEX_TRAILER.unpack_from(data, len(data) - len(INDEX_MAGIC) - INDEX_TRAILER.size)[0]
+        if index_offset is not None:
+            nevents, nmessages, nmodels, nstrings = INDEX_RECORD.unpack_from(data, index_offset + 1)
+            start = index_offset + 1 + INDEX_RECORD.size
+            self.events = numpy.frombuffer(data, dtype=EVENT_DTYPE, count=nevents, offset=start)
+            start += nevents * EVENT_INDEX.size
+            self.messages = numpy.frombuffer(data, dtype=MESSAGE_DTYPE, count=nmessages, offset=start)
+            start += nmessages * MESSAGE_INDEX.size
+            model_rows = numpy.frombuffer(data, dtype=MODEL_DTYPE, count=nmodels, offset=start)
+            start += nmodels * MODEL_INDEX.size
+            self.time_order = numpy.frombuffer(data, dtype="<u4", count=nevents, offset=start)
+            start += nevents * TIME_ORDER.size
+            self.strings = []
+            for _ in range(nstrings):
+                length = STRING_LENGTH.unpack_from(data, start)[0]
+                start += STRING_LENGTH.size
+                self.strings.append(bytes(data[start:start+length]).decode("utf-8"))
+                start += length
+        else:
+            strings, events, messages, _ = scanTrace(data)
+            events, messages, models, time_order = buildIndex(events, messages)
+            self.strings = strings
+            self.events = numpy.array(events, dtype=EVENT_DTYPE)
+            self.messages = numpy.array(messages, dtype=MESSAGE_DTYPE)
+            model_rows = numpy.array(models, dtype=MODEL_DTYPE)
+            self.time_order = numpy.array(time_order, dtype="<u4")
+        self.string_ids = dict((string, i) for i, string in enumerate(self.strings))
+        # Range of the event rows of every model
+        self.model_ranges = dict((int(model), (int(first), int(first) + int(count)))
+                                 for model, first, count in model_rows)
+        self.sorted_times = self.events["time"][self.time_order]
+
+    def models(self):
+        """
+        The names of the models in the trace
+
+        :returns: list -- the full names of the traced models
+        """
+        return [self.strings[i] for i in sorted(self.model_ranges)]
+
+    def eventIndices(self, model=None, start=None, end=None):
+        """
+        Select events on model and time
+
+        :param model: full name of the model, or None for all models
+        :param start: minimal time of the events (inclusive), or None
+        :param end: maximal time of the events (inclusive), or None
+        :returns: array -- the indices of the selected events, in the order of time
+        """
+        numpy = self.numpy
+        if model is None:
+            times = self.sorted_times
+        else:
+            first, last = self.model_ranges.get(self.string_ids.get(model), (0, 0))
+            times = self.events["time"][first:last]
+        low = 0 if start is None else int(numpy.searchsorted(times, start, side="left"))
+        high = len(times) if end is None else int(numpy.searchsorted(times, end, side="right"))
+        if model is None:
+            return self.time_order[low:max(low, high)].astype(numpy.int64)
+        return numpy.arange(first + low, first + max(low, high))
+
+    def times(self, model=None, start=None, end=None):
+        """
+        Times of the events, see *eventIndices*
+
+        :returns: array -- the times of the selected events
+        """
+        return self.events["time"][self.eventIndices(model, start, end)]
+
+    def decode(self, offset):
+        """
+        Decode a value in the trace
+
+        :param offset: offset of the value
+        :returns: tuple -- the value and the offset after it
+        """
+        offset = int(offset)
+        value_type, count = VALUE_RECORD.unpack_from(self.data, offset)
+        offset += VALUE_RECORD.size
+        end = offset + payloadSize(value_type, count)
+        return decodeValue(value_type, count, self.data[offset:end], self.strings), end
+
+    def event(self, index):
+        """
+        Decode an event
+
+        :param index: index of the event
+        :returns: dict -- the model, time, age, kind, ports (list of name, category and messages) and state of the event
+        """
+        offset = int(self.events["offset"][index])
+        model, kind, time, age, nports = EVENT_RECORD.unpack_from(self.data, offset + 1)
+        state, offset = self.decode(offset + STATE_OFFSET)
+        ports = []
+        for _ in range(nports):
+            port, category, nmessages = PORT_RECORD.unpack_from(self.data, offset)
+            offset += PORT_RECORD.size
+            port_messages = []
+            for _ in range(nmessages):
+                message, offset = self.decode(offset)
+                port_messages.append(message)
+            ports.append((self.strings[port], CATEGORIES[category], port_messages))
+        return {"model": self.strings[model],
+                "time": time,
+                "age": age,
+                "kind": KINDS[kind],
+                "ports": ports,
+                "state": state}
+
+    def iterEvents(self, model=None, start=None, end=None):
+        """
+        Decode the selected events, see *eventIndices* and *event*
+        """
+        for index in self.eventIndices(model, start, end):
+            yield self.event(index)
+
+    def gather(self, offsets):
+        """
+        Extract values, vectorized if all of them are numbers of the same type or vectors of the same length and element type
+
+        :param offsets: offsets of the values
+        :returns: array -- the values, of shape (n,) for numbers, (n, count) for vectors, or an object array otherwise
+        """
+        numpy = self.numpy
+        if len(offsets) == 0:
+            return numpy.zeros(0)
+        offsets = numpy.asarray(offsets, dtype=numpy.int64)[:, None]
+        types = self.data[offsets[:, 0]]
+        counts = self.data[offsets + 1 + numpy.arange(4)].copy().view("<u4")[:, 0]
+        payload = offsets + VALUE_RECORD.size
+        if numpy.all(types == FLOAT) or numpy.all(types == INT):
+            dtype = "<f8" if types[0] == FLOAT else "<i8"
+            return self.data[payload + numpy.arange(8)].copy().view(dtype)[:, 0]
+        if numpy.all(counts == counts[0]):
+            for vector_types, dtype in (((VECTOR, TUPLE_VECTOR), "<f8"), ((INT_VECTOR, INT_TUPLE_VECTOR), "<i8")):
+                if numpy.all(numpy.isin(types, vector_types)):
+                    count = int(counts[0])
+                    return self.data[payload + numpy.arange(8 * count)].copy().view(dtype).reshape(len(offsets), count)
+        if numpy.all(types == STRING_ID):
+            return numpy.array(self.strings, dtype=object)[counts]
+        values = numpy.empty(len(offsets), dtype=object)
+        for i, offset in enumerate(offsets[:, 0]):
+            values[i] = self.decode(offset)[0]
+        return values
+
+    def portValues(self, model, port, category=None, start=None, end=None):
+        """
+        Extract the messages on a port of a model
+
+        :param model: full name of the model
+        :param port: name of the port
+        :param category: 'I' or 'O' to only select messages on input or output ports, or None
+        :param start: minimal time of the messages (inclusive), or None
+        :param end: maximal time of the messages (inclusive), or None
+        :returns: tuple -- array of the times and array of the messages (see *gather*)
+        """
+        numpy = self.numpy
+        events = self.eventIndices(model, start, end)
+        if model is None:
+            # Position of the selected events in the order of time
+            position = numpy.full(len(self.events), -1, dtype=numpy.int64)
+            position[events] = numpy.arange(len(events))
+            rows = self.messages[position[self.messages["event"]] >= 0]
+            rows = rows[numpy.argsort(position[rows["event"]], kind="stable")]
+        else:
+            # The events of a model are consecutive rows, as are their messages
+            first, last = (events[0], events[-1] + 1) if len(events) else (0, 0)
+            rows = self.messages[numpy.searchsorted(self.messages["event"], first, side="left"):
+                                 numpy.searchsorted(self.messages["event"], last, side="left")]
+        mask = rows["port"] == self.string_ids.get(port, -1)
+        if category is not None:
+            mask &= rows["category"] == CATEGORIES.index(category)
+        rows = rows[mask]
+        return self.events["time"][rows["event"]], self.gather(rows["offset"])
+
+    def states(self, model, start=None, end=None):
+        """
+        Extract the states of a model
+
+        :param model: full name of the model
+        :param start: minimal time (inclusive), or None
+        :param end: maximal time (inclusive), or None
+        :returns: tuple -- array of the times and array of the states (see *gather*)
+        """
+        rows = self.events[self.eventIndices(model, start, end)]
+        return rows["time"], self.gather(rows["offset"].astype(self.numpy.int64) + STATE_OFFSET)
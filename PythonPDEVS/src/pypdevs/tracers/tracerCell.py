@@ -14,7 +14,7 @@
 # limitations under the License.
 
 from pypdevs.tracers.tracerBase import BaseTracer
-from pypdevs.util import runTraceAtController, toStr
+from pypdevs.util import traceAtController
 from pypdevs.activityVisualisation import visualizeMatrix
 import sys
 
@@ -75,13 +75,13 @@ class TracerCell(BaseTracer):
         :param t: time at which it should be traced
         """
         try:
-            runTraceAtController(self.server, 
+            traceAtController(self.server, 
                                  self.uid, 
                                  aDEVS, 
                                  [aDEVS.x, 
                                     aDEVS.y, 
                                     t, 
-                                    toStr(aDEVS.state.toCellState())])
+                                    str(aDEVS.state.toCellState())])
         except AttributeError:
             pass
 
@@ -92,13 +92,13 @@ class TracerCell(BaseTracer):
         :param aDEVS: the model that transitioned
         """
         try:
-            runTraceAtController(self.server, 
+            traceAtController(self.server, 
                                  self.uid, 
                                  aDEVS, 
                                  [aDEVS.x, 
                                     aDEVS.y, 
                                     aDEVS.time_last, 
-                                    toStr(aDEVS.state.toCellState())])
+                                    str(aDEVS.state.toCellState())])
         except AttributeError:
             pass
 
@@ -109,13 +109,13 @@ class TracerCell(BaseTracer):
         :param aDEVS: the model that transitioned
         """
         try:
-            runTraceAtController(self.server, 
+            traceAtController(self.server, 
                                  self.uid, 
                                  aDEVS, 
                                  [aDEVS.x, 
                                     aDEVS.y, 
                                     aDEVS.time_last, 
-                                    toStr(aDEVS.state.toCellState())])
+                                    str(aDEVS.state.toCellState())])
         except AttributeError:
             pass
 
@@ -126,13 +126,13 @@ class TracerCell(BaseTracer):
         :param aDEVS: the model that transitioned
         """
         try:
-            runTraceAtController(self.server, 
+            traceAtController(self.server, 
                                  self.uid, 
                                  aDEVS, 
                                  [aDEVS.x, 
                                     aDEVS.y, 
                                     aDEVS.time_last, 
-                                    toStr(aDEVS.state.toCellState())])
+                                    str(aDEVS.state.toCellState())])
         except AttributeError as e:
             print(e)
             pass
@@ -14,7 +14,7 @@
 # limitations under the License.
 
 from pypdevs.tracers.tracerBase import BaseTracer
-from pypdevs.util import runTraceAtController, toStr, DEVSException
+from pypdevs.util import traceAtController, DEVSException
 from math import floor
 
 class VCDRecord(object):
@@ -193,32 +193,32 @@ class TracerVCD(BaseTracer):
 
         :param aDEVS: the model that transitioned
         """
-        name = toStr(aDEVS.getModelFullName())
+        name = aDEVS.getModelFullName()
         for I in range(len(aDEVS.IPorts)):
             port_name = aDEVS.IPorts[I].getPortName()
             signal_bag = aDEVS.my_input.get(aDEVS.IPorts[I], [])
             if signal_bag is not None:
                 for port_signal in signal_bag:
-                    runTraceAtController(self.server, 
+                    traceAtController(self.server, 
                                          self.uid, 
                                          aDEVS, 
                                          [name, 
                                             aDEVS.time_last, 
-                                            toStr(port_name), 
-                                            toStr(port_signal)])
+                                            str(port_name), 
+                                            str(port_signal)])
         for I in range(len(aDEVS.OPorts) ):
             if aDEVS.OPorts[I] in aDEVS.my_output:
                 port_name = aDEVS.OPorts[I].getPortName()
                 signal_bag = aDEVS.my_output.get(aDEVS.OPorts[I], [])
                 if signal_bag is not None:
                     for port_signal in signal_bag:
-                        runTraceAtController(self.server, 
+                        traceAtController(self.server, 
                                              self.uid, 
                                              aDEVS, 
                                              [name, 
                                                 aDEVS.time_last, 
-                                                toStr(port_name), 
-                                                toStr(port_signal)])
+                                                str(port_name), 
+                                                str(port_signal)])
 
     def traceInternal(self, aDEVS):
         """
@@ -226,20 +226,20 @@ class TracerVCD(BaseTracer):
 
         :param aDEVS: the model that transitioned
         """
-        name = toStr(aDEVS.getModelFullName())
+        name = aDEVS.getModelFullName()
         for I in range(0, len(aDEVS.OPorts) ):
             if aDEVS.OPorts[I] in aDEVS.my_output:
                 port_name = aDEVS.OPorts[I].getPortName()
                 signal_bag = aDEVS.my_output.get(aDEVS.OPorts[I], [])
                 if signal_bag is not None:
                     for port_signal in signal_bag:
-                        runTraceAtController(self.server, 
+                        traceAtController(self.server, 
                                              self.uid, 
                                              aDEVS, 
                                              [name, 
                                                 aDEVS.time_last, 
-                                                toStr(port_name), 
-                                                toStr(port_signal)])
+                                                str(port_name), 
+                                                str(port_signal)])
 
     def traceExternal(self, aDEVS):
         """
@@ -247,19 +247,19 @@ class TracerVCD(BaseTracer):
 
         :param aDEVS: the model that transitioned
         """
-        name = toStr(aDEVS.getModelFullName())
+        name = aDEVS.getModelFullName()
         for I in range(len(aDEVS.IPorts)):
             port_name = aDEVS.IPorts[I].getPortName()
             signal_bag = aDEVS.my_input.get(aDEVS.IPorts[I], [])
             if signal_bag is not None:
                 for port_signal in signal_bag:
-                    runTraceAtController(self.server, 
+                    traceAtController(self.server, 
                                          self.uid, 
                                          aDEVS, 
                                          [name, 
                                             aDEVS.time_last, 
-                                            toStr(port_name), 
-                                            toStr(port_signal)])
+                                            str(port_name), 
+                                            str(port_signal)])
 
     def traceInit(self, aDEVS, t):
         """
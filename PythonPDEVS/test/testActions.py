@@ -70,18 +70,27 @@ class TestActions(unittest.TestCase):
 
     def test_actions_perform(self):
         self.sim.gvt = 0
+        # Tracer that crashes when it traces a 'crash' (a division by zero)
+        class CrashTracer(object):
+            def __init__(self):
+                self.traced = []
+            def trace(self, value):
+                if value == "crash":
+                    1/0
+                self.traced.append(value)
+        tracer = CrashTracer()
+        self.sim.tracers.tracers.append(tracer)
         plist = []
         # Should not need to be added in correct order!
-        # Those that should not be executed contain faulty code 
-        #  (a division by zero)
-        plist.append([(0, 0), "model1", "pass"])
-        plist.append([(3, 1), "model2", "pass"])
-        plist.append([(2, 1), "model3", "pass"])
-        plist.append([(2, 1), "model1", "pass"])
-        plist.append([(6, 4), "model2", "1/0"])
-        plist.append([(4, 3), "model1", "pass"])
-        plist.append([(8, 2), "model1", "1/0"])
-        plist.append([(9, 9), "model3", "1/0"])
+        # Those that should not be executed trace a crash
+        plist.append([(0, 0), "model1", (0, ["a"])])
+        plist.append([(3, 1), "model2", (0, ["d"])])
+        plist.append([(2, 1), "model3", (0, ["c"])])
+        plist.append([(2, 1), "model1", (0, ["b"])])
+        plist.append([(6, 4), "model2", (0, ["crash"])])
+        plist.append([(4, 3), "model1", (0, ["e"])])
+        plist.append([(8, 2), "model1", (0, ["crash"])])
+        plist.append([(9, 9), "model3", (0, ["crash"])])
 
         plist2 = []
         # Should be in this exact order, otherwise this part was sorted too
@@ -98,9 +107,11 @@ class TestActions(unittest.TestCase):
             self.fail("Executed too much code") 
 
         self.assertTrue(self.sim.actions == plist2)
+        # Sorted on time, then on the traced arguments
+        self.assertTrue(tracer.traced == ["a", "b", "c", "d", "e"])
 
-        # Now execute a command that should crash, to make sure that 
-        #  this code is executed and not just deleted
+        # Now perform an action that should crash, to make sure that 
+        #  this action is performed and not just deleted
         try:
             self.sim.performActions(7)
             self.fail("Didn't execute desired code") #pragma: nocover
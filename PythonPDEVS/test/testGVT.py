@@ -14,6 +14,7 @@
 # limitations under the License.
 
 from testutils import *
+import pickle
 from pypdevs.basesimulator import BaseSimulator
 from pypdevs.util import DEVSException
 from pypdevs.DEVS import RootDEVS
@@ -33,6 +34,16 @@ class StubRootDEVS(RootDEVS):
         models[num].model_id = num
         RootDEVS.__init__(self, [models[num]], models, scheduler)
 
+class CountingGenerator(Generator):
+    def __init__(self):
+        Generator.__init__(self)
+        self.transitions = 0
+
+    def intTransition(self):
+        # Not part of the state, so not restored on a revert
+        self.transitions += 1
+        return Generator.intTransition(self)
+
 class TestGVT(unittest.TestCase):
     def setUp(self):
         self.sim = basicSim()
@@ -137,3 +148,93 @@ class TestGVT(unittest.TestCase):
             pass
         # GVT shouldn't have changed
         self.assertTrue(self.sim.gvt == 5)
+
+    def test_setGVT_delta(self):
+        self.sim.gvt = 0
+        model = Generator()
+        from pypdevs.statesavers import DeltaState
+        # Save the states of 4 internal transitions, as changes to the previously saved state
+        previous = None
+        for t in range(4):
+            model.state.generated = t
+            previous = DeltaState((t, 1), (t + 1, 1), model.state, 0, {}, 0, previous)
+            model.old_states.append(previous)
+        self.assertTrue(model.old_states[0].previous is None)
+        self.assertTrue(list(model.old_states[2].changes) == ["generated"])
+        self.assertTrue(model.old_states[1].loadState().generated == 1)
+        self.assertTrue(model.old_states[1].loadState().counter == 1.0)
+        self.sim.model = StubRootDEVS([model], 0)
+        # Prevent a loop
+        self.sim.next_LP = self.sim
+        self.sim.setGVT(2, [], False)
+        # The first state that is kept no longer refers to the fossil collected states
+        self.assertTrue(len(model.old_states) == 3)
+        self.assertTrue(model.old_states[0].previous is None)
+        self.assertTrue([s.loadState().generated for s in model.old_states] == [1, 2, 3])
+        # Reverting continues the changes from the state reverted to
+        model.revert((2, 1), False)
+        self.assertTrue(model.state.generated == 1)
+        model.state.value = 5
+        saved = DeltaState((2, 1), (3, 1), model.state, 0, {}, 0, model.old_states[-1])
+        self.assertTrue(sorted(saved.changes) == ["value"])
+        self.assertTrue(saved.loadState().value == 5 and saved.loadState().generated == 1)
+
+    def test_setGVT_infrequent(self):
+        self.sim.gvt = 0
+        self.sim.max_state_interval = 3
+        model = Generator()
+        self.sim.model = StubRootDEVS([model], 0)
+        model.old_states.append(self.sim.state_saver(model.time_last, model.time_next, model.state, 0.0, {}, 0.0))
+        self.sim.state_memory_budget = 6
+        self.sim.event_gvt = threading.Event()
+        self.sim.getProxy = lambda rank: self.sim
+        for t in range(1, 9):
+            self.sim.massAtomicTransitions({model: 1}, (t, 1))
+        from pypdevs.statesavers import TransitionRecord
+        # Recorded transitions count for the budget too
+        self.assertTrue(self.sim.saved_states == 8)
+        self.assertTrue(self.sim.early_gvt_requested)
+        self.assertTrue(self.sim.event_gvt.isSet())
+        # Saved every 2, then every 3 transitions, the others are only recorded
+        records = [isinstance(s, TransitionRecord) for s in model.old_states]
+        self.assertTrue(records == [False, False, True, False, True, True, False, True, True])
+        self.assertTrue([model.loadSavedState(s).generated for s in model.old_states] == list(range(9)))
+        # Replaying does not touch the model itself
+        self.assertTrue(model.state.generated == 8)
+        # Prevent a loop
+        self.sim.next_LP = self.sim
+        self.sim.setGVT(5, [], False)
+        # The last saved state before the GVT is kept to replay from
+        self.assertTrue([s.time_last[0] for s in model.old_states] == [3, 4, 5, 6, 7, 8])
+        self.assertTrue(self.sim.saved_states == 6)
+        self.assertFalse(self.sim.early_gvt_requested)
+        model.revert((5, 1), False)
+        self.assertTrue(model.state.generated == 4)
+        self.assertTrue(model.time_next == model.old_states[-1].time_next)
+        # Rolled back, so the state is saved more often
+        self.assertTrue(model.state_interval == 1)
+        self.assertTrue(model.unsaved_transitions == 1)
+
+    def test_setGVT_infrequent_replay(self):
+        self.sim.gvt = 0
+        self.sim.max_state_interval = 3
+        model = CountingGenerator()
+        self.sim.model = StubRootDEVS([model], 0)
+        model.old_states.append(self.sim.state_saver(model.time_last, model.time_next, model.state, 0.0, {}, 0.0))
+        for t in range(1, 7):
+            self.sim.massAtomicTransitions({model: 1}, (t, 1))
+        from pypdevs.statesavers import TransitionRecord
+        records = [s for s in model.old_states if isinstance(s, TransitionRecord)]
+        self.assertTrue(len(records) == 3)
+        # The records do not refer to the model, so they do not pull it into a pickle
+        for record in records:
+            self.assertFalse(hasattr(record, "model"))
+        self.assertTrue(pickle.loads(pickle.dumps(records[-1])).loadState(model).generated == 5)
+        self.assertTrue([model.loadSavedState(s).generated for s in model.old_states] == list(range(7)))
+        # Replaying the transitions does not touch the attributes of the model
+        self.assertTrue(model.transitions == 6)
+        self.assertTrue(len(model.old_states) == 7)
+        self.assertTrue(model.my_input == {})
+        model.revert((5, 1), False)
+        self.assertTrue(model.state.generated == 4)
+        self.assertTrue(model.transitions == 6)
@@ -88,7 +88,20 @@ class TestHelpers(unittest.TestCase):
     def test_DEVSException(self):
         self.assertTrue(str(DEVSException("ABC")) == "DEVS Exception: ABC")
 
-    def test_easyCommand(self):
-        self.assertTrue(easyCommand("abc", []) == "abc()")
-        self.assertTrue(easyCommand("abc", ["1", "def"]) == "abc(1, def)")
-        self.assertTrue(easyCommand("abc", ["'def'"]) == "abc('def')")
+
+    def test_pickle_flattened(self):
+        from pypdevs.DEVS import directConnect, routingTable
+        import pickle
+        model = AutoDistChain(3, totalAtomics=500, iterations=1)
+        model.finalize("", 0, [], defaultdict(list), [])
+        model.component_set = directConnect(model.component_set, {})
+        model.flattenConnections()
+        # The routing tables refer to the models directly, so they are not pickled
+        data = pickle.loads(pickle.dumps(model, pickle.HIGHEST_PROTOCOL))
+        data.unflattenConnections()
+        for atomic in data.component_set:
+            for port in atomic.OPorts:
+                self.assertFalse(hasattr(port, "routing_table"))
+                self.assertTrue([(inport, host) for inport, host, _ in routingTable(port)] == 
+                                [(inport, inport.host_DEVS) for inport, _ in port.routing_outline])
+        self.assertTrue(len(data.component_set) == 501)
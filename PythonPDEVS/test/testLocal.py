@@ -70,6 +70,77 @@ class TestLocal(unittest.TestCase):
             print("XML trace comparison did not match")
             self.fail()
 
+    def test_local_binary(self):
+        removeFile("devstrace.xml")
+        removeFile("devstrace.pdt")
+        try:
+            runLocal("binary")
+        except OSError:
+            pass
+        # The binary trace contains the same events as the XML trace
+        if not binaryEqual("devstrace.pdt", "devstrace.xml"):
+            print("Binary trace comparison did not match")
+            self.fail()
+
+    def test_local_binary_values(self):
+        from pypdevs.tracers.tracerBinary import TracerBinary, BinaryTrace, encodeValue, encodeState
+        class StubServer(object):
+            def getName(self):
+                return 0
+        values = [None, True, 3, 2**60+1, 2**70, 1.5, "abc",
+                  [1.0, 2.5], (1.0, 2.5), [1, 2], (1, 2), [2**60+1], [2**63], [1, 2.5], [],
+                  (), [True, False], {"a": 1}]
+        removeFile("devstrace.pdt")
+        tracer = TracerBinary(0, StubServer(), "devstrace.pdt")
+        tracer.startTracer(False)
+        for i, value in enumerate(values):
+            tracer.trace("model", (float(i), 1), 1, [("outport", 1, [encodeValue(value)])], encodeState(None))
+        tracer.stopTracer()
+        tracer.binary_file.close()
+        trace = BinaryTrace("devstrace.pdt")
+        read = [event["ports"][0][2][0] for event in trace.iterEvents()]
+        for value, read_value in zip(values, read):
+            self.assertEqual(type(value), type(read_value))
+            self.assertEqual(value, read_value)
+        self.assertEqual(len(values), len(read))
+        # Vectors of the same length are extracted as a matrix of their element type
+        _, vectors = trace.portValues("model", "outport", start=9.0, end=10.0)
+        self.assertEqual(vectors.dtype.kind, "i")
+        self.assertEqual(vectors.tolist(), [[1, 2], [1, 2]])
+        del trace
+        removeFile("devstrace.pdt")
+
+    def test_local_binary_index(self):
+        from pypdevs.tracers.tracerBinary import TracerBinary, BinaryTrace, encodeValue, encodeState
+        class StubServer(object):
+            def getName(self):
+                return 0
+        removeFile("devstrace.pdt")
+        tracer = TracerBinary(0, StubServer(), "devstrace.pdt")
+        tracer.startTracer(False)
+        for i in range(30):
+            model = ["c", "a", "b"][i % 3]
+            tracer.trace(model, (float(i // 2), 1), 1, [("outport", 1, [encodeValue(i)])], encodeState(i))
+        # Without the index, which is rebuilt by scanning the trace
+        tracer.binary_file.flush()
+        traces = [BinaryTrace("devstrace.pdt")]
+        tracer.stopTracer()
+        tracer.binary_file.close()
+        traces.append(BinaryTrace("devstrace.pdt"))
+        for trace in traces:
+            self.assertEqual(trace.models(), ["c", "a", "b"])
+            self.assertEqual([event["state"] for event in trace.iterEvents()], list(range(30)))
+            self.assertEqual([event["state"] for event in trace.iterEvents("a", 3.0, 7.0)], [7, 10, 13])
+            self.assertEqual(trace.times(None, 13.5, 14.0).tolist(), [14.0, 14.0])
+            self.assertEqual(trace.times("b", 20.0).tolist(), [])
+            self.assertEqual(trace.states("b", end=4.0)[1].tolist(), [2, 5, 8])
+            times, values = trace.portValues("c", "outport", start=10.0)
+            self.assertEqual(times.tolist(), [10.0, 12.0, 13.0])
+            self.assertEqual(values.tolist(), [21, 24, 27])
+            self.assertEqual(trace.portValues(None, "outport", start=13.0)[1].tolist(), [26, 27, 28, 29])
+        del trace, traces
+        removeFile("devstrace.pdt")
+
     def test_local_stateStop(self):
         self.assertTrue(runLocal("stateStop"))
 
@@ -145,6 +216,29 @@ class TestLocal(unittest.TestCase):
            not filecmp.cmp("output/run2", "expected/run2"):
             self.fail()
 
+    def test_local_fork(self):
+        removeFile("output/run1")
+        removeFile("output/fork1")
+        removeFile("output/fork2")
+        removeFile("output/sequential1")
+        removeFile("output/sequential2")
+
+        try:
+            runLocal("fork")
+        except OSError:
+            pass
+        # Continue the simulation in the same process, as a reference
+        try:
+            runLocal("sequentialfork")
+        except OSError:
+            pass
+
+        # Both continuations are identical to continuing the simulation
+        if not filecmp.cmp("output/run1", "output/sequential1", shallow=False) or \
+           not filecmp.cmp("output/fork1", "output/sequential2", shallow=False) or \
+           not filecmp.cmp("output/fork2", "output/sequential2", shallow=False):
+            self.fail()
+
 def runLocal(name):
     outfile = "output/" + str(name)
     removeFile(outfile)
@@ -0,0 +1,93 @@
+# Copyright 2014 Modelling, Simulation and Design Lab (MSDL) at 
+# McGill University and the University of Antwerp (http://msdl.cs.mcgill.ca/)
+# 
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from testutils import *
+import subprocess
+import filecmp
+import shutil
+import sys
+
+class TestMultiprocessing(unittest.TestCase):
+    def setUp(self):
+        setLogger('None', ('localhost', 514), logging.WARN)
+
+    def tearDown(self):
+        pass
+
+    def test_multiprocessing_normal(self):
+        self.assertTrue(runMultiprocessing("normal"))
+
+    def test_multiprocessing_dual(self):
+        self.assertTrue(runMultiprocessing("dual"))
+
+    def test_multiprocessing_dualdepth(self):
+        self.assertTrue(runMultiprocessing("dualdepth"))
+
+    def test_multiprocessing_confluent(self):
+        self.assertTrue(runMultiprocessing("confluent"))
+
+    def test_multiprocessing_zeroLookahead(self):
+        self.assertTrue(runMultiprocessing("zeroLookahead"))
+
+    def test_multiprocessing_stateStop(self):
+        self.assertTrue(runMultiprocessing("stateStop"))
+
+    def test_multiprocessing_longtime(self):
+        self.assertTrue(runMultiprocessing("longtime"))
+
+    def test_multiprocessing_conservative(self):
+        self.assertTrue(runMultiprocessing("conservative"))
+
+    def test_multiprocessing_conservative_dual(self):
+        self.assertTrue(runMultiprocessing("conservative_dual"))
+
+    def test_multiprocessing_failure(self):
+        # A failing process stops all others
+        proc = subprocess.Popen([sys.executable, "-m", "pypdevs.multiprocessingMPI", "-n", "3", 
+                                 "testmodels/experiment.py", "unknown_experiment"], 
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.assertTrue(proc.wait() != 0)
+
+    def test_multiprocessing_environment(self):
+        # The variables of the launcher do not leak to the processes started by the simulation kernels
+        script = "output/environment.py"
+        with open(script, "w") as f:
+            f.write("import os, sys, subprocess\n"
+                    "from pypdevs.multiprocessingMPI import MPI, RANK_VARIABLE\n"
+                    "assert MPI.COMM_WORLD is not None and RANK_VARIABLE not in os.environ\n"
+                    "sys.exit(subprocess.call([sys.executable, '-c', 'from pypdevs.multiprocessingMPI import MPI; "
+                    "assert MPI.COMM_WORLD is None']))\n")
+        proc = subprocess.Popen([sys.executable, "-m", "pypdevs.multiprocessingMPI", "-n", "2", script],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        code = proc.wait()
+        removeFile(script)
+        self.assertTrue(code == 0)
+
+def runMultiprocessing(name, processes = 3):
+    # The distributed simulation should be identical to the local simulation
+    outfile = "output/" + str(name)
+    removeFile(outfile)
+    proc = subprocess.Popen([sys.executable, "testmodels/experiment.py", str(name) + "_local"], 
+                            stdout=subprocess.DEVNULL)
+    proc.wait()
+    shutil.move(outfile, outfile + "_local")
+    proc = subprocess.Popen([sys.executable, "-m", "pypdevs.multiprocessingMPI", "-n", str(processes), 
+                             "testmodels/experiment.py", str(name)], 
+                            stdout=subprocess.DEVNULL)
+    if proc.wait() != 0:
+        return False
+    equal = filecmp.cmp(outfile, outfile + "_local")
+    removeFile(outfile + "_local")
+    return equal
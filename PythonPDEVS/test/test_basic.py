@@ -29,6 +29,7 @@ from testLocal import TestLocal
 from testTermination import TestTermination
 from testTestUtils import TestTestUtils
 from testLogger import TestLogger
+from testMultiprocessing import TestMultiprocessing
 
 if __name__ == '__main__':
     local = unittest.TestLoader().loadTestsFromTestCase(TestLocal)
@@ -42,6 +43,7 @@ if __name__ == '__main__':
     mscheduler = unittest.TestLoader().loadTestsFromTestCase(TestMessageScheduler)
     testutils = unittest.TestLoader().loadTestsFromTestCase(TestTestUtils)
     logger = unittest.TestLoader().loadTestsFromTestCase(TestLogger)
+    multiprocessing = unittest.TestLoader().loadTestsFromTestCase(TestMultiprocessing)
 
     allTests = unittest.TestSuite()
     allTests.addTest(testutils)
@@ -54,5 +56,6 @@ if __name__ == '__main__':
     allTests.addTest(scheduler)
     allTests.addTest(logger)
     allTests.addTest(local)
+    allTests.addTest(multiprocessing)
 
     unittest.TextTestRunner(verbosity=2, failfast=True).run(allTests)
@@ -94,6 +94,16 @@ elif mn == "allocate":
     model = models.Chain(0.66)
 elif mn == "normal_local":
     model = models.Chain_local(0.66)
+elif mn == "conservative":
+    model = models.Chain(0.66)
+    args["setConservative"] = [0.30]
+elif mn == "conservative_local":
+    model = models.Chain_local(0.66)
+elif mn == "conservative_dual":
+    model = models.DualChain(0.66)
+    args["setConservative"] = [0.30]
+elif mn == "conservative_dual_local":
+    model = models.DualChain_local(0.66)
 elif mn == "zeroLookahead":
     model = models.Chain(0.00)
 elif mn == "zeroLookahead_local":
@@ -210,6 +220,13 @@ elif mn == "trace_local":
     model = models.Binary_local()
     args["setVCD"] = ["devstrace.vcd"]
     args["setXML"] = ["devstrace.xml"]
+elif mn.startswith("binary"):
+    if "local" in mn:
+        model = models.Binary_local()
+    else:
+        model = models.Binary()
+    args["setXML"] = ["devstrace.xml"]
+    args["setBinary"] = ["devstrace.pdt"]
 elif mn == "fetch":
     model = models.Chain(0.66)
     args["setFetchAllAfterSimulation"] = []
@@ -301,6 +318,28 @@ elif mn.startswith("continue"):
     sim.setTerminationTime(200.0)
     sim.simulate()
     run = False
+elif mn.startswith("fork") or mn.startswith("sequentialfork"):
+    if "local" in mn:
+        sim = Simulator(models.Chain_local(0.66))
+    else:
+        sim = Simulator(models.Chain(0.66))
+    sim.setVerbose("output/run1" if mn.startswith("fork") else "output/sequential1")
+    sim.setTerminationTime(100.0)
+    sim.simulate()
+    def continuation(filename):
+        def configure(sim):
+            sim.setModelStateAttr(sim.model.generator.generator, "value", 2)
+            sim.setVerbose(filename)
+            sim.setTerminationTime(200.0)
+        return configure
+    if mn.startswith("fork"):
+        sim.forkSimulate([continuation("output/fork1"), continuation("output/fork2")], 2)
+    else:
+        # The same continuation in this process, as a reference for the forked ones
+        sim.removeTracers()
+        continuation("output/sequential2")(sim)
+        sim.simulate()
+    run = False
 elif mn.startswith("z"):
     if "local" in mn:
         model = models.ZChain_local()
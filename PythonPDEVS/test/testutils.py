@@ -67,6 +67,33 @@ def vcdEqual(f1, f2):
         line += 1
     return True
 
+def binaryEqual(binary_file, xml_file):
+    # Compare the events of a binary trace to those of an XML trace of the same simulation
+    import xml.etree.ElementTree as ET
+    from pypdevs.tracers.tracerBinary import BinaryTrace
+    xml_events = []
+    for event in ET.parse(xml_file).getroot().findall("event"):
+        ports = [(port.get("name"), port.get("category"), [m.text for m in port.findall("message")])
+                 for port in event.findall("port")]
+        xml_events.append((event.find("model").text,
+                           float(event.find("time").text),
+                           event.find("kind").text,
+                           [port for port in ports if port[2]],
+                           "".join(event.find("state").itertext()).strip()))
+    binary_events = [(event["model"],
+                      event["time"],
+                      event["kind"],
+                      [(name, category, [str(m) for m in messages]) for name, category, messages in event["ports"]],
+                      str(event["state"]))
+                     for event in BinaryTrace(binary_file).iterEvents()]
+    if len(xml_events) != len(binary_events):
+        return False
+    # The XML state also contains the XML representation of the state, followed by its string representation
+    for e1, e2 in zip(xml_events, binary_events):
+        if e1[:4] != e2[:4] or not e1[4].endswith(e2[4]):
+            return False
+    return True
+
 def removeFile(f1):
     try:
         os.remove(f1)
@@ -83,6 +110,9 @@ def basicSim():
         def getProxy(self, name):
             return None
 
+        def flushQueuedMessages(self):
+            pass
+
     setLogger('None', ('localhost', 514), logging.WARN)
     sim = StubController(0)
     # Kernels doesn't really matter in the tests, though use a value > 1 to prevent localised optimisations
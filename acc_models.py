@@ -99,6 +99,10 @@ class Vehicle(AtomicDEVS):
 
         self.VEHICLE_STATE = self.addOutPort(name="vehicle_state")
 
+        # PAYLOADS:
+        #  Declare how output messages are encoded when exported as FMU (see port_codecs.py):
+        self.port_codecs = {"vehicle_state": "struct:3d"}
+
     def extTransition(self, inputs):
         """
         External Transition Function.
@@ -244,6 +248,10 @@ class Generator(AtomicDEVS):
         #  (usually store returned references in local variables):
         self.UPDATE_STATE = self.addOutPort(name="update_state")
 
+        # PAYLOADS:
+        #  Declare how output messages are encoded when exported as FMU (see port_codecs.py):
+        self.port_codecs = {"update_state": "struct:d"}
+
     def extTransition(self, inputs):
         """
         External Transition Function.
@@ -372,6 +380,10 @@ class Sine(AtomicDEVS):
         #  (usually store returned references in local variables):
         self.VALUE = self.addOutPort(name="value")
 
+        # PAYLOADS:
+        #  Declare how output messages are encoded when exported as FMU (see port_codecs.py):
+        self.port_codecs = {"value": "struct:d"}
+
     def extTransition(self, inputs):
         """
         External Transition Function.
@@ -508,6 +520,10 @@ class SpeedController(AtomicDEVS):
 
         self.OUTPUT = self.addOutPort(name="output")
 
+        # PAYLOADS:
+        #  Declare how output messages are encoded when exported as FMU (see port_codecs.py):
+        self.port_codecs = {"output": "struct:d"}
+
     def extTransition(self, inputs):
         """
         External Transition Function.
@@ -686,6 +702,10 @@ class SupervisorPID(AtomicDEVS):
 
         self.OUTPUT = self.addOutPort(name="output")
 
+        # PAYLOADS:
+        #  Declare how output messages are encoded when exported as FMU (see port_codecs.py):
+        self.port_codecs = {"output": "struct:d"}
+
     def extTransition(self, inputs):
         """
         External Transition Function.
@@ -801,6 +821,7 @@ class EgoVehicle(CoupledDEVS):
         # Declare the coupled model's output ports:
         self.UPDATE_A_WANTED = self.addInPort(name="update_a_wanted")
         self.VEHICLE_STATE = self.addOutPort(name="vehicle_state")
+        self.port_codecs = {"vehicle_state": "struct:3d"}
 
         # Declare the coupled model's sub-models:
 
@@ -827,6 +848,7 @@ class LeadVehicle(CoupledDEVS):
 
         # Declare the coupled model's output ports:
         self.VEHICLE_STATE = self.addOutPort(name="vehicle_state")
+        self.port_codecs = {"vehicle_state": "struct:3d"}
 
         # Declare the coupled model's sub-models:
 
@@ -0,0 +1,67 @@
+"""
+2025-SIMULATION-DEVS-FMI3.0
+Copyright (C) 2025 Cosys-lab, University of Antwerp
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from pypdevs.DEVS import CoupledDEVS
+import importlib
+
+
+class ClusterDEVS(CoupledDEVS):
+    """
+    Coupled model grouping a subset of the components of a larger coupled model, so that they can be exported as a
+    single FMU. All arguments are plain data, so the cluster can be re-created from the generated FMU code.
+    """
+
+    def __init__(self, name=None, components=None, connections=None, in_ports=None, out_ports=None):
+        """
+        :param name: Name of the cluster
+        :param components: List of (name, module, class name, init kwargs) of the components
+        :param connections: List of (source component, port attribute, destination component, port attribute) of the
+                            connections between components of the cluster
+        :param in_ports: Dict of input port name to the list of (component, port attribute) it is connected to
+        :param out_ports: Dict of output port name to the (component, port attribute) connected to it
+        """
+        # Always call parent class' constructor FIRST:
+        CoupledDEVS.__init__(self, name)
+
+        # Stored for extract_model_init_args
+        self.components = components or []
+        self.connections = connections or []
+        self.in_ports = in_ports or {}
+        self.out_ports = out_ports or {}
+
+        # Declare the sub-models
+        models = {}
+        for component_name, module_name, class_name, kwargs in self.components:
+            model_class = getattr(importlib.import_module(module_name), class_name)
+            models[component_name] = self.addSubModel(model_class(name=component_name, **kwargs))
+
+        # Connect the sub-models
+        for source, source_port, destination, destination_port in self.connections:
+            self.connectPorts(getattr(models[source], source_port), getattr(models[destination], destination_port))
+
+        # Ports for connections crossing the cluster boundary, stored as attributes so they are exported
+        for port_name, destinations in self.in_ports.items():
+            port = self.addInPort(port_name)
+            setattr(self, port_name, port)
+            for component_name, port_attribute in destinations:
+                self.connectPorts(port, getattr(models[component_name], port_attribute))
+
+        for port_name, (component_name, port_attribute) in self.out_ports.items():
+            port = self.addOutPort(port_name)
+            setattr(self, port_name, port)
+            self.connectPorts(getattr(models[component_name], port_attribute), port)
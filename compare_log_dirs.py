@@ -19,7 +19,19 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 import os
 import math
 import ast
+import json
+import time
+import itertools
 import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from trace_reader import iter_extracted_events
+
+# Default relative tolerance of math.isclose, also used by the vectorized comparison
+REL_TOL = 1e-9
+
+# Number of events of both logs that are extracted and compared at once
+CHUNK_SIZE = 4096
 
 # Note: this script was generated using ChatGPT (o1)
 def is_float(s: str) -> bool:
@@ -111,156 +123,211 @@ def compare_values(val1, val2, abs_tol=1e-6):
     return val1 == val2
 
 
-def compare_xml_events(events1, events2, abs_tol=1e-6):
+def close_arrays(a, b, abs_tol=1e-6):
+    """Vectorized floats_close (math.isclose, with its default relative tolerance) of two float arrays."""
+    with np.errstate(invalid="ignore"):
+        diff = np.abs(a - b)
+        tol = np.maximum(REL_TOL * np.maximum(np.abs(a), np.abs(b)), abs_tol)
+        return (a == b) | (np.isfinite(diff) & (diff <= tol))
+
+
+def compare_event_chunk(events1, events2, offset=0, abs_tol=1e-6):
     """
-    Compare two lists of <event> elements from run1 and run2.
-    Returns True if all events match (within tolerance), otherwise False.
-    Also returns a list of mismatch messages.
+    Compare two equally long lists of extracted events (see EventExtractor), offset is the index of the first events.
+    Times and numeric messages are compared vectorized. Returns the list of mismatch messages, in the order of the
+    events and ports.
     """
-    mismatches = []
+    time_close = close_arrays(np.fromiter((e[1] for e in events1), float, len(events1)),
+                              np.fromiter((e[1] for e in events2), float, len(events2)), abs_tol=abs_tol)
+
+    mismatches = []  # (event, port, message), port -1 for mismatches of the event itself
+    numeric = []  # (event, port, value1, value2) of the numeric messages, checked at once
+    values1 = []
+    values2 = []
+    owners = []
+
+    for i, (e1, e2) in enumerate(zip(events1, events2), offset):
+        model1, time1, kind1, mode1, ports1 = e1
+        model2, time2, kind2, mode2, ports2 = e2
+        if model1 != model2:
+            mismatches.append((i, -1, f"Event {i}: model mismatch ({model1} vs {model2})"))
+        elif not time_close[i - offset]:
+            mismatches.append((i, -1, f"Event {i}: time mismatch ({time1} vs {time2})"))
+        elif kind1 != kind2:
+            mismatches.append((i, -1, f"Event {i}: kind mismatch ({kind1} vs {kind2})"))
+        elif mode1 != mode2:
+            mismatches.append((i, -1, f"Event {i}: mode mismatch ({mode1} vs {mode2})"))
+        elif len(ports1) != len(ports2):
+            mismatches.append((i, -1, f"Event {i}: number of ports differ ({len(ports1)} vs {len(ports2)})"))
+        else:
+            for p_idx, ((name1, cat1, msg1), (name2, cat2, msg2)) in enumerate(zip(ports1, ports2)):
+                if name1 != name2:
+                    mismatches.append((i, p_idx, f"Event {i}, Port {p_idx}: name mismatch ({name1} vs {name2})"))
+                    continue
+                if cat1 != cat2:
+                    mismatches.append((i, p_idx, f"Event {i}, Port {p_idx}: category mismatch ({cat1} vs {cat2})"))
+                    continue
+
+                # Identical messages match, unless they contain a NaN (which is not close to itself)
+                if msg1 == msg2 and "nan" not in msg1.lower():
+                    continue
+
+                # Parse messages as numeric or list-of-numerics if possible
+                val1 = parse_floats_in_string(msg1)
+                val2 = parse_floats_in_string(msg2)
+
+                if isinstance(val1, float) and isinstance(val2, float):
+                    values1.append(val1)
+                    values2.append(val2)
+                    owners.append(len(numeric))
+                    numeric.append((i, p_idx, val1, val2))
+                elif (isinstance(val1, list) and isinstance(val2, list) and len(val1) == len(val2) and
+                      all(isinstance(v, float) for v in val1) and all(isinstance(v, float) for v in val2)):
+                    values1 += val1
+                    values2 += val2
+                    owners += [len(numeric)] * len(val1)
+                    numeric.append((i, p_idx, val1, val2))
+                elif not compare_values(val1, val2, abs_tol=abs_tol):
+                    mismatches.append((i, p_idx, f"Event {i}, Port {p_idx}: message mismatch ({val1} vs {val2})"))
+
+    if numeric:
+        close = close_arrays(np.array(values1, dtype=float), np.array(values2, dtype=float), abs_tol=abs_tol)
+        for owner in np.unique(np.asarray(owners)[~close]):
+            i, p_idx, val1, val2 = numeric[owner]
+            mismatches.append((i, p_idx, f"Event {i}, Port {p_idx}: message mismatch ({val1} vs {val2})"))
+        mismatches.sort(key=lambda mismatch: mismatch[:2])
+
+    return [mismatch for _, _, mismatch in mismatches]
+
+
+def compare_xml_events(events1, events2, abs_tol=1e-6, stop_at_first=False, chunk_size=CHUNK_SIZE):
+    """
+    Compare two sequences (or streams, see iter_extracted_events) of extracted events from run1 and run2.
+    Returns True if all events match (within tolerance), otherwise False.
+    Also returns a list of mismatch messages. If the number of events differ, that is the only mismatch reported.
 
-    if len(events1) != len(events2):
-        mismatches.append(f"Number of events differ: {len(events1)} vs {len(events2)}")
-        return False, mismatches
+    The events are compared in chunks of chunk_size events.
 
-    for i, (e1, e2) in enumerate(zip(events1, events2)):
-        # Compare <model>
-        model1 = e1.find("model").text.strip() if e1.find("model") is not None else ""
-        model2 = e2.find("model").text.strip() if e2.find("model") is not None else ""
-        if model1 != model2:
-            mismatches.append(f"Event {i}: model mismatch ({model1} vs {model2})")
-            continue
-
-        # Compare <time> with floating-point tolerance
-        time1_str = e1.find("time").text.strip() if e1.find("time") is not None else "0.0"
-        time2_str = e2.find("time").text.strip() if e2.find("time") is not None else "0.0"
-
-        time1 = float(time1_str) if is_float(time1_str) else 0.0
-        time2 = float(time2_str) if is_float(time2_str) else 0.0
-
-        if not floats_close(time1, time2, abs_tol=abs_tol):
-            mismatches.append(f"Event {i}: time mismatch ({time1} vs {time2})")
-            continue
-
-        # Compare <kind>
-        kind1 = e1.find("kind").text.strip() if e1.find("kind") is not None else ""
-        kind2 = e2.find("kind").text.strip() if e2.find("kind") is not None else ""
-        if kind1 != kind2:
-            mismatches.append(f"Event {i}: kind mismatch ({kind1} vs {kind2})")
-            continue
-
-        # Compare <mode> within <state>
-        state1_elem = e1.find("state")
-        state2_elem = e2.find("state")
-
-        mode1 = ""
-        mode2 = ""
-
-        if state1_elem is not None:
-            mode1_elem = state1_elem.find("mode")
-            if mode1_elem is not None and mode1_elem.text:
-                mode1 = mode1_elem.text.strip()
-
-        if state2_elem is not None:
-            mode2_elem = state2_elem.find("mode")
-            if mode2_elem is not None and mode2_elem.text:
-                mode2 = mode2_elem.text.strip()
-
-        if mode1 != mode2:
-            mismatches.append(f"Event {i}: mode mismatch ({mode1} vs {mode2})")
-            continue
-
-        # Compare <port> elements (order is assumed to be consistent)
-        ports1 = e1.findall("port")
-        ports2 = e2.findall("port")
-        if len(ports1) != len(ports2):
-            mismatches.append(f"Event {i}: number of ports differ ({len(ports1)} vs {len(ports2)})")
-            continue
-
-        for p_idx, (p1, p2) in enumerate(zip(ports1, ports2)):
-            name1 = p1.get("name", "").strip()
-            name2 = p2.get("name", "").strip()
-            if name1 != name2:
-                mismatches.append(f"Event {i}, Port {p_idx}: name mismatch ({name1} vs {name2})")
-                continue
-
-            cat1 = p1.get("category", "").strip()
-            cat2 = p2.get("category", "").strip()
-            if cat1 != cat2:
-                mismatches.append(f"Event {i}, Port {p_idx}: category mismatch ({cat1} vs {cat2})")
-                continue
-
-            msg1_elem = p1.find("message")
-            msg2_elem = p2.find("message")
-            msg1_str = msg1_elem.text.strip() if (msg1_elem is not None and msg1_elem.text) else ""
-            msg2_str = msg2_elem.text.strip() if (msg2_elem is not None and msg2_elem.text) else ""
-
-            # Parse messages as numeric or list-of-numerics if possible
-            val1 = parse_floats_in_string(msg1_str)
-            val2 = parse_floats_in_string(msg2_str)
-
-            # Compare values with tolerance if numeric
-            if not compare_values(val1, val2, abs_tol=abs_tol):
-                mismatches.append(f"Event {i}, Port {p_idx}: message mismatch ({val1} vs {val2})")
-                continue
+    :param stop_at_first: Stop at the first mismatching chunk, when only the verdict is needed.
+    """
+    mismatches = []
+    events1 = iter(events1)
+    events2 = iter(events2)
+    count1 = count2 = 0
+
+    while True:
+        chunk1 = list(itertools.islice(events1, chunk_size))
+        chunk2 = list(itertools.islice(events2, chunk_size))
+        length = min(len(chunk1), len(chunk2))
+        mismatches += compare_event_chunk(chunk1[:length], chunk2[:length], count1, abs_tol=abs_tol)
+        count1 += len(chunk1)
+        count2 += len(chunk2)
+        if len(chunk1) != len(chunk2):
+            # Count the remaining events
+            count1 += sum(1 for _ in events1)
+            count2 += sum(1 for _ in events2)
+            break
+        if not chunk1 or (stop_at_first and mismatches):
+            break
+
+    if count1 != count2:
+        return False, [f"Number of events differ: {count1} vs {count2}"]
 
     # If we have no mismatches, everything matched (within tolerance)
     return (len(mismatches) == 0), mismatches
 
 
-def compare_two_logs(file1, file2, abs_tol=1e-6):
+def compare_two_logs(file1, file2, abs_tol=1e-6, stop_at_first=False):
     """
-    Compare the events in file1 vs file2.
+    Compare the events in file1 vs file2, streaming both files.
     Return True if match (within tolerance), else False.
     Also return a list of mismatch details.
-    """
-    # Parse XML logs
-    tree1 = ET.parse(file1)
-    tree2 = ET.parse(file2)
-
-    root1 = tree1.getroot()
-    root2 = tree2.getroot()
 
-    # We assume the <event> nodes are direct children of <trace>, but adapt if needed
-    events1 = root1.findall("event")
-    events2 = root2.findall("event")
-
-    # Compare
-    matched, mismatches = compare_xml_events(events1, events2, abs_tol=abs_tol)
-    return matched, mismatches
+    :param stop_at_first: Stop at the first mismatches, when only the verdict is needed.
+    """
+    # We assume the <event> nodes are direct children of <trace>
+    return compare_xml_events(iter_extracted_events(file1), iter_extracted_events(file2), abs_tol=abs_tol,
+                              stop_at_first=stop_at_first)
 
 
-def compare_log_dirs(run1_dir, run2_dir, abs_tol=1e-6):
+def compare_log_file(run1_dir, run2_dir, xml_file, abs_tol=1e-6, stop_at_first=False):
     """
-    Compare all .xml log files in run1_dir with those in run2_dir.
-    Print comparison results.
+    Compare a log file of run1_dir with the one of run2_dir, returns its entry of the report (see compare_log_dirs).
     """
-    match = True
-
-    # Gather all .xml files in run1_dir
-    run1_files = [f for f in os.listdir(run1_dir) if f.endswith(".xml")]
-
-    # Compare
-    for xml_file in run1_files:
-        file1 = os.path.join(run1_dir, xml_file)
-        file2 = os.path.join(run2_dir, xml_file)
-
-        # Ensure file2 exists
-        if not os.path.isfile(file2):
-            print(f"WARNING: {xml_file} not found in {run2_dir}. Skipping.")
-            continue
+    start = time.perf_counter()
+    file2 = os.path.join(run2_dir, xml_file)
+    if not os.path.isfile(file2):
+        return {"file": xml_file, "status": "missing", "mismatches": [], "seconds": 0.0}
+    try:
+        matched, mismatches = compare_two_logs(os.path.join(run1_dir, xml_file), file2, abs_tol=abs_tol,
+                                               stop_at_first=stop_at_first)
+        status = "match" if matched else "diff"
+    except ET.ParseError as e:
+        status, mismatches = "error", [f"Invalid XML: {e}"]
+    return {"file": xml_file, "status": status, "mismatches": mismatches, "seconds": time.perf_counter() - start}
 
-        matched, mismatches = compare_two_logs(file1, file2, abs_tol=abs_tol)
 
-        if matched:
-            print(f"[MATCH] {xml_file}")
+def compare_log_dirs_report(run1_dir, run2_dir, abs_tol=1e-6, stop_at_first=False, processes=None):
+    """
+    Compare all .xml log files in run1_dir with those in run2_dir, in parallel.
+
+    :param stop_at_first: Stop at the first mismatches, when only the verdict is needed. Files that were not compared
+                          yet are left out of the report.
+    :param processes: Number of worker processes (defaults to the number of CPUs, 1 compares in this process).
+    :return: Report dict with 'match' (True if all files present in both directories match), 'run1_dir',
+             'run2_dir', 'abs_tol' and 'files': the list of dicts with the 'file' name, its 'status' ('match',
+             'diff', 'missing' (in run2_dir) or 'error'), 'mismatches' (messages) and 'seconds', sorted by name.
+    """
+    # Gather all .xml files in run1_dir, the largest first to balance the workers
+    run1_files = sorted((f for f in os.listdir(run1_dir) if f.endswith(".xml")),
+                        key=lambda f: -os.path.getsize(os.path.join(run1_dir, f)))
+
+    processes = min(processes or os.cpu_count() or 1, max(len(run1_files), 1))
+    files = []
+    if processes == 1:
+        for xml_file in run1_files:
+            files.append(compare_log_file(run1_dir, run2_dir, xml_file, abs_tol, stop_at_first))
+            if stop_at_first and files[-1]["status"] in ("diff", "error"):
+                break
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [executor.submit(compare_log_file, run1_dir, run2_dir, xml_file, abs_tol, stop_at_first)
+                       for xml_file in run1_files]
+            for future in as_completed(futures):
+                files.append(future.result())
+                if stop_at_first and files[-1]["status"] in ("diff", "error"):
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    break
+
+    files.sort(key=lambda entry: entry["file"])
+    return {"match": all(entry["status"] in ("match", "missing") for entry in files),
+            "run1_dir": run1_dir, "run2_dir": run2_dir, "abs_tol": abs_tol, "files": files}
+
+
+def compare_log_dirs(run1_dir, run2_dir, abs_tol=1e-6, stop_at_first=False, processes=None, report_path=None):
+    """
+    Compare all .xml log files in run1_dir with those in run2_dir (see compare_log_dirs_report).
+    Print comparison results, and write the report as JSON to report_path if given.
+    Returns True if all files match.
+    """
+    report = compare_log_dirs_report(run1_dir, run2_dir, abs_tol=abs_tol, stop_at_first=stop_at_first,
+                                     processes=processes)
+
+    for entry in report["files"]:
+        if entry["status"] == "missing":
+            print(f"WARNING: {entry['file']} not found in {run2_dir}. Skipping.")
+        elif entry["status"] == "match":
+            print(f"[MATCH] {entry['file']}")
         else:
-            match = False
-            print(f"[DIFF]  {xml_file}")
-            for mm in mismatches:
+            print(f"[DIFF]  {entry['file']}")
+            for mm in entry["mismatches"]:
                 print(f"    - {mm}")
 
-    return match
+    if report_path is not None:
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    return report["match"]
 
 if __name__ == "__main__":
     # Example usage:
@@ -20,7 +20,6 @@ import os
 import json
 from fmi_importer import (Importer)
 from logger import CSVLogger
-from plot_acc_system_fmi import plot
 
 
 def load_coupling_model(coupled_model_dir):
@@ -39,37 +38,62 @@ def load_coupling_model(coupled_model_dir):
     return data
 
 
-def run_fmi_simulation(model_dir):
-    coupling = load_coupling_model(model_dir)
-
-    # Instantiate the example (PDEVS) importer
-    importer = Importer()
+def add_coupled_model(importer, model_dir, coupling, verbose=False):
+    """
+    Add the FMUs (from their extracted source directories) and the connections of a coupled model to the importer.
 
+    :return: The FMU instances by component name, and the variables logged by default (the states of the components
+             and the connected output data)
+    """
     model_fmus = {}
     log_variables = []
 
-    # Now we can access any field in coupling_data
-    print("Root model:", coupling["root_model"])
-
-    print("\nComponents:")
+    if verbose:
+        print("\nComponents:")
     for comp in coupling["components"]:
-        print("  - Name:", comp["name"])
-        print("    FMU: ", comp["fmu"])
-        print("    Source:", comp["source"])
+        if verbose:
+            print("  - Name:", comp["name"])
+            print("    FMU: ", comp["fmu"])
+            print("    Source:", comp["source"])
         fmu = importer.add_fmu(os.path.join(model_dir, comp["source"]), instance_name=comp["name"])
         model_fmus[comp["name"]] = fmu
         log_variables.append(fmu.get_model_variable_by_name('state'))
 
-    print("\nConnections:")
+    if verbose:
+        print("\nConnections:")
     for conn in coupling["connections"]:
-        print(f"  - {conn['source_model']}:{conn['source_port']} --> "
-              f"{conn['dest_model']}:{conn['dest_port']}")
+        if verbose:
+            print(f"  - {conn['source_model']}:{conn['source_port']} --> "
+                  f"{conn['dest_model']}:{conn['dest_port']}")
         importer.add_external_relation_by_names(model_fmus[conn['source_model']], conn['source_port'],
                                                 model_fmus[conn['dest_model']], conn['dest_port'])
         importer.add_external_relation_by_names(model_fmus[conn['source_model']], f"{conn['source_port']}_data",
                                                 model_fmus[conn['dest_model']], f"{conn['dest_port']}_data")
         log_variables.append(model_fmus[conn['source_model']].get_model_variable_by_name(f"{conn['source_port']}_data"))
 
+    return model_fmus, log_variables
+
+
+def run_fmi_simulation(model_dir, multiplexed=False):
+    """
+    :param multiplexed: Run all FMU instances in a single backend process (see fmu_host.py), instead of one backend
+                        process per instance.
+    """
+    coupling = load_coupling_model(model_dir)
+
+    host = None
+    if multiplexed:
+        from fmu_host import FMUHost
+        host = FMUHost(os.path.join(model_dir, coupling["components"][0]["source"], "resources"))
+
+    # Instantiate the example (PDEVS) importer
+    importer = Importer(host=host)
+
+    # Now we can access any field in coupling_data
+    print("Root model:", coupling["root_model"])
+
+    model_fmus, log_variables = add_coupled_model(importer, model_dir, coupling, verbose=True)
+
     os.makedirs('.\\traces', exist_ok=True)
     logger = CSVLogger(f'.\\traces\\{coupling["root_model"]}_fmi.csv', log_variables=log_variables)
     importer.add_logger(logger)
@@ -79,9 +103,14 @@ def run_fmi_simulation(model_dir):
 
     # Terminate the simulation to free the FMU instances
     importer.terminate()
+    if host is not None:
+        host.close()
 
 
 def run_fmi_simulation_and_plot():
+    # Imported here, so the simulation functions can be used (e.g. by ensemble workers) without loading matplotlib
+    from plot_acc_system_fmi import plot
+
     # Run the ACC system simulation
     run_fmi_simulation('.\\generated\\acc_system')
 
@@ -22,17 +22,21 @@ import os
 from plot_acc_system_pypdevs import plot
 
 
+def create_acc_system():
+    return AdaptiveCruiseControlSystem(name="adaptive_cruise_control",
+                                       lead_vehicle_interval=0.1,
+                                       ego_vehicle_interval=0.1,
+                                       controller_interval=0.1,
+                                       supervisor_interval=0.1,
+                                       supervisor_Kp=1.0,
+                                       supervisor_Kd=0.05,
+                                       controller_Kp=4.0,
+                                       controller_Kd=1.0)
+
+
 def run_pypdevs_simulation(trace_file):
     # Instantiate the model
-    cruise_control = AdaptiveCruiseControlSystem(name="adaptive_cruise_control",
-                                                 lead_vehicle_interval=0.1,
-                                                 ego_vehicle_interval=0.1,
-                                                 controller_interval=0.1,
-                                                 supervisor_interval=0.1,
-                                                 supervisor_Kp=1.0,
-                                                 supervisor_Kd=0.05,
-                                                 controller_Kp=4.0,
-                                                 controller_Kd=1.0)
+    cruise_control = create_acc_system()
 
     # Set up the simulator
     sim = Simulator(cruise_control)
@@ -40,14 +44,58 @@ def run_pypdevs_simulation(trace_file):
     # Set up end time
     sim.setTerminationTime(80.0)
 
-    # Set up logging
-    sim.setXML(trace_file)
+    # Set up logging, a '.pdt' trace file is written in the binary trace format
+    if trace_file.endswith(".pdt"):
+        sim.setBinary(trace_file)
+    else:
+        sim.setXML(trace_file)
     sim.setVerbose(None)
 
     # Simulate
     sim.simulate()
 
 
+def run_pypdevs_scenarios(trace_dir, fork_time, scenarios, stop_time=80.0, processes=None):
+    """
+    Simulate scenarios that only differ after fork_time: the simulation until fork_time is shared, after which every
+    scenario continues from its state in a worker process (see Simulator.forkSimulate).
+
+    :param trace_dir: Directory of the trace until fork_time (shared.xml) and the traces after fork_time of every
+                      scenario (scenario_<i>.xml). The model logs of every scenario are copied to logs/scenario_<i>.
+    :param fork_time: Simulation time at which the scenarios start to differ.
+    :param scenarios: List of functions modifying the model at fork_time, called with the simulator and the model, e.g.
+                      lambda sim, model: sim.setModelAttribute(model.controller, "Kp", 2.0)
+    :param stop_time: Simulation stop time of every scenario.
+    :param processes: Number of worker processes (defaults to the number of CPUs).
+    :return: For every scenario, a dict of the full name of every atomic model to its final state.
+    """
+    os.makedirs(trace_dir, exist_ok=True)
+    cruise_control = create_acc_system()
+    sim = Simulator(cruise_control)
+
+    # Shared part
+    sim.setTerminationTime(fork_time)
+    sim.setXML(os.path.join(trace_dir, "shared.xml"))
+    sim.simulate()
+
+    def continuation(index, scenario):
+        def configure(sim):
+            for model in sim.model.component_set:
+                model.redirectLog(os.path.join("logs", "scenario_%d" % index))
+            scenario(sim, cruise_control)
+            sim.setTerminationTime(stop_time)
+            sim.setXML(os.path.join(trace_dir, "scenario_%d.xml" % index))
+            return finish
+
+        def finish(sim):
+            for model in sim.model.component_set:
+                model.closeLog()
+
+        return configure
+
+    return sim.forkSimulate([continuation(index, scenario) for index, scenario in enumerate(scenarios)], processes)
+
+
 def run_pypdevs_simulation_and_plot():
     os.makedirs('.\\traces', exist_ok=True)
     trace_file = '.\\traces\\acc_system_pypdevs.xml'
@@ -27,8 +27,21 @@ import os
 from xml.etree import ElementTree as ET
 import inspect
 from pypdevs.DEVS import Port
+from port_codecs import DEFAULT_CODEC, get_codec
+from cluster_devs import ClusterDEVS
 import json
 from io import BytesIO
+import re
+import ast
+import importlib
+import hashlib
+import functools
+from concurrent.futures import ProcessPoolExecutor
+import compileall
+import py_compile
+import subprocess
+import sys
+import math
 
 
 def beautify_xml(xml_string):
@@ -79,11 +92,182 @@ def initialize_template_environment(template_dir):
     return Environment(loader=FileSystemLoader(template_dir))
 
 
-def setup_model_directory(source_dir, destination_dir):
-    """Create the model directory by copying the source template."""
+# Runtime bundled in the resources of every FMU, unless it is exported with a shared or slim runtime
+RUNTIME_ENTRIES = ["pypdevs", "schemas", "devs_wrapper.py", "port_codecs.py", "logging_atomic_devs.py"]
+
+# File in the resources of an FMU using a shared runtime, containing the path to the runtime relative to the resources
+SHARED_RUNTIME_FILE = "shared_runtime.txt"
+
+
+def setup_model_directory(source_dir, destination_dir, runtime="bundled"):
+    """Create the model directory by copying the source template (without the runtime, unless it is bundled)."""
+    source_resources_dir = os.path.normpath(os.path.join(source_dir, "resources"))
+
+    def ignore(directory, names):
+        ignored = {name for name in names if name == "__pycache__"}
+        if runtime != "bundled" and os.path.normpath(directory) == source_resources_dir:
+            ignored.update(name for name in names if name in RUNTIME_ENTRIES)
+        return ignored
+
     if os.path.exists(destination_dir):
         shutil.rmtree(destination_dir)  # Remove existing directory if it exists
-    shutil.copytree(source_dir, destination_dir)  # Copy the source directory to the destination
+    shutil.copytree(source_dir, destination_dir, ignore=ignore)  # Copy the source directory to the destination
+
+
+def export_shared_runtime(source_dir, output_dir):
+    """
+    Copy the runtime into a versioned directory '<output_dir>/runtime/<version>', to be shared by FMUs exported with
+    runtime="shared". Returns the path of the runtime directory.
+    """
+    source_resources_dir = os.path.join(source_dir, "resources")
+    version = get_directory_digest(source_resources_dir, RUNTIME_ENTRIES)[:12]
+    runtime_dir = os.path.join(output_dir, "runtime", version)
+    if not os.path.isdir(runtime_dir):
+        os.makedirs(os.path.dirname(runtime_dir), exist_ok=True)
+        staging_dir = f"{runtime_dir}.{os.getpid()}"
+        os.makedirs(staging_dir)
+        for entry in RUNTIME_ENTRIES:
+            path = os.path.join(source_resources_dir, entry)
+            if os.path.isdir(path):
+                shutil.copytree(path, os.path.join(staging_dir, entry),
+                                ignore=shutil.ignore_patterns("__pycache__"))
+            elif os.path.isfile(path):
+                shutil.copy(path, staging_dir)
+        precompile_sources(staging_dir)
+        os.rename(staging_dir, runtime_dir)
+        print(f"Shared runtime exported to: {runtime_dir}")
+    return runtime_dir
+
+
+def link_shared_runtime(destination_dir, runtime_dir):
+    """Point the backend of the FMU to the shared runtime, by its path relative to the resources directory."""
+    resources_dir = os.path.join(destination_dir, "resources")
+    with open(os.path.join(resources_dir, SHARED_RUNTIME_FILE), "w") as f:
+        f.write(os.path.relpath(runtime_dir, resources_dir).replace(os.sep, "/"))
+
+
+def find_module_file(module_name, search_dirs):
+    """Return the source file of a module (or package) in one of the search directories, or None."""
+    parts = module_name.split(".")
+    for search_dir in search_dirs:
+        for candidate in (os.path.join(search_dir, *parts) + ".py", os.path.join(search_dir, *parts, "__init__.py")):
+            if os.path.isfile(candidate):
+                return candidate
+    return None
+
+
+def find_imported_files(source_files, search_dirs):
+    """
+    Return all source files in the search directories imported (directly or indirectly, including imports inside
+    functions) by the given source files, including the __init__.py of the packages involved.
+    """
+    found = set()
+    worklist = [(source_file, None) for source_file in source_files]
+    while worklist:
+        source_file, module_name = worklist.pop()
+        if source_file in found:
+            continue
+        found.add(source_file)
+        package = module_name if source_file.endswith("__init__.py") else (module_name or "").rpartition(".")[0]
+
+        with open(source_file, encoding="utf-8") as f:
+            tree = ast.parse(f.read())
+        imported = []
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                imported.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                base = node.module or ""
+                if node.level:
+                    base_package = ".".join(package.split(".")[:len(package.split(".")) - node.level + 1])
+                    base = f"{base_package}.{base}" if base else base_package
+                imported.append(base)
+                # 'from package import module'
+                imported.extend(f"{base}.{alias.name}" for alias in node.names)
+
+        for name in imported:
+            parts = name.split(".")
+            # Importing a module also imports its parent packages
+            for i in range(1, len(parts) + 1):
+                imported_name = ".".join(parts[:i])
+                imported_file = find_module_file(imported_name, search_dirs)
+                if imported_file is not None:
+                    worklist.append((imported_file, imported_name))
+    return found
+
+
+def copy_slim_runtime(source_dir, destination_dir):
+    """Copy only the runtime modules imported (directly or indirectly) by the backend and the generated model."""
+    source_resources_dir = os.path.abspath(os.path.join(source_dir, "resources"))
+    resources_dir = os.path.abspath(os.path.join(destination_dir, "resources"))
+
+    source_files = [os.path.join(resources_dir, name) for name in os.listdir(resources_dir) if name.endswith(".py")]
+    for source_file in find_imported_files(source_files, [resources_dir, source_resources_dir]):
+        if os.path.commonpath([source_file, source_resources_dir]) != source_resources_dir:
+            continue
+        relative_path = os.path.relpath(source_file, source_resources_dir)
+        if relative_path.split(os.sep)[0] not in RUNTIME_ENTRIES:
+            continue
+        os.makedirs(os.path.join(resources_dir, os.path.dirname(relative_path)), exist_ok=True)
+        shutil.copy(source_file, os.path.join(resources_dir, relative_path))
+
+    # Keep the licenses of the copied packages
+    for entry in RUNTIME_ENTRIES:
+        license_path = os.path.join(source_resources_dir, entry, "LICENSE")
+        if os.path.isfile(license_path) and os.path.isdir(os.path.join(resources_dir, entry)):
+            shutil.copy(license_path, os.path.join(resources_dir, entry))
+
+
+def precompile_sources(directory):
+    """
+    Compile all Python sources in the directory to bytecode, so FMU instances do not compile them on every start (the
+    resources are usually extracted to a fresh directory). Hash-based pycs stay valid when extracting changes the
+    modification times. The bytecode is specific to the Python version used for the export, other versions fall back
+    to the sources.
+    """
+    if not compileall.compile_dir(directory, quiet=1,
+                                  invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH):
+        raise RuntimeError(f"Failed to compile the sources in {directory}")
+
+
+def measure_import_times(destination_dir, top=10):
+    """
+    Import the backend of an exported FMU in a new interpreter with '-X importtime'. Returns the total import time and
+    the modules with the highest cumulative import times (in microseconds), raises a RuntimeError if the import fails.
+    """
+    resources_dir = os.path.join(destination_dir, "resources")
+    env = dict(os.environ)
+    shared_runtime_path = os.path.join(resources_dir, SHARED_RUNTIME_FILE)
+    if os.path.isfile(shared_runtime_path):
+        with open(shared_runtime_path) as f:
+            runtime_dir = os.path.normpath(os.path.join(resources_dir, f.read().strip()))
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [runtime_dir, env.get("PYTHONPATH")]))
+
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import backend, model"], cwd=resources_dir,
+                            env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to import the backend of {destination_dir}:\n{result.stderr}")
+
+    # Lines look like 'import time:       self [us] |  cumulative | imported package'
+    modules = []
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)", line)
+        if match:
+            modules.append({"module": match.group(4), "self": int(match.group(1)),
+                            "cumulative": int(match.group(2)), "top_level": len(match.group(3)) <= 1})
+    return {
+        "total": sum(module["cumulative"] for module in modules if module["top_level"]),
+        "modules": sorted(modules, key=lambda module: module["cumulative"], reverse=True)[:top]
+    }
+
+
+def verify_fmu(output_dir, model_name, top=10):
+    """Check that the backend of an exported FMU imports, and print an import time report."""
+    report = measure_import_times(os.path.join(output_dir, model_name), top)
+    print(f"Import time of {model_name}: {report['total'] / 1000:.1f} ms")
+    for module in report["modules"]:
+        print(f"  {module['cumulative'] / 1000:8.1f} ms  {module['module']}")
+    return report
 
 
 def parse_model_description(path):
@@ -121,8 +305,28 @@ def categorize_ports(obj):
     return in_ports, out_ports
 
 
-def prepare_model_variables(model, template_vars):
-    """Prepare model variables for the template using categorized ports."""
+def resolve_port_codecs(model, port_codecs=None, default_codec=DEFAULT_CODEC):
+    """
+    Determine the codec spec used to encode the events of each output port (by port name).
+
+    Codecs declared by the model in its 'port_codecs' attribute are overridden by those passed in port_codecs, ports
+    without a declared codec use default_codec. Input ports need no codec, encoded payloads are self-describing.
+    """
+    _, out_ports = categorize_ports(model)
+    declared = dict(getattr(model, "port_codecs", None) or {})
+    declared.update(port_codecs or {})
+
+    codecs = {}
+    for _, port in out_ports.items():
+        spec = declared.get(port.name, default_codec)
+        get_codec(spec)  # Raises a ValueError for unknown codecs
+        codecs[port.name] = spec
+
+    return codecs
+
+
+def prepare_model_variables(model, template_vars, out_port_codecs, parameters=()):
+    """Prepare model variables for the template using categorized ports and the parameters (see get_model_parameters)."""
     in_ports, out_ports = categorize_ports(model)  # Get categorized ports
     i = 2
     for _, port in in_ports.items():
@@ -138,24 +342,51 @@ def prepare_model_variables(model, template_vars):
             {"type": "Clock", "name": port.name, "value_reference": str(1000 + i), "causality": "output",
              "interval_variability": "triggered", "clocks": "1001"},
             {"type": "String", "name": f"{port.name}_data", "value_reference": str(i), "causality": "output",
-             "variability": "discrete", "clocks": str(1000 + i)}])
+             "variability": "discrete", "clocks": str(1000 + i),
+             "description": f"Events encoded with codec '{out_port_codecs[port.name]}'"}])
         template_vars["model_structure"]["outputs"].append({"value_reference": str(1000 + i), "dependencies": "1001"})
         i += 1
+    for j, (name, fmi_type, value) in enumerate(parameters):
+        template_vars["model_variables"].append(
+            {"type": fmi_type, "name": name, "value_reference": str(PARAMETER_VALUE_REFERENCE_OFFSET + j),
+             "causality": "parameter", "variability": "fixed",
+             "start": str(value).lower() if fmi_type == "Boolean" else repr(value),
+             "description": "Init arg of the model"})
+
+
+def get_model_classes(model):
+    """Return the class of the model and the classes of all its (nested) sub-models."""
+    classes = [type(model)]
+    for sub_model in getattr(model, "component_set", []):
+        for model_class in get_model_classes(sub_model):
+            if model_class not in classes:
+                classes.append(model_class)
+    return classes
+
+
+def get_model_source_files(model):
+    """Return the source files of the class of the model and of the classes of all its (nested) sub-models."""
+    source_files = []
+    for model_class in get_model_classes(model):
+        source_file = inspect.getfile(model_class)
+        if source_file not in source_files:
+            source_files.append(source_file)
+    return source_files
 
 
 def copy_model_source_file(model, destination_dir):
-    """Copy the source file of the model object to the resources directory."""
+    """Copy the source file(s) of the model object to the resources directory."""
     # Get the source file of the model
     try:
-        model_source_file = inspect.getfile(type(model))
         resources_dir = os.path.join(destination_dir, "resources")
 
         # Ensure resources directory exists
         os.makedirs(resources_dir, exist_ok=True)
 
-        # Copy the source file
-        shutil.copy(model_source_file, resources_dir)
-        print(f"Copied model source file to: {resources_dir}")
+        # Copy the source files
+        for model_source_file in get_model_source_files(model):
+            shutil.copy(model_source_file, resources_dir)
+            print(f"Copied model source file {os.path.basename(model_source_file)} to: {resources_dir}")
     except TypeError:
         print("The source file for the model could not be determined.")
     except FileNotFoundError:
@@ -200,7 +431,36 @@ def extract_model_init_args(model):
     return init_args
 
 
-def generate_python_file(model, init_info, destination_dir, env):
+# FMI types of the init args exposed as parameters
+PARAMETER_TYPES = {bool: "Boolean", int: "Int64", float: "Float64"}
+
+# Value reference of the first parameter
+PARAMETER_VALUE_REFERENCE_OFFSET = 2000
+
+
+def get_model_parameters(model, init_info=None):
+    """
+    Return the init args of the model exposed as FMU parameters, as (name, FMI type, value) tuples: all boolean and
+    (finite) numeric init args, explicitly set or default, except 'name' and args named like another variable.
+    Setting a parameter before initialization re-creates the wrapped model with the new value.
+    """
+    init_kwargs = init_info["kwargs"] if init_info and "kwargs" in init_info else extract_model_init_args(model)
+    reserved_names = {"time", "ta", "state", "state_binary"}
+    for port in model.IPorts + model.OPorts:
+        reserved_names.update((port.name, f"{port.name}_data"))
+
+    parameters = []
+    for param_name, param in inspect.signature(type(model).__init__).parameters.items():
+        if param_name in ("self", "name") or param_name in reserved_names:
+            continue
+        value = init_kwargs.get(param_name, param.default)
+        fmi_type = PARAMETER_TYPES.get(type(value))
+        if fmi_type is not None and math.isfinite(value):
+            parameters.append((param_name, fmi_type, value))
+    return parameters
+
+
+def generate_python_file(model, init_info, destination_dir, env, out_port_codecs, parameters=()):
     """Generate a Python file dynamically based on the model using categorized ports."""
     in_ports, out_ports = categorize_ports(model)  # Get categorized ports
     resources_dir = os.path.join(destination_dir, "resources")
@@ -222,51 +482,58 @@ def generate_python_file(model, init_info, destination_dir, env):
     # Ensure `name` is always included
     init_kwargs["name"] = "self.instance_name"  # Replace `name` with `self.instance_name`
 
-    # Format initialization arguments
-    init_args_string = ", ".join(
-        f"{key}={value!r}" if key != "name" else f"{key}={value}"  # Avoid quoting `self.instance_name`
-        for key, value in init_kwargs.items()
-    )
-
-    # Generate attributes and mappings for ports
-    attributes = []
-    # Default mapping
-    reference_to_attribute = {
-        999: "time",
-        1001: "ta",
-        1: "state",
-    }
-    in_port_to_attributes = {}
-    out_port_to_attributes = {}
+    # Generate the variable store of the model, the order of the fixed variables must match the index constants of
+    # the template (TIME, TA, STATE, STATE_BINARY)
+    variables = [
+        {"value_reference": 999, "name": "time", "start": "0.0"},
+        {"value_reference": 1001, "name": "ta", "start": "False"},
+        {"value_reference": 1, "name": "state", "start": "None"},
+        {"value_reference": 998, "name": "state_binary", "start": "None"},
+    ]
+    in_port_indices = {}
+    out_port_indices = {}
+    out_port_codec_specs = {}
+
+    def add_port_variables(port, i):
+        # Returns the indices of the clock and data variable of the port
+        variables.append({"value_reference": 1000 + i, "name": port.name, "start": "False"})
+        variables.append({"value_reference": i, "name": f"{port.name}_data", "start": "''"})
+        return len(variables) - 2, len(variables) - 1
 
     i = 2
     for attribute_name, port in in_ports.items():
-        attributes.append(f"self.{port.name} = False")
-        attributes.append(f"self.{port.name}_data = ''")
-        reference_to_attribute[1000 + i] = port.name
-        reference_to_attribute[i] = f"{port.name}_data"
-        in_port_to_attributes[f"self.DEVS_wrapper.model.{attribute_name}"] = (
-            f"{port.name}", f"{port.name}_data")
+        in_port_indices[f"self.DEVS_wrapper.model.{attribute_name}"] = add_port_variables(port, i)
         i += 1
 
     for attribute_name, port in out_ports.items():
-        attributes.append(f"self.{port.name} = False")
-        attributes.append(f"self.{port.name}_data = ''")
-        reference_to_attribute[1000 + i] = port.name
-        reference_to_attribute[i] = f"{port.name}_data"
-        out_port_to_attributes[f"self.DEVS_wrapper.model.{attribute_name}"] = (
-            f"{port.name}", f"{port.name}_data")
+        out_port_indices[f"self.DEVS_wrapper.model.{attribute_name}"] = add_port_variables(port, i)
+        out_port_codec_specs[f"self.DEVS_wrapper.model.{attribute_name}"] = out_port_codecs[port.name]
         i += 1
 
+    # Parameters are passed to the model from the variable store, so they can be changed before initialization
+    parameter_indices = []
+    for j, (name, _, value) in enumerate(parameters):
+        variables.append({"value_reference": PARAMETER_VALUE_REFERENCE_OFFSET + j, "name": name, "start": repr(value)})
+        parameter_indices.append(len(variables) - 1)
+        init_kwargs[name] = f"self.values[{len(variables) - 1}]"
+
+    # Format initialization arguments, without quoting `self.instance_name` and the parameters
+    parameter_names = {name for name, _, _ in parameters}
+    init_args_string = ", ".join(
+        f"{key}={value}" if key == "name" or key in parameter_names else f"{key}={value!r}"
+        for key, value in init_kwargs.items()
+    )
+
     # Render the template using Jinja2
     template_vars = {
         "model_module": model_module,
         "model_name": model_name,
         "init_args": init_args_string,
-        "attributes": "\n        ".join(attributes),
-        "reference_to_attribute": reference_to_attribute,
-        "in_port_to_attributes": in_port_to_attributes,
-        "out_port_to_attributes": out_port_to_attributes,
+        "variables": variables,
+        "in_port_indices": in_port_indices,
+        "out_port_indices": out_port_indices,
+        "out_port_codecs": {key: repr(spec) for key, spec in out_port_codec_specs.items()},
+        "parameter_indices": parameter_indices,
     }
     template = env.get_template("model_template.py.j2")
     rendered_content = template.render(template_vars)
@@ -303,12 +570,146 @@ def generate_fmu(model_name, template_vars, env, destination_dir, output_fmu_pat
     print(f"FMU generated at: {output_fmu_path}")
 
 
-def export_fmu(model, init_info=None, output_dir='./generated'):
+def get_directory_digest(directory, entries=None):
+    """Digest of the files in the directory (or only in the given entries of it), ignoring bytecode caches."""
+    digest = hashlib.sha256()
+    for entry in sorted(entries if entries is not None else os.listdir(directory)):
+        path = os.path.join(directory, entry)
+        walk = os.walk(path) if os.path.isdir(path) else [(directory, [], [entry])] if os.path.isfile(path) else []
+        for root, dirs, files in walk:
+            dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+            for file_name in sorted(files):
+                file_path = os.path.join(root, file_name)
+                digest.update(os.path.relpath(file_path, directory).encode("utf-8"))
+                with open(file_path, "rb") as f:
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def get_exporter_digest(template_dir='templates'):
+    """Digest of the exporter and all templates (including the common FMU files), computed once per process."""
+    digest = hashlib.sha256()
+    with open(__file__, "rb") as f:
+        digest.update(f.read())
+    digest.update(get_directory_digest(template_dir).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def get_model_source_digest(model):
+    """
+    Digest of the source code the model depends on. Top-level classes of the source files that are not used by the
+    model (or its sub-models) are left out, so a change to one model class only invalidates the FMUs using it.
+    """
+    used_classes = {}
+    for model_class in get_model_classes(model):
+        for base in inspect.getmro(model_class):
+            try:
+                used_classes.setdefault(inspect.getfile(base), set()).add(base.__name__)
+            except TypeError:
+                # Built-in class
+                pass
+
+    digest = hashlib.sha256()
+    for source_file in get_model_source_files(model):
+        with open(source_file, encoding="utf-8") as f:
+            source = f.read()
+        lines = source.splitlines(keepends=True)
+        for node in reversed(ast.parse(source).body):
+            if isinstance(node, ast.ClassDef) and node.name not in used_classes.get(source_file, ()):
+                start = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+                del lines[start - 1:node.end_lineno]
+        digest.update(os.path.basename(source_file).encode("utf-8"))
+        digest.update("".join(lines).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def get_runtime_label(runtime, output_dir, model_name, shared_runtime_dir=None, precompile=True):
+    """
+    Describe the runtime layout of an FMU, including the location of a shared runtime relative to the FMU and whether
+    the sources are precompiled.
+    """
+    label = runtime
+    if runtime == "shared":
+        label = f"shared:{os.path.relpath(shared_runtime_dir, os.path.join(output_dir, model_name, 'resources'))}"
+    if precompile:
+        label += f"+pyc:{sys.implementation.cache_tag}"
+    return label
+
+
+def get_build_digest(model, init_info, out_port_codecs, runtime_label="bundled"):
+    """
+    Digest identifying the FMU generated for the model: model source, init args, codecs, runtime layout, exporter and
+    templates.
+    """
+    init_kwargs = init_info["kwargs"] if init_info and "kwargs" in init_info else extract_model_init_args(model)
+    digest = hashlib.sha256()
+    for part in (model.name, get_model_source_digest(model), repr(sorted(init_kwargs.items())),
+                 repr(sorted(out_port_codecs.items())), runtime_label, get_exporter_digest()):
+        digest.update(part.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def get_export_digest(model, init_info, output_dir, out_port_codecs, runtime="bundled", shared_runtime_dir=None,
+                      precompile=True):
+    """Build digest of the FMU exported for the model to output_dir with the given runtime layout."""
+    runtime_label = get_runtime_label(runtime, output_dir, model.name, shared_runtime_dir, precompile)
+    return get_build_digest(model, init_info, out_port_codecs, runtime_label)
+
+
+def is_fmu_up_to_date(output_dir, model_name, build_digest):
+    """Check whether the FMU (and its source directory) in output_dir were generated with the given build digest."""
+    build_digest_path = os.path.join(output_dir, f"{model_name}.build_digest")
+    if not (os.path.isfile(os.path.join(output_dir, f"{model_name}.fmu"))
+            and os.path.isdir(os.path.join(output_dir, model_name)) and os.path.isfile(build_digest_path)):
+        return False
+    with open(build_digest_path) as f:
+        return f.read().strip() == build_digest
+
+
+def export_fmu(model, init_info=None, output_dir='./generated', port_codecs=None, default_codec=DEFAULT_CODEC,
+               force=False, runtime="bundled", shared_runtime_dir=None, precompile=True, verify=False):
+    """
+    Export a (atomic or coupled) PythonPDEVS model as an FMU.
+
+    The export is skipped when the FMU in output_dir was generated from the same model source, init args, codecs,
+    exporter and templates (see get_build_digest), unless force is set.
+
+    :param port_codecs: Optional codec spec per output port name (e.g. {"vehicle_state": "struct:3d"}), overriding
+                        the codecs declared in the 'port_codecs' attribute of the model. See port_codecs.py.
+    :param default_codec: Codec spec used for output ports without a declared codec.
+    :param force: Export even if the FMU is up to date.
+    :param runtime: How the runtime (pypdevs, schemas, DEVS wrapper, ...) is included in the FMU: "bundled" (a full copy
+                    in the resources), "slim" (only the modules imported by the backend and the model) or "shared" (no
+                    copy, the backend loads it from shared_runtime_dir, see export_shared_runtime). Shared FMUs are
+                    not portable: they only run next to the shared runtime, at the path written to
+                    shared_runtime.txt in their resources.
+    :param shared_runtime_dir: Shared runtime directory, defaults to a new shared runtime in output_dir.
+    :param precompile: Include the bytecode of the resources in the FMU (see precompile_sources).
+    :param verify: Check that the backend of the FMU imports and print an import time report (see verify_fmu).
+    :returns: True if the FMU was (re)generated, False if it was up to date
+    """
     source_dir = './templates/fmu_common'
     destination_dir = f"{output_dir}/{model.name}"
     output_fmu_path = f"{output_dir}/{model.name}.fmu"
     model_description_path = os.path.join(destination_dir, "modelDescription.xml")
 
+    # Resolve codecs before touching the output directory, unknown codecs raise a ValueError
+    out_port_codecs = resolve_port_codecs(model, port_codecs, default_codec)
+
+    if runtime not in ("bundled", "slim", "shared"):
+        raise ValueError(f"Unknown runtime '{runtime}'")
+    if runtime == "shared" and shared_runtime_dir is None:
+        shared_runtime_dir = export_shared_runtime(source_dir, output_dir)
+
+    build_digest = get_export_digest(model, init_info, output_dir, out_port_codecs, runtime, shared_runtime_dir,
+                                     precompile)
+    if not force and is_fmu_up_to_date(output_dir, model.name, build_digest):
+        print(f"FMU is up to date: {output_fmu_path}")
+        if verify:
+            verify_fmu(output_dir, model.name)
+        return False
+
     # Initialize template variables and environment
     env = initialize_template_environment('templates')
 
@@ -329,8 +730,8 @@ def export_fmu(model, init_info=None, output_dir='./generated'):
             "model_identifier": "unifmu",
             "needs_execution_tool": "true",
             "can_be_instantiated_only_once": "false",
-            "can_get_and_set_fmu_state": "false",
-            "can_serialize_fmu_state": "false",
+            "can_get_and_set_fmu_state": "true",
+            "can_serialize_fmu_state": "true",
             "can_handle_variable_communication_step_size": "true",
             "has_event_mode": "true"
         },
@@ -348,20 +749,160 @@ def export_fmu(model, init_info=None, output_dir='./generated'):
             {"type": "Clock", "name": "ta", "value_reference": "1001", "causality": "input",
              "interval_variability": "countdown"},
             {"type": "String", "name": "state", "value_reference": "1", "causality": "output",
-             "variability": "discrete"}
+             "variability": "discrete"},
+            {"type": "Binary", "name": "state_binary", "value_reference": "998", "causality": "output",
+             "variability": "discrete", "description": f"States of the wrapped models, encoded with codec "
+                                                       f"'{DEFAULT_CODEC}'"}
         ],
         "model_structure": {"outputs": []}
     }
 
     # Remove existing directory and generate FMU
-    setup_model_directory(source_dir, destination_dir)
-    prepare_model_variables(model, template_vars)
+    setup_model_directory(source_dir, destination_dir, runtime)
+    parameters = get_model_parameters(model, init_info)
+    prepare_model_variables(model, template_vars, out_port_codecs, parameters)
     copy_model_source_file(model, destination_dir)
-    generate_python_file(model, init_info, destination_dir, env)
+    generate_python_file(model, init_info, destination_dir, env, out_port_codecs, parameters)
+    if runtime == "slim":
+        copy_slim_runtime(source_dir, destination_dir)
+    elif runtime == "shared":
+        link_shared_runtime(destination_dir, shared_runtime_dir)
+    if precompile:
+        precompile_sources(os.path.join(destination_dir, "resources"))
     generate_fmu(model.name, template_vars, env, destination_dir, output_fmu_path)
 
+    # Only record the digest once the FMU is complete
+    with open(os.path.join(output_dir, f"{model.name}.build_digest"), "w") as f:
+        f.write(build_digest)
+    if verify:
+        verify_fmu(output_dir, model.name)
+    return True
+
 
-def export_coupled_model(coupled_model, output_dir=None):
+def export_fmu_from_init_args(model_module, model_name, init_kwargs, output_dir, port_codecs, default_codec, force,
+                              runtime, shared_runtime_dir, precompile):
+    """Re-create a model from its init args and export it, used to export models in worker processes."""
+    model_class = getattr(importlib.import_module(model_module), model_name)
+    return export_fmu(model_class(**init_kwargs), output_dir=output_dir, port_codecs=port_codecs,
+                      default_codec=default_codec, force=force, runtime=runtime,
+                      shared_runtime_dir=shared_runtime_dir, precompile=precompile)
+
+
+def get_connections(coupled_model):
+    """List the connections between the components of 'coupled_model', in the format of coupling.json."""
+    connections = []
+    for model in coupled_model.component_set:
+        # We traverse each model's OPorts (output ports)
+        for out_port in model.OPorts:
+            # 'outline' is the list of input ports this output port is connected to
+            for in_port in out_port.outline:
+                connections.append({
+                    "source_model": model.name,
+                    "source_port": out_port.name,
+                    "dest_model": in_port.host_DEVS.name,
+                    "dest_port": in_port.name
+                })
+    return connections
+
+
+def partition_components(coupled_model, k, event_rates=None):
+    """
+    Partition the components of 'coupled_model' into at most k clusters, minimizing the message traffic between
+    clusters. Starting from one cluster per component, the two clusters exchanging the most messages are merged
+    until k clusters remain.
+
+    :param event_rates: Optional observed event rate per (source model, source port), e.g. from a profiling run.
+                        Connections without a rate count as a rate of 1.
+    :returns: List of clusters, each a list of component names (in the order of 'component_set')
+    """
+    order = {model.name: i for i, model in enumerate(coupled_model.component_set)}
+    clusters = {name: [name] for name in order}  # Clusters by the name of their first component
+    k = max(1, k)
+
+    # Message traffic between each pair of clusters
+    traffic = {}
+    for connection in get_connections(coupled_model):
+        source, destination = connection["source_model"], connection["dest_model"]
+        if destination in clusters and destination != source:
+            pair = frozenset((source, destination))
+            rate = (event_rates or {}).get((source, connection["source_port"]), 1.0)
+            traffic[pair] = traffic.get(pair, 0.0) + rate
+
+    while len(clusters) > k:
+        if traffic:
+            # Heaviest pair, ties broken in favour of the earliest components
+            pair = max(traffic, key=lambda p: (traffic[p], -min(order[c] for c in p), -max(order[c] for c in p)))
+            keep, merged = sorted(pair, key=order.get)
+        else:
+            # No traffic left between clusters, merge the two smallest
+            keep, merged = sorted(sorted(clusters, key=lambda c: (len(clusters[c]), order[c]))[:2], key=order.get)
+
+        clusters[keep].extend(clusters.pop(merged))
+        for pair in [pair for pair in traffic if merged in pair]:
+            rate = traffic.pop(pair)
+            other = next(iter(pair - {merged}), merged)
+            if other != keep:
+                new_pair = frozenset((keep, other))
+                traffic[new_pair] = traffic.get(new_pair, 0.0) + rate
+
+    return [sorted(clusters[c], key=order.get) for c in sorted(clusters, key=order.get)]
+
+
+def create_cluster_model(coupled_model, name, members, default_codec=DEFAULT_CODEC):
+    """
+    Create a ClusterDEVS containing the components 'members' of 'coupled_model'. Connections crossing the cluster
+    boundary get a port on the cluster named '<component>_<port>'.
+
+    :returns: Tuple of the cluster model, the codec spec of each cluster output port, and the mapping from
+              (component, port name) to the name of the corresponding cluster port
+    """
+    models = {model.name: model for model in coupled_model.component_set}
+    port_attributes = {}
+    for member in members:
+        in_ports, out_ports = categorize_ports(models[member])
+        port_attributes.update({port: attribute for attribute, port in {**in_ports, **out_ports}.items()})
+
+    components = []
+    for member in members:
+        model = models[member]
+        kwargs = extract_model_init_args(model)
+        kwargs.pop("name", None)
+        model_module = os.path.splitext(os.path.basename(inspect.getfile(type(model))))[0]
+        components.append((member, model_module, type(model).__name__, kwargs))
+
+    connections = []
+    in_ports = {}
+    out_ports = {}
+    port_codecs = {}
+    port_names = {}
+    for model in (models[member] for member in members):
+        for out_port in model.OPorts:
+            for in_port in out_port.outline:
+                destination = in_port.host_DEVS.name
+                if destination in members:
+                    connections.append((model.name, port_attributes[out_port], destination, port_attributes[in_port]))
+                else:
+                    port_name = re.sub(r"\W", "_", f"{model.name}_{out_port.name}")
+                    out_ports[port_name] = (model.name, port_attributes[out_port])
+                    port_codecs[port_name] = resolve_port_codecs(model, default_codec=default_codec)[out_port.name]
+                    port_names[(model.name, out_port.name)] = port_name
+        for in_port in model.IPorts:
+            for out_port in in_port.inline:
+                if out_port.host_DEVS.name not in members:
+                    port_name = re.sub(r"\W", "_", f"{model.name}_{in_port.name}")
+                    destinations = in_ports.setdefault(port_name, [])
+                    if (model.name, port_attributes[in_port]) not in destinations:
+                        destinations.append((model.name, port_attributes[in_port]))
+                    port_names[(model.name, in_port.name)] = port_name
+
+    cluster = ClusterDEVS(name=name, components=components, connections=connections, in_ports=in_ports,
+                          out_ports=out_ports)
+    return cluster, port_codecs, port_names
+
+
+def export_coupled_model(coupled_model, output_dir=None, default_codec=DEFAULT_CODEC, partitions=None,
+                         event_rates=None, processes=1, force=False, runtime="bundled", precompile=True,
+                         verify=False):
     """
     Exports FMUs for each sub-model in 'coupled_model' (using export_fmu)
     and writes a coupling.json file describing components and their connections.
@@ -370,6 +911,21 @@ def export_coupled_model(coupled_model, output_dir=None):
                          Must have 'name' and 'component_set' attributes.
     :param output_dir: Base output directory for this coupled model.
                        If None, defaults to './<coupled_model.name>'.
+    :param default_codec: Codec spec used for output ports of components that do not declare a codec.
+    :param partitions: If given, the components are partitioned into (at most) this many clusters (see
+                       partition_components), and each cluster with more than one component is exported as a single
+                       coupled FMU named '<coupled_model.name>_cluster_<i>'. Connections within a cluster are routed
+                       in-process, coupling.json only contains the connections between clusters.
+    :param event_rates: Optional observed event rate per (source model, source port) used by the partitioning.
+    :param processes: Number of worker processes used to export the FMUs that are not up to date (1 exports in this
+                      process, None uses the number of CPUs). The workers import the modules of the models, so scripts
+                      exporting in parallel need an 'if __name__ == "__main__":' guard.
+    :param force: Export all FMUs, even if they are up to date.
+    :param runtime: Runtime layout of the FMUs, see export_fmu. With "shared", a single runtime is exported to
+                    '<output_dir>/runtime/<version>' and used by all FMUs of the coupled model, so the FMUs can only
+                    be used within the co-simulation package.
+    :param precompile: Include the bytecode of the resources in the FMUs, see export_fmu.
+    :param verify: Check that the backend of every FMU imports and print an import time report, see verify_fmu.
     """
 
     # Use a default output directory if none is provided
@@ -380,35 +936,81 @@ def export_coupled_model(coupled_model, output_dir=None):
     fmus_dir = os.path.join(output_dir, "FMUs")
     os.makedirs(fmus_dir, exist_ok=True)
 
-    # Export an FMU for each component model in the coupled_model
-    for model in coupled_model.component_set:
-        export_fmu(model, output_dir=fmus_dir)
-
-    # Build the connections list
+    if partitions is None:
+        clusters = [[model.name] for model in coupled_model.component_set]
+    else:
+        clusters = partition_components(coupled_model, partitions, event_rates)
+
+    # Determine the model (or cluster of component models) exported as an FMU for each cluster
+    models = {model.name: model for model in coupled_model.component_set}
+    exports = []
+    components = []
+    cluster_of = {}
+    clustered = set()
+    port_names = {}
+    for i, members in enumerate(clusters):
+        if len(members) == 1:
+            model, port_codecs = models[members[0]], None
+        else:
+            model, port_codecs, cluster_port_names = create_cluster_model(
+                coupled_model, f"{coupled_model.name}_cluster_{i}", members, default_codec)
+            port_names.update(cluster_port_names)
+            clustered.update(members)
+        exports.append((model, port_codecs))
+
+        component = {
+            "name": model.name,
+            "fmu": os.path.join('FMUs', f"{model.name}.fmu"),
+            "source": os.path.join('FMUs', model.name),
+        }
+        if partitions is not None:
+            component["members"] = members
+        components.append(component)
+        cluster_of.update({member: model.name for member in members})
+
+    # Export the FMUs that are not up to date
+    shared_runtime_dir = export_shared_runtime('./templates/fmu_common', output_dir) if runtime == "shared" else None
+    dirty = [(model, port_codecs) for model, port_codecs in exports
+             if force or not is_fmu_up_to_date(fmus_dir, model.name, get_export_digest(
+                 model, None, fmus_dir, resolve_port_codecs(model, port_codecs, default_codec), runtime,
+                 shared_runtime_dir, precompile))]
+    print(f"Exporting {len(dirty)} of {len(exports)} FMUs, the others are up to date")
+    processes = min(processes or os.cpu_count() or 1, max(len(dirty), 1))
+    if processes == 1:
+        for model, port_codecs in dirty:
+            export_fmu(model, output_dir=fmus_dir, port_codecs=port_codecs, default_codec=default_codec, force=True,
+                       runtime=runtime, shared_runtime_dir=shared_runtime_dir, precompile=precompile)
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [executor.submit(export_fmu_from_init_args,
+                                       os.path.splitext(os.path.basename(inspect.getfile(type(model))))[0],
+                                       type(model).__name__, extract_model_init_args(model), fmus_dir, port_codecs,
+                                       default_codec, True, runtime, shared_runtime_dir, precompile)
+                       for model, port_codecs in dirty]
+            for future in futures:
+                future.result()
+
+    if verify:
+        for model, _ in exports:
+            verify_fmu(fmus_dir, model.name)
+
+    # Build the connections list, connections within a cluster are handled by the cluster itself
     connections = []
-    for model in coupled_model.component_set:
-        # We traverse each model's OPorts (output ports)
-        for out_port in model.OPorts:
-            # 'outline' is the list of input ports this output port is connected to
-            for in_port in out_port.outline:
-                connections.append({
-                    "source_model": model.name,
-                    "source_port": out_port.name,
-                    "dest_model": in_port.host_DEVS.name,
-                    "dest_port": in_port.name
-                })
+    for connection in get_connections(coupled_model):
+        source, destination = connection["source_model"], connection["dest_model"]
+        if source in clustered and cluster_of[source] == cluster_of.get(destination):
+            continue
+        connections.append({
+            "source_model": cluster_of[source],
+            "source_port": port_names.get((source, connection["source_port"]), connection["source_port"]),
+            "dest_model": cluster_of.get(destination, destination),
+            "dest_port": port_names.get((destination, connection["dest_port"]), connection["dest_port"])
+        })
 
     # Build the JSON data structure
     data = {
         "root_model": coupled_model.name,
-        "components": [
-            {
-                "name": model.name,
-                "fmu": os.path.join('FMUs', f"{model.name}.fmu"),
-                "source": os.path.join('FMUs', model.name),
-            }
-            for model in coupled_model.component_set
-        ],
+        "components": components,
         "connections": connections,
     }
 
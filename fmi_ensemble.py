@@ -0,0 +1,233 @@
+"""
+2025-SIMULATION-DEVS-FMI3.0
+Copyright (C) 2025 Cosys-lab, University of Antwerp
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import time
+import itertools
+import contextlib
+import traceback
+import multiprocessing.util
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import h5py
+import numpy as np
+from fmi_importer import Importer
+from logger import ColumnLogger
+from port_codecs import decode_events
+from coupled_devs_simulation_fmi import load_coupling_model, add_coupled_model
+
+
+def parameter_grid(grid):
+    """
+    Expand a parameter grid into the list of all its variants.
+
+    :param grid: Dict of '<component>.<parameter>' to the list of values of the parameter, e.g.
+                 {"speed_controller.Kp": [2.0, 4.0], "lead_vehicle.v0": [20.0, 25.0]}
+    :return: List of dicts of '<component>.<parameter>' to a value, one per combination of values
+    """
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+class EnsembleWorker:
+    """
+    Runs variants of a coupled model one after the other, reusing the FMU instances (and backends) of the previous
+    run: the FMUs are reset and their parameters set before every run.
+    """
+
+    def __init__(self, model_dir, multiplexed=True):
+        coupling = load_coupling_model(model_dir)
+        self.host = None
+        if multiplexed:
+            from fmu_host import FMUHost
+            self.host = FMUHost(os.path.join(model_dir, coupling["components"][0]["source"], "resources"))
+        self.importer = Importer(host=self.host)
+        self.model_fmus, self.log_variables = add_coupled_model(self.importer, model_dir, coupling)
+        self.runs = 0
+
+    def run(self, parameters, stop_time):
+        """Run a variant until stop_time, returns the logged samples as columns (see ColumnLogger)."""
+        if self.runs:
+            for fmu in self.importer.fmus:
+                fmu.fmu.reset()
+                fmu.invalidate_values()
+        self.runs += 1
+
+        for key, value in parameters.items():
+            instance_name, parameter_name = key.rsplit(".", 1)
+            variable = self.model_fmus[instance_name].get_model_variable_by_name(parameter_name)
+            if variable is None or variable.causality != "parameter":
+                raise KeyError(f"Unknown parameter '{key}'")
+            variable.set_value(value)
+
+        logger = ColumnLogger(self.log_variables)
+        self.importer.loggers = [logger]
+        # The importer prints the states at every time step
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            self.importer.run_until(stop_time)
+        return logger.columns
+
+    def close(self):
+        if self.importer is not None:
+            self.importer.terminate()
+            self.importer = None
+        if self.host is not None:
+            self.host.close()
+            self.host = None
+
+
+# Worker of this (pool) process, created by the first run
+_worker = None
+
+
+def run_variant(model_dir, multiplexed, parameters, stop_time):
+    """
+    Run a variant in the worker of this process. Returns (columns, None, wall time) on success, or
+    (None, error, wall time) if the run failed, in which case the worker is recreated for the next run.
+    """
+    global _worker
+    start = time.perf_counter()
+    try:
+        if _worker is None:
+            _worker = EnsembleWorker(model_dir, multiplexed)
+            # Free the FMU instances (and stop the FMU host) when the pool shuts down
+            multiprocessing.util.Finalize(_worker, _worker.close, exitpriority=10)
+        return _worker.run(parameters, stop_time), None, time.perf_counter() - start
+    except Exception:
+        error = traceback.format_exc()
+        if _worker is not None:
+            with contextlib.suppress(Exception):
+                _worker.close()
+            _worker = None
+        return None, error, time.perf_counter() - start
+
+
+def decode_port_samples(samples):
+    """
+    Decode the samples of an output port ('<port>_data' variable, encoded with port_codecs.encode_events).
+
+    :return: If every sample holds at most one numeric message of the same shape, a float array with a row per sample
+             (and a column per field of the message), NaN where the port had no event. Otherwise the decoded events of
+             every sample as strings, empty where the port had no event.
+    """
+    bags = [list(decode_events(sample)) if sample else [] for sample in samples]
+    if all(len(bag) <= 1 for bag in bags):
+        messages = [np.asarray(bag[0]) if bag else None for bag in bags]
+        if all(message.dtype.kind in "biuf" for message in messages if message is not None):
+            shapes = {message.shape for message in messages if message is not None}
+            if len(shapes) <= 1:
+                values = np.full((len(bags),) + (shapes.pop() if shapes else ()), np.nan)
+                for index, message in enumerate(messages):
+                    if message is not None:
+                        values[index] = message
+                return values
+    return [str(bag) if bag else "" for bag in bags]
+
+
+def write_ensemble_results(output_path, variants, results):
+    """
+    Write the results of all runs to a single HDF5 file, as columns over all runs:
+      - runs/<component>.<parameter>, runs/status ('ok' or 'failed'), runs/error and runs/wall_time: one row per run
+      - samples/run, samples/time and samples/<variable>: one row per sample of a successful run. The outputs of the
+        ports are decoded (see decode_port_samples) and stored as numbers where possible, the other logged variables
+        (e.g. the states) are stored as strings
+    """
+    string_dtype = h5py.string_dtype()
+    keys = list(dict.fromkeys(key for parameters in variants for key in parameters))
+    with h5py.File(output_path, "w") as f:
+        runs = f.create_group("runs")
+        for key in keys:
+            runs.create_dataset(key, data=np.array([parameters.get(key, np.nan) for parameters in variants],
+                                                   dtype=float))
+        runs.create_dataset("status", data=["ok" if result["error"] is None else "failed" for result in results],
+                            dtype=string_dtype)
+        runs.create_dataset("error", data=[result["error"] or "" for result in results], dtype=string_dtype)
+        runs.create_dataset("wall_time", data=np.array([result["wall_time"] for result in results], dtype=float))
+
+        samples = f.create_group("samples")
+        completed = [(index, result["columns"]) for index, result in enumerate(results) if result["error"] is None]
+        samples.create_dataset("run", data=np.concatenate(
+            [np.full(len(columns["time"]), index, dtype=np.int64) for index, columns in completed] or
+            [np.empty(0, dtype=np.int64)]))
+        samples.create_dataset("time", data=np.array(
+            [sample for _, columns in completed for sample in columns["time"]], dtype=float))
+        for name in (completed[0][1] if completed else {}):
+            if name == "time":
+                continue
+            column = [sample for _, columns in completed for sample in columns[name]]
+            if name.endswith("_data"):
+                values = decode_port_samples(column)
+                if isinstance(values, np.ndarray):
+                    samples.create_dataset(name, data=values)
+                    continue
+                column = values
+            samples.create_dataset(name, data=[str(sample) if sample is not None else "" for sample in column],
+                                   dtype=string_dtype)
+
+
+def run_ensemble(model_dir, variants, stop_time, output_path, processes=None, multiplexed=True):
+    """
+    Run variants of the coupled model in model_dir (see export_coupled_model), in parallel.
+
+    Every worker process keeps its FMU instances, and resets them between runs. The FMUs are used from their
+    extracted source directories, so they are not extracted again for every run.
+
+    :param variants: List of dicts of '<component>.<parameter>' to a value, see parameter_grid. The parameters are the
+                     init args of the components (see get_model_parameters in devs_fmu_exporter.py).
+    :param stop_time: Simulation stop time of every run.
+    :param output_path: HDF5 file the results are written to, see write_ensemble_results.
+    :param processes: Number of worker processes (defaults to the number of CPUs, 1 runs in this process).
+    :param multiplexed: Run the FMU instances of a worker in a single backend process, see fmu_host.py.
+    :return: List of the result of every run: dicts with the 'parameters', 'columns' (None if the run failed),
+             'error' (None if the run succeeded) and 'wall_time'.
+    """
+    global _worker
+    results = [None] * len(variants)
+
+    def report(index, columns, error, wall_time):
+        results[index] = {"parameters": variants[index], "columns": columns, "error": error, "wall_time": wall_time}
+        done = sum(result is not None for result in results)
+        if error is None:
+            print(f"[{done}/{len(variants)}] Run {index} ok in {wall_time:.2f} s: {variants[index]}")
+        else:
+            print(f"[{done}/{len(variants)}] Run {index} failed: {variants[index]}\n{error}")
+
+    processes = min(processes or os.cpu_count() or 1, max(len(variants), 1))
+    if processes == 1:
+        for index, parameters in enumerate(variants):
+            report(index, *run_variant(model_dir, multiplexed, parameters, stop_time))
+        # Free the FMU instances of this process
+        if _worker is not None:
+            _worker.close()
+            _worker = None
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = {executor.submit(run_variant, model_dir, multiplexed, parameters, stop_time): index
+                       for index, parameters in enumerate(variants)}
+            for future in as_completed(futures):
+                report(futures[future], *future.result())
+
+    write_ensemble_results(output_path, variants, results)
+    print(f"{sum(result['error'] is None for result in results)} of {len(variants)} runs succeeded, results written "
+          f"to {output_path}")
+    return results
+
+
+if __name__ == "__main__":
+    run_ensemble('.\\generated\\acc_system',
+                 parameter_grid({"speed_controller.Kp": [2.0, 4.0, 6.0], "lead_vehicle.omega": [0.1, 0.2]}),
+                 80.0, '.\\traces\\acc_system_ensemble.h5')
@@ -21,16 +21,22 @@ from fmpy.fmi3 import fmi3ValueReference, fmi3Float64, fmi3IntervalQualifier, fm
 
 
 class Importer:
-    def __init__(self, verbose=False):
+    def __init__(self, verbose=False, host=None):
         self.fmus = []
         self.time_based_clocks = []
         self.external_relations = []
+        # Lookup tables derived from the external relations: connected output by input, and connected input clocks
+        # by output clock
+        self.connected_outputs = {}
+        self.connected_input_clocks = {}
         self.loggers = []
         self.verbose = verbose
+        # Optional FMUHost running all FMU instances in a single backend process (see fmu_host.py)
+        self.host = host
 
     # Instantiate and add an FMU by providing a path to the .fmu file or extracted folder and an optional instance name
     def add_fmu(self, fmu_path, instance_name=None):
-        fmu = FMUInstance(fmu_path, instance_name=instance_name)
+        fmu = FMUInstance(fmu_path, instance_name=instance_name, host=self.host)
         self.fmus.append(fmu)
         for clock in fmu.clocks.values():
             # For this simple example, we only consider countdown clocks.
@@ -41,13 +47,21 @@ class Importer:
     # Add an external relationship by providing the relationship object directly
     def add_external_relation(self, external_relation):
         self.external_relations.append(external_relation)
+        self.index_external_relation(external_relation)
 
     # Add an external relationship based on the connected FMUs and the names of the connected variables
     def add_external_relation_by_names(self, fmu_from, model_variable_from_name, fmu_to, model_variable_to_name):
         model_variable_from = fmu_from.get_model_variable_by_name(model_variable_from_name)
         model_variable_to = fmu_to.get_model_variable_by_name(model_variable_to_name)
         external_relation = ExternalRelation(fmu_from, model_variable_from, fmu_to, model_variable_to)
-        self.external_relations.append(external_relation)
+        self.add_external_relation(external_relation)
+
+    # Add an external relationship to the lookup tables used during simulation
+    def index_external_relation(self, external_relation):
+        self.connected_outputs.setdefault(external_relation.model_variable_to, external_relation.model_variable_from)
+        if isinstance(external_relation.model_variable_to, Clock):
+            self.connected_input_clocks.setdefault(external_relation.model_variable_from, []).append(
+                external_relation.model_variable_to)
 
     # Get the earliest time at which one of the time-based clocks will tick, returns inf by default
     def get_earliest_tick_time(self):
@@ -56,10 +70,7 @@ class Importer:
 
     # Get the output which is connected to a certain input (variable)
     def get_connected_output(self, variable):
-        output = [external_relation.model_variable_from for external_relation in self.external_relations if
-                  external_relation.model_variable_to == variable]
-
-        return output[0] if output else None
+        return self.connected_outputs.get(variable)
 
     # Add (register) a logger
     def add_logger(self, logger):
@@ -73,6 +84,7 @@ class Importer:
         for fmu in self.fmus:
             # Enter initialization mode for the FMU
             fmu.fmu.enterInitializationMode()
+            fmu.invalidate_values()
 
             # Update any time-based clocks for the FMU
             for clock in (clock for clock in self.time_based_clocks if clock.fmu_instance == fmu):
@@ -109,6 +121,7 @@ class Importer:
                     fmu.fmu.enterStepMode()
                     # Do a doStep to advance the time
                     (*_, last_successful_time) = fmu.fmu.doStep(time, step_size, True)
+                    fmu.invalidate_values()
                     # Check if the FMU has actually advanced to the expected time
                     assert last_successful_time == t_next
 
@@ -168,7 +181,8 @@ class Importer:
                             if clock.value_reference in data.clocks:
                                 if self.verbose:
                                     print('Set data %s.%s' % (data.fmu_instance.instance_name, data.name))
-                                # Get the value of the connected output
+                                # Get the value of the connected output, which was fetched once when its clock
+                                # became active and is shared by all connected inputs
                                 connected_output = self.get_connected_output(data)
                                 # Set the value of the clocked input
                                 data.set_value(connected_output.value)
@@ -199,13 +213,9 @@ class Importer:
                                 # Get the value of the output and store it in the object
                                 data.get_and_store_value()
 
-                        # Add linked input clocks to clocks needing activation based on active output clocks
-                        for external_relation in self.external_relations:
-                            # If there is an internal relation between the active output clock and an input clock
-                            if (external_relation.model_variable_from == clock and
-                                    isinstance(external_relation.model_variable_to, Clock)):
-                                # Flag the connected input clock for needing activation in the next iteration
-                                clocks_needing_activation.append(external_relation.model_variable_to)
+                        # Add linked input clocks to clocks needing activation based on active output clocks, i.e.,
+                        # flag the connected input clocks for needing activation in the next iteration
+                        clocks_needing_activation.extend(self.connected_input_clocks.get(clock, []))
 
                     # Increment iteration count
                     it += 1
@@ -214,6 +224,7 @@ class Importer:
                 for fmu in self.fmus:
                     # Update discrete states of FMUs, this needs to be called at least once per event mode
                     fmu.fmu.updateDiscreteStates()
+                    fmu.invalidate_values()
 
                 # Update time until next tick for time-based clocks
                 for clock in self.time_based_clocks:
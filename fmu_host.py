@@ -0,0 +1,241 @@
+"""
+2025-SIMULATION-DEVS-FMI3.0
+Copyright (C) 2025 Cosys-lab, University of Antwerp
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import sys
+import pickle
+import subprocess
+import zmq
+
+# Status values of the FMI3 functions (see Fmi3Status in the generated models), higher values are errors
+FMI3_WARNING = 1
+
+
+class FMUHost:
+    """
+    Single backend process hosting the instances of (exported DEVS) FMUs, instead of one backend process per instance.
+    The commands of all instances are sent over one channel, see run_host in backend.py.
+    """
+
+    def __init__(self, resources_dir):
+        """
+        :param resources_dir: Resources directory of one of the FMUs, the backend of which is started in host mode. A
+                              shared runtime of that FMU is also used for the other FMUs.
+        """
+        self.context = zmq.Context()
+        self.socket = self.context.socket(zmq.REP)
+        self.socket.bind("tcp://127.0.0.1:*")
+        endpoint = self.socket.getsockopt_string(zmq.LAST_ENDPOINT)
+
+        # Use the interpreter of the importer, so the precompiled bytecode of the FMUs matches
+        self.process = subprocess.Popen([sys.executable, "backend.py", "--host", endpoint], cwd=resources_dir)
+
+        # Wait for the handshake of the host
+        self._receive()
+
+    def _receive(self):
+        # Do not wait forever if the host exited (e.g. because it could not import the backend)
+        while not self.socket.poll(1000):
+            if self.process.poll() is not None:
+                raise RuntimeError(f"FMU host exited with code {self.process.returncode}")
+        return pickle.loads(self.socket.recv())
+
+    def call(self, instance_name, method, *args):
+        self.socket.send(pickle.dumps((instance_name, method, args), protocol=pickle.HIGHEST_PROTOCOL))
+        success, result = self._receive()
+        if not success:
+            raise RuntimeError(f"{method} of {instance_name} failed in the FMU host:\n{result}")
+        return result
+
+    def create_instance(self, guid, unzipDirectory, instanceName, **kwargs):
+        """Counterpart of fmpy.fmi3.FMU3Slave for an instance in this host, other arguments are ignored."""
+        return HostedFMU3Slave(self, guid, unzipDirectory, instanceName)
+
+    def close(self):
+        self.call("", "shutdown")
+        self.process.wait()
+        self.socket.close()
+        self.context.term()
+
+
+class HostedFMU3Slave:
+    """
+    Instance of an FMU in an FMUHost, with the methods of fmpy.fmi3.FMU3Slave used by FMUInstance and the Importer.
+    Like fmpy, raises an exception if a function returns an error status.
+    """
+
+    def __init__(self, host, guid, unzip_directory, instance_name):
+        self.host = host
+        self.guid = guid
+        self.resources_dir = os.path.join(os.path.abspath(unzip_directory), "resources")
+        self.instance_name = instance_name
+
+    def _call(self, method, *args):
+        result = self.host.call(self.instance_name, method, *args)
+        status, values = (result[0], result[1:]) if isinstance(result, tuple) else (result, ())
+        if status > FMI3_WARNING:
+            raise Exception(f"{method} of {self.instance_name} failed with status {status}")
+        return values
+
+    def instantiate(self, visible=False, loggingOn=False, eventModeUsed=False, earlyReturnAllowed=False,
+                    logMessage=None, intermediateUpdate=None):
+        self.host.call(self.instance_name, "instantiate", self.resources_dir, self.guid, self.resources_dir, visible,
+                       loggingOn, eventModeUsed, earlyReturnAllowed, [])
+
+    def freeInstance(self):
+        self.host.call(self.instance_name, "fmi3FreeInstance")
+
+    def enterInitializationMode(self, tolerance=None, startTime=0.0, stopTime=None):
+        self._call("fmi3EnterInitializationMode", tolerance is not None, tolerance or 0.0, startTime,
+                   stopTime is not None, stopTime or 0.0)
+
+    def exitInitializationMode(self):
+        self._call("fmi3ExitInitializationMode")
+
+    def enterEventMode(self):
+        self._call("fmi3EnterEventMode")
+
+    def enterStepMode(self):
+        self._call("fmi3EnterStepMode")
+
+    def terminate(self):
+        self._call("fmi3Terminate")
+
+    def reset(self):
+        self._call("fmi3Reset")
+
+    def doStep(self, currentCommunicationPoint, communicationStepSize, noSetFMUStatePriorToCurrentPoint=True):
+        # (event handling needed, terminate simulation, early return, last successful time)
+        return self._call("fmi3DoStep", currentCommunicationPoint, communicationStepSize,
+                          noSetFMUStatePriorToCurrentPoint)
+
+    def updateDiscreteStates(self):
+        return self._call("fmi3UpdateDiscreteStates")
+
+    # The FMU states are kept by the importer in their serialized form
+    def getFMUState(self):
+        return self._call("fmi3SerializeFmuState")[0]
+
+    def setFMUState(self, state):
+        self._call("fmi3DeserializeFmuState", state)
+
+    def freeFMUState(self, state):
+        pass
+
+    def serializeFMUState(self, state):
+        return state
+
+    def deserializeFMUState(self, serialized_state):
+        return serialized_state
+
+    def _get(self, method, vr):
+        return list(self._call(method, list(vr))[0])
+
+    def _set(self, method, vr, values):
+        self._call(method, list(vr), list(values))
+
+    def getFloat32(self, vr, nValues=None):
+        return self._get("fmi3GetFloat32", vr)
+
+    def getFloat64(self, vr, nValues=None):
+        return self._get("fmi3GetFloat64", vr)
+
+    def getInt8(self, vr, nValues=None):
+        return self._get("fmi3GetInt8", vr)
+
+    def getUInt8(self, vr, nValues=None):
+        return self._get("fmi3GetUInt8", vr)
+
+    def getInt16(self, vr, nValues=None):
+        return self._get("fmi3GetInt16", vr)
+
+    def getUInt16(self, vr, nValues=None):
+        return self._get("fmi3GetUInt16", vr)
+
+    def getInt32(self, vr, nValues=None):
+        return self._get("fmi3GetInt32", vr)
+
+    def getUInt32(self, vr, nValues=None):
+        return self._get("fmi3GetUInt32", vr)
+
+    def getInt64(self, vr, nValues=None):
+        return self._get("fmi3GetInt64", vr)
+
+    def getUInt64(self, vr, nValues=None):
+        return self._get("fmi3GetUInt64", vr)
+
+    def getBoolean(self, vr, nValues=None):
+        return self._get("fmi3GetBoolean", vr)
+
+    def getString(self, vr, nValues=None):
+        return self._get("fmi3GetString", vr)
+
+    def getBinary(self, vr, nValues=None):
+        return self._get("fmi3GetBinary", vr)
+
+    def getClock(self, vr):
+        return self._get("fmi3GetClock", vr)
+
+    def getIntervalDecimal(self, vr, intervals, qualifiers):
+        # Fills the given (ctypes) arrays, like the fmi3GetIntervalDecimal function of the FMU
+        values, value_qualifiers = self._call("fmi3GetIntervalDecimal", list(vr))
+        for i, (interval, qualifier) in enumerate(zip(values, value_qualifiers)):
+            intervals[i] = interval
+            qualifiers[i] = qualifier
+
+    def setFloat32(self, vr, values):
+        self._set("fmi3SetFloat32", vr, values)
+
+    def setFloat64(self, vr, values):
+        self._set("fmi3SetFloat64", vr, values)
+
+    def setInt8(self, vr, values):
+        self._set("fmi3SetInt8", vr, values)
+
+    def setUInt8(self, vr, values):
+        self._set("fmi3SetUInt8", vr, values)
+
+    def setInt16(self, vr, values):
+        self._set("fmi3SetInt16", vr, values)
+
+    def setUInt16(self, vr, values):
+        self._set("fmi3SetUInt16", vr, values)
+
+    def setInt32(self, vr, values):
+        self._set("fmi3SetInt32", vr, values)
+
+    def setUInt32(self, vr, values):
+        self._set("fmi3SetUInt32", vr, values)
+
+    def setInt64(self, vr, values):
+        self._set("fmi3SetInt64", vr, values)
+
+    def setUInt64(self, vr, values):
+        self._set("fmi3SetUInt64", vr, values)
+
+    def setBoolean(self, vr, values):
+        self._set("fmi3SetBoolean", vr, values)
+
+    def setString(self, vr, values):
+        self._set("fmi3SetString", vr, values)
+
+    def setBinary(self, vr, values):
+        self._set("fmi3SetBinary", vr, values)
+
+    def setClock(self, vr, values):
+        self._set("fmi3SetClock", vr, values)
@@ -17,12 +17,15 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 import os
+import ctypes
 import fmpy
 
 
 class FMUInstance:
-    def __init__(self, fmu_path, instance_name=None):
+    def __init__(self, fmu_path, instance_name=None, host=None):
         self.fmu_path = os.path.abspath(fmu_path)
+        # Optional FMUHost (see fmu_host.py) running the instance, instead of a backend process of its own
+        self.host = host
         self.fmu = None
         self.fmu_name = None
         self.model_description = None
@@ -33,6 +36,10 @@ class FMUInstance:
         self.clocks = {}
         self.internal_relations = []
 
+        # Token identifying the current values of the FMU, changed whenever a call may have changed its outputs.
+        # Values fetched with the same token are reused instead of being fetched again.
+        self.values_token = 0
+
         self.load_and_instantiate_fmu()
 
     def load_and_instantiate_fmu(self):
@@ -84,10 +91,39 @@ class FMUInstance:
         }
 
         # TODO: currently this only support FMI3 FMUs ('generic' fmpy.instantiate_fmu() does not support instanceName)
-        self.fmu = fmpy.fmi3.FMU3Slave(**fmu_args)
+        if self.host is not None:
+            self.fmu = self.host.create_instance(**fmu_args)
+        else:
+            self.fmu = fmpy.fmi3.FMU3Slave(**fmu_args)
         self.fmu.instantiate(visible=False, loggingOn=False, eventModeUsed=True, earlyReturnAllowed=False,
                              logMessage=None, intermediateUpdate=None)
 
+    def invalidate_values(self):
+        self.values_token += 1
+
+    def get_binary(self, value_reference):
+        if self.host is not None:
+            return self.fmu.getBinary([value_reference])[0]
+        # fmpy's getBinary does not return the sizes of the values, so call fmi3GetBinary directly
+        vr = (fmpy.fmi3.fmi3ValueReference * 1)(value_reference)
+        value = (fmpy.fmi3.fmi3Binary * 1)()
+        size = (ctypes.c_size_t * 1)()
+        self.fmu.fmi3GetBinary(self.fmu.component, vr, 1, size, value, 1)
+        return ctypes.string_at(value[0], size[0])
+
+    # Snapshot of the complete FMU state, e.g. to fork scenario variants from a warmed-up co-simulation
+    def save_state(self):
+        state = self.fmu.getFMUState()
+        serialized_state = self.fmu.serializeFMUState(state)
+        self.fmu.freeFMUState(state)
+        return serialized_state
+
+    def restore_state(self, serialized_state):
+        state = self.fmu.deserializeFMUState(serialized_state)
+        self.fmu.setFMUState(state)
+        self.fmu.freeFMUState(state)
+        self.invalidate_values()
+
     def get_model_variable_by_value_reference(self, value_reference):
         # Check in self.data
         data_variable = self.data.get(value_reference)
@@ -132,6 +168,8 @@ class Data(ModelVariable):
         self.variability = variability
         self.data_type = data_type
         self.value = initial_value
+        # Values token of the FMU at which self.value was fetched
+        self.value_token = None
         if clocks:
             self.clocks = clocks
         else:
@@ -139,6 +177,7 @@ class Data(ModelVariable):
 
     def set_value(self, value):
         data_type = self.data_type.lower()
+        self.fmu_instance.invalidate_values()
 
         # FMI2.0
         if data_type == 'real':
@@ -175,11 +214,17 @@ class Data(ModelVariable):
             self.fmu_instance.fmu.setBoolean([self.value_reference], [bool(value)])
         elif data_type == 'string':
             self.fmu_instance.fmu.setString([self.value_reference], [str(value)])
+        elif data_type == 'binary':
+            self.fmu_instance.fmu.setBinary([self.value_reference], [bytes(value)])
 
         else:
             raise ValueError(f"ERROR: set_value unsupported data type '{data_type}' for variable '{self.name}'")
 
     def get_value(self):
+        # Reuse the value if it was already fetched and the FMU did not change since
+        if self.value_token == self.fmu_instance.values_token:
+            return self.value
+
         data_type = self.data_type.lower()
 
         # FMI2.0
@@ -217,15 +262,19 @@ class Data(ModelVariable):
             value = self.fmu_instance.fmu.getBoolean([self.value_reference])[0]
         elif data_type == 'string':
             value = self.fmu_instance.fmu.getString([self.value_reference])[0]
+        elif data_type == 'binary':
+            value = self.fmu_instance.get_binary(self.value_reference)
 
         else:
             raise ValueError(f"ERROR: get_value unsupported data type '{data_type}' for variable '{self.name}'")
             value = None
 
+        self.value = value
+        self.value_token = self.fmu_instance.values_token
         return value
 
     def get_and_store_value(self):
-        self.value = self.get_value()
+        return self.get_value()
 
 
 class Clock(ModelVariable):
@@ -236,9 +285,11 @@ class Clock(ModelVariable):
 
     def activate_clock(self):
         self.fmu_instance.fmu.setClock([self.value_reference], [True])
+        self.fmu_instance.invalidate_values()
 
     def deactivate_clock(self):
         self.fmu_instance.fmu.setClock([self.value_reference], [False])
+        self.fmu_instance.invalidate_values()
         # Todo: should deactivating a clock also set its value attribute to False?
 
     def get_state(self):
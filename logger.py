@@ -55,4 +55,33 @@ class CSVLogger(Logger):
     def terminate(self):
         # Close the filehandle
         if self.filehandle:
-            self.filehandle.close()
\ No newline at end of file
+            self.filehandle.close()
+
+class ColumnLogger:
+    """Keeps the samples in memory, as a list of values per column ('time' and the logged variables)."""
+    def __init__(self, log_variables=None):
+        if log_variables:
+            self.log_variables = log_variables
+        else:
+            self.log_variables = []
+        self.columns = {}
+
+    def add_log_variable(self, variable):
+        self.log_variables.append(variable)
+
+    def start(self):
+        self.columns = {'time': []}
+        # One column per variable, even if it is logged more than once (e.g. an output with several connections)
+        self.column_variables = []
+        for log_variable in self.log_variables:
+            if log_variable.__str__() not in self.columns:
+                self.columns[log_variable.__str__()] = []
+                self.column_variables.append(log_variable)
+
+    def add_sample(self, time):
+        self.columns['time'].append(time)
+        for log_variable in self.column_variables:
+            self.columns[log_variable.__str__()].append(log_variable.get_value())
+
+    def terminate(self):
+        pass
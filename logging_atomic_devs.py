@@ -18,6 +18,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from pypdevs.DEVS import AtomicDEVS
 import os
+import shutil
 
 class LoggingAtomicDEVS(AtomicDEVS):
     """
@@ -43,12 +44,29 @@ class LoggingAtomicDEVS(AtomicDEVS):
         Caveats apply!
         """
         try:
-            if self._logfile and not self._logfile.closed:
-                self._log('</trace>')
-                self._logfile.close()
+            self.closeLog()
         except Exception:
             pass
 
+    def closeLog(self):
+        """
+        Close the log file, if it is still open.
+        """
+        if self._logfile and not self._logfile.closed:
+            self._log('</trace>')
+            self._logfile.close()
+
+    def redirectLog(self, log_dir):
+        """
+        Continue logging to a copy of the log file in another directory, e.g. in a continuation of a forked simulation
+        (see Simulator.forkSimulate), which would otherwise write to the same file as the other continuations.
+        """
+        self._logfile.flush()
+        os.makedirs(log_dir, exist_ok=True)
+        path = os.path.join(log_dir, os.path.basename(self._logfile.name))
+        shutil.copyfile(self._logfile.name, path)
+        self._logfile = open(path, "a", encoding="utf-8", buffering=1)
+
     def _log(self, message):
         """
         Helper function to write a message to our open log file.
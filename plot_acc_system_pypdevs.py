@@ -17,38 +17,67 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 import os
-import xmltodict
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import ast
 import numpy as np
 import h5py
+from trace_reader import iter_xml_events
 
-def plot(filename):
+EGO_VEHICLE = "adaptive_cruise_control.ego_vehicle.ego_vehicle_vehicle"
+LEAD_VEHICLE = "adaptive_cruise_control.lead_vehicle.lead_vehicle_vehicle"
+SUPERVISOR = "adaptive_cruise_control.supervisor"
+SPEED_CONTROLLER = "adaptive_cruise_control.speed_controller"
+
+
+def read_binary_signals(filename):
+    """Read the plotted signals from a binary trace (see pypdevs.tracers.tracerBinary), without decoding other events."""
+    from pypdevs.tracers.tracerBinary import BinaryTrace
+    trace = BinaryTrace(filename)
+
+    def rows(model, port):
+        times, values = trace.portValues(model, port)
+        values = np.asarray(values, dtype=float)
+        return np.column_stack([times, values]).tolist() if len(times) else []
+
+    return (rows(EGO_VEHICLE, 'vehicle_state'), rows(LEAD_VEHICLE, 'vehicle_state'),
+            rows(SUPERVISOR, 'output'), rows(SPEED_CONTROLLER, 'output'))
 
-    with open(filename) as fd:
-        trace = xmltodict.parse(fd.read())
 
+def read_xml_signals(filename):
+    """Read the plotted signals from an XML trace, streaming it and skipping the events of other models."""
     ego_vehicle_state = []
     lead_vehicle_state = []
     setpoint = []
     output = []
 
-    for event in trace["trace"]["event"]:
-        if "port" in event:
-            time = float(event['time'])
-            ports = event["port"]
-            ports = [ports] if isinstance(ports, dict) else ports
-            for port in ports:
-                if "message" in port:
-                    if event["model"] == "adaptive_cruise_control.ego_vehicle.ego_vehicle_vehicle" and port["@name"] == 'vehicle_state':
-                        ego_vehicle_state.append([time] + (ast.literal_eval(port["message"])))
-                    elif event["model"] == "adaptive_cruise_control.lead_vehicle.lead_vehicle_vehicle" and port["@name"] == 'vehicle_state':
-                        lead_vehicle_state.append([time] + (ast.literal_eval(port["message"])))
-                    elif event["model"] == "adaptive_cruise_control.supervisor" and port["@name"] == 'output':
-                        setpoint.append([time, ((float(port["message"])))])
-                    elif event["model"] == "adaptive_cruise_control.speed_controller" and port["@name"] == 'output':
-                        output.append([time, ((float(port["message"])))])
+    signals = {(EGO_VEHICLE, 'vehicle_state'): (ego_vehicle_state, ast.literal_eval),
+               (LEAD_VEHICLE, 'vehicle_state'): (lead_vehicle_state, ast.literal_eval),
+               (SUPERVISOR, 'output'): (setpoint, lambda message: [float(message)]),
+               (SPEED_CONTROLLER, 'output'): (output, lambda message: [float(message)])}
+    models = {model for model, _ in signals}
+
+    for event in iter_xml_events(filename, models):
+        model = event.findtext('model')
+        time = None
+        for port in event.iterfind('port'):
+            signal = signals.get((model, port.get('name')))
+            message = port.find('message')
+            if signal is not None and message is not None:
+                if time is None:
+                    time = float(event.findtext('time'))
+                rows, parse = signal
+                rows.append([time] + parse(message.text))
+
+    return ego_vehicle_state, lead_vehicle_state, setpoint, output
+
+
+def plot(filename):
+    # A '.pdt' trace is in the binary trace format, other traces are XML
+    if filename.endswith(".pdt"):
+        ego_vehicle_state, lead_vehicle_state, setpoint, output = read_binary_signals(filename)
+    else:
+        ego_vehicle_state, lead_vehicle_state, setpoint, output = read_xml_signals(filename)
 
     # Convert to separate lists for plotting
     ego_time = [row[0] for row in ego_vehicle_state]  # Extract time
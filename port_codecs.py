@@ -0,0 +1,176 @@
+"""
+2025-SIMULATION-DEVS-FMI3.0
+Copyright (C) 2025 Cosys-lab, University of Antwerp
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+# Codecs used to (de)serialize the events of a DEVS port into the String variables of the FMU.
+#
+# An encoded payload has the form '<codec spec>;<base64 data>', e.g. 'struct:3d;AQAAAA...'. The spec makes every
+# payload self-describing, so an input port can decode whatever the connected output port produced, and importers
+# written in other languages know how to read the data. Payloads without a spec are legacy base64 encoded pickles.
+#
+# Available codecs:
+#   - 'pickle':         any picklable Python object (default, Python-only)
+#   - 'msgpack':        lists, dicts, strings and numbers (requires msgpack)
+#   - 'struct:<fmt>':   fixed layout messages, e.g. 'struct:d' for a float or 'struct:3d' for [x, v, a]
+#   - 'numpy:<dtype>':  the bag of messages as a NumPy array, e.g. 'numpy:float64' (requires numpy)
+
+import base64
+import pickle
+import struct
+
+DEFAULT_CODEC = "pickle"
+
+SPEC_SEPARATOR = ";"
+
+
+class PickleCodec:
+    """Fallback codec, supports any picklable message."""
+
+    def __init__(self, spec="pickle"):
+        self.spec = spec
+
+    def encode(self, events):
+        return pickle.dumps(events, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def decode(self, data):
+        return pickle.loads(data)
+
+
+class MsgpackCodec:
+    """Compact, language independent codec for lists, dicts, strings and numbers."""
+
+    def __init__(self, spec="msgpack"):
+        import msgpack
+        self.spec = spec
+        self._packer = msgpack.Packer(use_bin_type=True)
+        self._unpackb = msgpack.unpackb
+
+    def encode(self, events):
+        return self._packer.pack(events)
+
+    def decode(self, data):
+        return self._unpackb(data, raw=False)
+
+
+class StructCodec:
+    """
+    Fixed layout codec. Each message is packed with the (little-endian) struct format given in the spec, preceded by
+    the number of messages in the bag. Messages with a single field are decoded as scalars, others as lists.
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        self._count = struct.Struct("<I")
+        self._message = struct.Struct("<" + spec.partition(":")[2])
+        self._scalar = len(self._message.unpack(bytes(self._message.size))) == 1
+
+    def encode(self, events):
+        buffer = bytearray(self._count.pack(len(events)))
+        for message in events:
+            if self._scalar:
+                buffer += self._message.pack(message)
+            else:
+                buffer += self._message.pack(*message)
+        return bytes(buffer)
+
+    def decode(self, data):
+        (count,) = self._count.unpack_from(data)
+        offset = self._count.size
+        events = []
+        for _ in range(count):
+            values = self._message.unpack_from(data, offset)
+            offset += self._message.size
+            events.append(values[0] if self._scalar else list(values))
+        return events
+
+
+class NumpyCodec:
+    """
+    Codec storing the complete bag of messages as a single NumPy array of the dtype given in the spec. The array shape
+    is stored in front of the raw buffer. Decoding returns the array, not a list.
+    """
+
+    def __init__(self, spec):
+        import numpy
+        self.spec = spec
+        self._numpy = numpy
+        self._dtype = numpy.dtype(spec.partition(":")[2] or "float64")
+
+    def encode(self, events):
+        array = self._numpy.ascontiguousarray(events, dtype=self._dtype)
+        header = struct.pack("<I%dI" % array.ndim, array.ndim, *array.shape)
+        return header + array.tobytes()
+
+    def decode(self, data):
+        (ndim,) = struct.unpack_from("<I", data)
+        shape = struct.unpack_from("<%dI" % ndim, data, 4)
+        return self._numpy.frombuffer(data, dtype=self._dtype, offset=4 * (ndim + 1)).reshape(shape)
+
+
+# Registry of codec classes by name, extend using register_codec
+CODECS = {
+    "pickle": PickleCodec,
+    "msgpack": MsgpackCodec,
+    "struct": StructCodec,
+    "numpy": NumpyCodec,
+}
+
+# Codec instances by spec, so that every spec is only parsed once
+_codec_cache = {}
+
+
+def register_codec(name, codec_class):
+    """
+    Register an additional codec class.
+
+    :param name: name used in the codec spec (the part before the ':')
+    :param codec_class: class constructed with the full spec, providing encode(events) and decode(data)
+    """
+    if SPEC_SEPARATOR in name or ":" in name:
+        raise ValueError(f"Invalid codec name '{name}'")
+    CODECS[name] = codec_class
+
+
+def get_codec(spec):
+    """
+    Return the codec for the given spec, e.g. 'pickle', 'msgpack', 'struct:3d' or 'numpy:float64'.
+    Raises a ValueError for unknown or malformed specs.
+    """
+    codec = _codec_cache.get(spec)
+    if codec is None:
+        name = spec.partition(":")[0]
+        if name not in CODECS or SPEC_SEPARATOR in spec:
+            raise ValueError(f"Unknown port codec '{spec}'")
+        try:
+            codec = CODECS[name](spec)
+        except (struct.error, TypeError) as e:
+            raise ValueError(f"Invalid port codec '{spec}': {e}")
+        _codec_cache[spec] = codec
+    return codec
+
+
+def encode_events(codec, events):
+    """Encode the events of a port as a self-describing ASCII string."""
+    return codec.spec + SPEC_SEPARATOR + base64.b64encode(codec.encode(events)).decode("ascii")
+
+
+def decode_events(payload):
+    """Decode a string produced by encode_events (or a legacy base64 encoded pickle)."""
+    spec, separator, data = payload.rpartition(SPEC_SEPARATOR)
+    if not separator:
+        spec = "pickle"
+    return get_codec(spec).decode(base64.b64decode(data.encode("ascii")))
@@ -60,10 +60,11 @@ def main():
     # and copy them to .\logs_comparison\acc_system_fmi
     gather_logs('.\\generated\\acc_system', '.\\logs_comparison\\acc_system_fmi')
 
-    # Compare logs of both simulations to ensure they match
+    # Compare logs of both simulations to ensure they match (in parallel), the report is saved as JSON
     print('\n--- RESULTS ---\nCOMPARING LOGS')
     match = compare_log_dirs('.\\logs_comparison\\acc_system_pypdevs',
-                             '.\\logs_comparison\\acc_system_fmi')
+                             '.\\logs_comparison\\acc_system_fmi',
+                             report_path='.\\logs_comparison\\report.json')
     if match:
         print('ALL MATCHING!')
     else:
@@ -1,8 +1,28 @@
-import logging
 import os
 import sys
+import pickle
+import traceback
+import importlib.util
 import zmq
 
+# FMUs exported with a shared runtime load pypdevs, the schemas and the DEVS wrapper from a directory of the
+# co-simulation package, given relative to this directory in shared_runtime.txt (or by PYPDEVS_FMU_RUNTIME)
+_resources_dir = os.path.dirname(os.path.abspath(__file__))
+_shared_runtime_dir = None
+if os.environ.get("PYPDEVS_FMU_RUNTIME"):
+    _shared_runtime_dir = os.environ["PYPDEVS_FMU_RUNTIME"]
+elif os.path.isfile(os.path.join(_resources_dir, "shared_runtime.txt")):
+    with open(os.path.join(_resources_dir, "shared_runtime.txt")) as f:
+        _shared_runtime_dir = os.path.normpath(os.path.join(_resources_dir, f.read().strip()))
+if _shared_runtime_dir is not None:
+    # The shared runtime is not part of the FMU, it has to be extracted next to the co-simulation package
+    if not os.path.isdir(os.path.join(_shared_runtime_dir, "pypdevs")):
+        raise FileNotFoundError(
+            f"Shared runtime not found at '{_shared_runtime_dir}'. This FMU was exported with runtime='shared' and is "
+            f"not self-contained: it loads the runtime from the path in resources/shared_runtime.txt (relative to the "
+            f"resources directory) or from PYPDEVS_FMU_RUNTIME.")
+    sys.path.insert(0, _shared_runtime_dir)
+
 from schemas.fmi3_messages_pb2 import (
     Fmi3Command,
     Fmi3DoStepReturn,
@@ -29,18 +49,87 @@ from schemas.fmi3_messages_pb2 import (
 )
 from model import Model
 
-logging.basicConfig(level=logging.DEBUG)
-logger = logging.getLogger(__file__)
+_logger = None
+
+
+def get_logger():
+    # The logging module is only imported when something is logged, as it adds to the start-up time of every instance
+    global _logger
+    if _logger is None:
+        import logging
+        logging.basicConfig(level=logging.DEBUG)
+        _logger = logging.getLogger(__file__)
+    return _logger
+
+
+def load_model_class(resource_path, model_classes):
+    """
+    Return the Model class of the FMU with the given resources directory, loading its model module under a unique
+    name. Modules imported by the model (pypdevs, the model sources, ...) are shared by all FMUs in the process, so
+    co-hosted FMUs must be exported from the same sources (as the FMUs of a coupled model are).
+    """
+    resource_path = os.path.normpath(os.path.abspath(resource_path))
+    if resource_path not in model_classes:
+        if resource_path not in sys.path:
+            sys.path.append(resource_path)
+        spec = importlib.util.spec_from_file_location(f"model_{len(model_classes)}",
+                                                      os.path.join(resource_path, "model.py"))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        model_classes[resource_path] = module.Model
+    return model_classes[resource_path]
+
+
+def run_host(endpoint):
+    """
+    Multiplexed mode: host the instances of many FMUs in this process, keyed by instance name. Requests are pickled
+    (instance name, method, args) tuples, replies are pickled (success, result or error) tuples. Started and driven by
+    FMUHost (fmu_host.py), which binds the endpoint; only use it on trusted local endpoints, as requests are pickled.
+    """
+    context = zmq.Context()
+    socket = context.socket(zmq.REQ)
+    socket.connect(endpoint)
+
+    # send handshake
+    socket.send(pickle.dumps((True, None)))
+
+    model_classes = {_resources_dir: Model}
+    models = {}
+    while True:
+        instance_name, method, args = pickle.loads(socket.recv())
+        try:
+            if method == "instantiate":
+                models[instance_name] = load_model_class(args[0], model_classes)(instance_name, *args[1:])
+                result = None
+            elif method == "fmi3FreeInstance":
+                result = models.pop(instance_name, None) is not None
+            elif method == "shutdown":
+                socket.send(pickle.dumps((True, None)))
+                break
+            elif method.startswith("fmi3"):
+                result = getattr(models[instance_name], method)(*args)
+            else:
+                raise ValueError(f"unrecognized method '{method}'")
+            reply = (True, result)
+        except Exception:
+            reply = (False, traceback.format_exc())
+        socket.send(pickle.dumps(reply, protocol=pickle.HIGHEST_PROTOCOL))
+
+    socket.close()
+    context.term()
 
 
-if __name__ == "__main__":
+if __name__ == "__main__" and sys.argv[1:2] == ["--host"]:
+    run_host(sys.argv[2])
+
+elif __name__ == "__main__":
     logging = True
     # initializing message queue
     context = zmq.Context()
     socket = context.socket(zmq.REQ)
 
     dispatcher_endpoint = os.environ["UNIFMU_DISPATCHER_ENDPOINT"]
-    logger.info(f"dispatcher endpoint received: {dispatcher_endpoint}")
+    get_logger().info(f"dispatcher endpoint received: {dispatcher_endpoint}")
 
     socket.connect(dispatcher_endpoint)
 
@@ -59,7 +148,7 @@ if __name__ == "__main__":
         data = getattr(command, command.WhichOneof("command"))
 
         if logging:
-            logger.info(f"Command: {command}")
+            get_logger().info(f"Command: {command}")
         #print('Command:\n' + repr(command))
 
         # ================= FMI3 =================
@@ -109,7 +198,7 @@ if __name__ == "__main__":
             result.status = model.fmi3ExitInitializationMode()
         elif group == "Fmi3FreeInstance":
             result = Fmi3FreeInstanceReturn()
-            logger.info(f"Fmi3FreeInstance received, shutting down")
+            get_logger().info(f"Fmi3FreeInstance received, shutting down")
             sys.exit(0)
         elif group == "Fmi3Terminate":
             result = Fmi3StatusReturn()
@@ -121,7 +210,7 @@ if __name__ == "__main__":
             result = Fmi3SerializeFmuStateReturn()
             (result.status, result.state) = model.fmi3SerializeFmuState()
         elif group == "Fmi3DeserializeFmuState":
-            result = Fmi3StatusReturn
+            result = Fmi3StatusReturn()
             result.status = model.fmi3DeserializeFmuState(data.state)
         elif group == "Fmi3GetFloat32":
             result = Fmi3GetFloat32Return()
@@ -228,11 +317,11 @@ if __name__ == "__main__":
                 result.next_event_time,
             ) = model.fmi3UpdateDiscreteStates()
         else:
-            logger.error(f"unrecognized command '{group}' received, shutting down")
+            get_logger().error(f"unrecognized command '{group}' received, shutting down")
             sys.exit(-1)
 
         #print('Result:\n' + repr(result))
         if logging:
-            logger.info(f"Result: {result}")
+            get_logger().info(f"Result: {result}")
         state = result.SerializeToString()
         socket.send(state)
@@ -18,7 +18,9 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 # This class provides a generic DEVS wrapper that provides a generic interface for both atomic and coupled devs models
 from pypdevs.DEVS import AtomicDEVS, CoupledDEVS, directConnect
-import math
+from pypdevs.schedulers.schedulerHS import SchedulerHS
+from pypdevs.util import EPSILON
+
 
 class DEVSWrapper:
     def __init__(self, model):
@@ -36,12 +38,40 @@ class DEVSWrapper:
         else:
             raise ValueError("Unsupported model type")
 
-        self._outputs = None
-
-    def increment_elapsed(self, time_step):
-        # TODO: Check if elapsed would be >= time advance and signal early return?
-        for model in self._models:
-            model.elapsed = (0.0 if model.elapsed is None else model.elapsed) + time_step
+        # Component output ports connected to "external" OPorts of the wrapped coupled model, and component input ports
+        # connected to its "external" IPorts (following connections through nested coupled models)
+        self._external_outlines = {}
+        self._external_inlines = {}
+        if self.type == "coupled":
+            external_ports = set(model.OPorts)
+            for component in self._models:
+                for port in component.OPorts:
+                    outline = follow_connections(port.outline, lambda dst_port: dst_port in external_ports)
+                    if outline:
+                        self._external_outlines[port] = outline
+            for port in model.IPorts:
+                self._external_inlines[port] = follow_connections(
+                    port.outline, lambda dst_port: isinstance(dst_port.host_DEVS, AtomicDEVS))
+
+        # Current simulation time, components are scheduled on their (absolute) next event time. The elapsed time of a
+        # component is only computed (from time_last) when it is needed.
+        self.time = 0.0
+        for model_id, component in enumerate(self._models):
+            component.model_id = model_id
+            elapsed = 0.0 if component.elapsed is None else component.elapsed
+            component.time_last = (self.time - elapsed, 0)
+            component.time_next = (component.time_last[0] + component.timeAdvance(), 1)
+        self.scheduler = SchedulerHS(self._models, EPSILON, len(self._models))
+
+        # Components transitioning at the current time, determined once per time when outputs are generated (or at the
+        # transition)
+        self._imminent = None
+
+    def set_time(self, time):
+        self.time = time
+
+    def get_elapsed(self, model):
+        return self.time - model.time_last[0]
 
     def get_state(self):
         state = {}
@@ -49,127 +79,164 @@ class DEVSWrapper:
             state[model.name] = str(model.state)
         return state
 
+    def get_states(self):
+        return {model.name: model.state for model in self._models}
+
+    def get_snapshot(self):
+        """
+        Return a picklable snapshot of the dynamic state of the wrapped models (state, time_last, time_next and pending
+        outputs). Models and ports are stored by index, so the snapshot can be restored in any instance of the same
+        model.
+        """
+        models = [(model.state, model.time_last, model.time_next, self._encode_output(model.my_output))
+                  for model in self._models]
+        imminent = None if self._imminent is None else [model.model_id for model in self._imminent]
+        return models, self.time, imminent
+
+    def set_snapshot(self, snapshot):
+        models, self.time, imminent = snapshot
+        for model, (state, time_last, time_next, my_output) in zip(self._models, models):
+            model.state = state
+            model.time_last = time_last
+            model.time_next = time_next
+            model.my_output = self._decode_output(my_output)
+            model.my_input = {}
+        self.scheduler = SchedulerHS(self._models, EPSILON, len(self._models))
+        self._imminent = None if imminent is None else [self._models[model_id] for model_id in imminent]
+
+    def _encode_output(self, output):
+        return [(port.host_DEVS.model_id, port.host_DEVS.OPorts.index(port), message)
+                for port, message in output.items()]
+
+    def _decode_output(self, output):
+        return {self._models[model_id].OPorts[port]: message for model_id, port, message in output}
+
     def timeAdvance(self):
-        return min(model.timeAdvance() for model in self._models)
+        return self.get_next_event_time() - self.time
+
+    def get_next_event_time(self):
+        try:
+            return self.scheduler.readFirst()[0]
+        except IndexError:
+            # No more events scheduled
+            return float('inf')
+
+    def _get_imminent(self):
+        if self._imminent is None:
+            # Sorted, so that components always transition in the order of the (flattened) model
+            self._imminent = sorted(self.scheduler.getImminent((self.time, 1)), key=lambda model: model.model_id)
+        return self._imminent
 
     def outputFnc(self):
         # Get models about to transition
-        imm = [m for m in self._models if m.elapsed is not None and math.isclose(m.elapsed, m.timeAdvance())]
+        imm = self._get_imminent()
 
         # Get outputs of models about to transition
         for model in imm:
             model.my_output = model.outputFnc()
-        self._outputs = [model.my_output for model in imm]
 
         # Get "external" outputs
         # For atomic models, outputs wil be OPorts
         if self.type == "atomic":
-            return self._outputs[0] if self._outputs else []
+            return self.model.my_output if imm else []
 
         # For coupled models, we need to follow the connections from component output ports to "external" OPorts
         elif self.type == "coupled":
             external_outputs = {}
-            for output in self._outputs:
-                for port, message in output.items():
-                    outline = getattr(port, 'outline', [])
-                    for dst_port in outline:
-                        if dst_port in self.model.OPorts:
-                            # external_outputs[dst_port] = message
-                            external_outputs.setdefault(dst_port, []).append(message[0])
+            for model in imm:
+                for port, message in model.my_output.items():
+                    for dst_port in self._external_outlines.get(port, ()):
+                        external_outputs.setdefault(dst_port, []).append(message[0])
 
             return external_outputs
 
     def transition(self, external_inputs, time):
+        self.time = time
         if self.type == "atomic":
-            return self.atomic_transition(external_inputs, time)
+            transitioning = self.atomic_transition(external_inputs)
         elif self.type == "coupled":
-            return self.coupled_transition(external_inputs, time)
+            transitioning = self.coupled_transition(external_inputs)
 
-    def atomic_transition(self, external_inputs, time):
-        imm = self.model.elapsed is not None and math.isclose(self.model.elapsed, self.model.timeAdvance())
-        inf = bool(external_inputs)
-        self.model.my_input = external_inputs
-        if inf:
-            if imm:
-                # Confluent transition
-                self.model.elapsed = 0.0
-                self.model.state = self.model.confTransition(self.model.my_input)
-                self.model.time_last = (time, 1)
-                self.model.my_output = {}
-            else:
-                # External transition
-                self.model.state = self.model.extTransition(self.model.my_input)
-                self.model.elapsed = 0.0
-                self.model.time_last = (time, 1)
-                self.model.my_output = {}
-        elif imm:
-            # Internal transition
-            self.model.elapsed = None
-            self.model.state = self.model.intTransition()
-            self.model.time_last = (time, 1)
-            self.model.my_output = {}
+        # Reschedule the components that transitioned (imminent components are no longer in the scheduler)
+        for model in transitioning:
+            model.time_next = (time + model.timeAdvance(), 1)
+        self.scheduler.massReschedule(transitioning)
+        self._imminent = None
 
-        return inf or imm
+        return bool(transitioning)
 
-    def coupled_transition(self, external_inputs, time):
-        imm = [m for m in self._models if m.elapsed is not None and math.isclose(m.elapsed, m.timeAdvance())]
-        inf = []
+    def atomic_transition(self, external_inputs):
+        imm = bool(self._get_imminent())
+        inf = bool(external_inputs)
+        if inf or imm:
+            self.model.my_input = external_inputs
+            self._transition_model(self.model, imm, inf)
+            return [self.model]
+        return []
+
+    def coupled_transition(self, external_inputs):
+        imm = self._get_imminent()
         inputs = {}
 
-        # Exchange events between components (if coupled)
-        for output in self._outputs:
-            for port, message in output.items():
-                # Internal connections (for coupled models)
-                if hasattr(port, 'routing_outline'):
-                    for outline, z in port.routing_outline:
-                        dst = outline.host_DEVS
-                        dst_port = outline
-
-                        if dst not in inputs:
-                            inputs[dst] = {}
-
-                        # TODO: add support for z functions
-                        inputs[dst][dst_port] = message
-
-                        inf.append(dst)
+        # Exchange events between components, outputs are only present if they were generated at this time
+        for model in imm:
+            for port, message in model.my_output.items():
+                for dst_port, z in getattr(port, 'routing_outline', ()):
+                    # TODO: add support for z functions
+                    inputs.setdefault(dst_port.host_DEVS, {})[dst_port] = message
 
         # "Inject" inputs from "external" input port(s):
         for port, message in external_inputs.items():
             # Internal connections (for coupled models)
-            if hasattr(port, 'outline'):
-                for outline in port.outline:
-                    dst = outline.host_DEVS
-                    dst_port = outline
-
-                    if dst not in inputs:
-                        inputs[dst] = {}
-
-                    # TODO: add support for z functions
-                    inputs[dst][dst_port] = message
+            for dst_port in self._external_inlines.get(port, ()):
+                # TODO: add support for z functions
+                inputs.setdefault(dst_port.host_DEVS, {})[dst_port] = message
+
+        # Update states of the imminent and influenced components only
+        imm_set = set(imm)
+        transitioning = sorted(imm_set.union(inputs), key=lambda model: model.model_id)
+        for model in transitioning:
+            model.my_input = inputs.get(model, {})
+            self._transition_model(model, model in imm_set, model in inputs)
 
-                    inf.append(dst)
+        return transitioning
 
-        # Update states
-        for model in self._models:
-            model.my_input = inputs.get(model, {})
-            if model in inf:
-                if model in imm:
-                    # Confluent transition
-                    model.elapsed = 0
-                    model.state = model.confTransition(model.my_input)
-                    model.time_last = (time, 1)
-                    model.my_output = {}
-                else:
-                    # External transition
-                    model.state = model.extTransition(model.my_input)
-                    model.elapsed = 0
-                    model.time_last = (time, 1)
-                    model.my_output = {}
-            elif model in imm:
-                # Internal transition
-                model.elapsed = None
-                model.state = model.intTransition()
+    def _transition_model(self, model, imm, inf):
+        time = self.time
+        if inf:
+            if imm:
+                # Confluent transition
+                model.elapsed = 0.0
+                model.state = model.confTransition(model.my_input)
                 model.time_last = (time, 1)
                 model.my_output = {}
-
-        return bool(imm or inf)
+            else:
+                # External transition
+                model.elapsed = time - model.time_last[0]
+                model.state = model.extTransition(model.my_input)
+                model.elapsed = 0.0
+                model.time_last = (time, 1)
+                model.my_output = {}
+        elif imm:
+            # Internal transition
+            model.elapsed = None
+            model.state = model.intTransition()
+            model.time_last = (time, 1)
+            model.my_output = {}
+
+
+def follow_connections(ports, is_destination):
+    """Return the destination ports reached from 'ports', passing through the ports of nested coupled models."""
+    destinations = []
+    visited = set()
+    worklist = list(ports)
+    while worklist:
+        port = worklist.pop(0)
+        if port in visited:
+            continue
+        visited.add(port)
+        if is_destination(port):
+            destinations.append(port)
+        elif isinstance(port.host_DEVS, CoupledDEVS):
+            worklist.extend(port.outline)
+    return destinations
@@ -28,6 +28,8 @@ oneways = frozenset(["simulate",
                      "migrationUnlock", 
                      "notifyMigration", 
                      "requestMigrationLock", 
+                     "requestGVT", 
+                     "receivePromise", 
                      "setGVT"])
 
 import pypdevs.middleware as middleware
@@ -55,8 +57,13 @@ class MPIFaker(object):
         """
         return 0
 
+from pypdevs.multiprocessingMPI import MPI as MultiprocessingMPI
 try:
-    from mpi4py import MPI
+    if MultiprocessingMPI.COMM_WORLD is not None:
+        # Started by the multiprocessing launcher, so use it instead of MPI
+        MPI = MultiprocessingMPI
+    else:
+        from mpi4py import MPI
     COMM_WORLD = MPI.COMM_WORLD
 except ImportError:
     # MPI4Py not found, fall back to the dummy implementation
@@ -0,0 +1,392 @@
+# Copyright 2014 Modelling, Simulation and Design Lab (MSDL) at
+# McGill University and the University of Antwerp (http://msdl.cs.mcgill.ca/)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Implementation of the part of the MPI4Py interface used by PythonPDEVS on top of the multiprocessing module, to run distributed simulations
+on a single machine without an MPI installation. Every simulation kernel runs in its own process, started by the launcher::
+
+    python -m pypdevs.multiprocessingMPI -n 3 experiment.py
+
+which is the equivalent of 'mpirun -np 3 python experiment.py'. The processes find each other through environment variables set by the launcher,
+so the middleware automatically uses this backend instead of MPI.
+"""
+
+import os
+import sys
+import shutil
+import binascii
+import tempfile
+import threading
+import subprocess
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+from multiprocessing.connection import Listener, Client
+
+import pypdevs.accurate_time as time
+
+# Environment variables through which the launcher configures the processes
+RANK_VARIABLE = "PYPDEVS_MP_RANK"
+SIZE_VARIABLE = "PYPDEVS_MP_SIZE"
+ADDRESS_VARIABLE = "PYPDEVS_MP_ADDRESS"
+AUTHKEY_VARIABLE = "PYPDEVS_MP_AUTHKEY"
+
+# Tags of the collective operations, which are kept apart from the point-to-point messages
+BCAST_TAG = 0
+BARRIER_TAG = 1
+
+class Status(object):
+    """
+    Status of a received message, as in MPI4Py
+    """
+    def __init__(self):
+        """
+        Constructor
+        """
+        self.source = None
+        self.tag = None
+
+    # Don't follow coding style here, as we need to be compatible with the mpi4py interface
+    def Get_source(self):
+        """
+        Return the rank that sent the message
+
+        :returns: int -- the source of the message
+        """
+        return self.source
+
+    def Get_tag(self):
+        """
+        Return the tag of the message
+
+        :returns: int -- the tag of the message
+        """
+        return self.tag
+
+class Request(object):
+    """
+    Request of a non-blocking send, as in MPI4Py. Sends are always completed immediately, as the receiving process buffers all messages.
+    """
+    def Wait(self):
+        """
+        Wait until the send is completed
+        """
+        pass
+
+    wait = Wait
+
+    def Test(self):
+        """
+        Check whether or not the send is completed
+
+        :returns: bool -- always True
+        """
+        return True
+
+class Communicator(object):
+    """
+    The communicator between all processes, with the same methods as MPI.COMM_WORLD in MPI4Py.
+
+    Every process listens on its own address, and connects to another process the first time it sends a message to it. A thread per connection
+    receives the messages and buffers them until they are received, so messages between two processes keep their order, as in MPI.
+    """
+    def __init__(self, rank, size, address, authkey):
+        """
+        Constructor
+
+        :param rank: the rank of this process
+        :param size: the total number of processes
+        :param address: address of the listener of every process, with a '%i' for the rank
+        :param authkey: key to authenticate the connections between the processes
+        """
+        self.rank = rank
+        self.size = size
+        self.address = address
+        self.authkey = authkey
+        self.condition = threading.Condition()
+        self.messages = []
+        self.collectives = []
+        self.connections = {}
+        self.connect_lock = threading.Lock()
+        self.listener = Listener(address % rank, authkey=authkey)
+        thrd = threading.Thread(target=Communicator.acceptConnections, args=[self])
+        thrd.daemon = True
+        thrd.start()
+
+    @staticmethod
+    def fromEnvironment():
+        """
+        Create the communicator of this process, if it was started by the launcher. The variables set by the launcher are removed from the
+        environment, so processes started by this one are not mistaken for simulation kernels.
+
+        :returns: Communicator -- the communicator, or None if the process was not started by the launcher
+        """
+        if RANK_VARIABLE not in os.environ:
+            return None
+        return Communicator(int(os.environ.pop(RANK_VARIABLE)),
+                            int(os.environ.pop(SIZE_VARIABLE)),
+                            os.environ.pop(ADDRESS_VARIABLE),
+                            binascii.unhexlify(os.environ.pop(AUTHKEY_VARIABLE)))
+
+    def acceptConnections(self):
+        """
+        Accept the connections of the other processes, should be ran on a seperate thread
+        """
+        while 1:
+            try:
+                connection = self.listener.accept()
+            except Exception:
+                # Failed authentication or shutdown
+                continue
+            thrd = threading.Thread(target=Communicator.receiveMessages,
+                                    args=[self, connection])
+            thrd.daemon = True
+            thrd.start()
+
+    def receiveMessages(self, connection):
+        """
+        Buffer all messages received over a connection, should be ran on a seperate thread
+
+        :param connection: the connection to another process
+        """
+        while 1:
+            try:
+                message = connection.recv()
+            except (EOFError, OSError):
+                # The other process has stopped
+                return
+            self.deliver(*message)
+
+    def deliver(self, collective, source, tag, data):
+        """
+        Buffer a received message
+
+        :param collective: whether or not the message is part of a collective operation
+        :param source: the rank that sent the message
+        :param tag: the tag of the message
+        :param data: the content of the message
+        """
+        with self.condition:
+            if collective:
+                self.collectives.append((source, tag, data))
+            else:
+                self.messages.append((source, tag, data))
+            self.condition.notify_all()
+
+    def take(self, queue, source, tag, status=None):
+        """
+        Take the first buffered message that matches, waiting until there is one
+
+        :param queue: the buffered messages to search
+        :param source: the rank the message should come from, or MPI.ANY_SOURCE
+        :param tag: the tag the message should have, or MPI.ANY_TAG
+        :param status: Status object to fill in, or None
+        :returns: the content of the message
+        """
+        with self.condition:
+            while 1:
+                for index, (msg_source, msg_tag, data) in enumerate(queue):
+                    if ((source == MPI.ANY_SOURCE or source == msg_source) and
+                            (tag == MPI.ANY_TAG or tag == msg_tag)):
+                        del queue[index]
+                        if status is not None:
+                            status.source = msg_source
+                            status.tag = msg_tag
+                        return data
+                self.condition.wait()
+
+    def connect(self, dest):
+        """
+        Get the connection to another process, connecting to it if necessary
+
+        :param dest: the rank of the process
+        :returns: tuple -- the connection and the lock to send over it
+        """
+        with self.connect_lock:
+            if dest not in self.connections:
+                # The other process might still be starting up
+                deadline = time.time() + 60
+                while 1:
+                    try:
+                        connection = Client(self.address % dest, authkey=self.authkey)
+                        break
+                    except (OSError, EOFError):
+                        if time.time() > deadline:
+                            raise
+                        time.sleep(0.05)
+                self.connections[dest] = (connection, threading.Lock())
+            return self.connections[dest]
+
+    def post(self, dest, collective, tag, data):
+        """
+        Send a message to a process
+
+        :param dest: the rank of the process
+        :param collective: whether or not the message is part of a collective operation
+        :param tag: the tag of the message
+        :param data: the content of the message
+        """
+        if dest == self.rank:
+            # Still copy the data, as it would be when sent to another process
+            self.deliver(collective, self.rank, tag,
+                         pickle.loads(pickle.dumps(data, pickle.HIGHEST_PROTOCOL)))
+        else:
+            connection, lock = self.connect(dest)
+            with lock:
+                connection.send((collective, self.rank, tag, data))
+
+    # Don't follow coding style here, as we need to be compatible with the mpi4py interface
+    def Get_rank(self):
+        """
+        Return the rank of the current process
+
+        :returns: int -- rank of the current process
+        """
+        return self.rank
+
+    def Get_size(self):
+        """
+        Return the number of processes
+
+        :returns: int -- number of processes running
+        """
+        return self.size
+
+    def send(self, obj, dest, tag=0):
+        """
+        Send an object to a process
+
+        :param obj: the object to send
+        :param dest: the rank of the process
+        :param tag: the tag of the message
+        """
+        self.post(dest, False, tag, obj)
+
+    def isend(self, obj, dest, tag=0):
+        """
+        Send an object to a process, without waiting for completion
+
+        :param obj: the object to send
+        :param dest: the rank of the process
+        :param tag: the tag of the message
+        :returns: Request -- the request of the send
+        """
+        self.post(dest, False, tag, obj)
+        return Request()
+
+    def recv(self, buf=None, source=-1, tag=-1, status=None):
+        """
+        Receive an object, waiting until it is available
+
+        :param buf: unused, for compatibility
+        :param source: the rank the object should come from, or MPI.ANY_SOURCE
+        :param tag: the tag of the message, or MPI.ANY_TAG
+        :param status: Status object to fill in, or None
+        :returns: the received object
+        """
+        return self.take(self.messages, source, tag, status)
+
+    def bcast(self, obj=None, root=0):
+        """
+        Broadcast an object from the root to all processes
+
+        :param obj: the object to broadcast, only used at the root
+        :param root: the rank of the process that broadcasts
+        :returns: the broadcasted object
+        """
+        if self.rank == root:
+            for dest in range(self.size):
+                if dest != root:
+                    self.post(dest, True, BCAST_TAG, obj)
+            return obj
+        return self.take(self.collectives, root, BCAST_TAG)
+
+    def barrier(self):
+        """
+        Wait until all processes have reached the barrier
+        """
+        if self.rank == 0:
+            for _ in range(self.size - 1):
+                self.take(self.collectives, MPI.ANY_SOURCE, BARRIER_TAG)
+            for dest in range(1, self.size):
+                self.post(dest, True, BARRIER_TAG, None)
+        else:
+            self.post(0, True, BARRIER_TAG, None)
+            self.take(self.collectives, 0, BARRIER_TAG)
+
+class MPI(object):
+    """
+    Replacement of the MPI module of MPI4Py
+    """
+    ANY_SOURCE = -1
+    ANY_TAG = -1
+    Status = Status
+    Request = Request
+    # None if this process was not started by the launcher
+    COMM_WORLD = Communicator.fromEnvironment()
+
+def launch(script, processes, args=()):
+    """
+    Run a Python script in several processes that communicate through this backend, like 'mpirun -np <processes> python <script>'.
+    If one of the processes fails, all others are stopped.
+
+    :param script: path to the Python script to run
+    :param processes: the number of processes to run it in
+    :param args: the command line arguments for the script
+    :returns: int -- the exit code, which is the first nonzero exit code of the processes
+    """
+    authkey = binascii.hexlify(os.urandom(16)).decode()
+    directory = None
+    if sys.platform == "win32":
+        address = r"\\.\pipe\pypdevs-" + authkey[:16] + "-%i"
+    else:
+        directory = tempfile.mkdtemp(prefix="pypdevs-")
+        address = os.path.join(directory, "kernel%i")
+    procs = []
+    try:
+        for rank in range(processes):
+            env = dict(os.environ)
+            env[RANK_VARIABLE] = str(rank)
+            env[SIZE_VARIABLE] = str(processes)
+            env[ADDRESS_VARIABLE] = address
+            env[AUTHKEY_VARIABLE] = authkey
+            procs.append(subprocess.Popen([sys.executable, script] + list(args), env=env))
+        while 1:
+            codes = [proc.poll() for proc in procs]
+            failed = [code for code in codes if code]
+            if failed:
+                return failed[0]
+            elif None not in codes:
+                return 0
+            time.sleep(0.05)
+    finally:
+        for proc in procs:
+            if proc.poll() is None:
+                proc.terminate()
+                proc.wait()
+        if directory is not None:
+            shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Run a distributed PythonPDEVS simulation in several local processes, without MPI")
+    parser.add_argument("-n", "--np", dest="processes", type=int, required=True,
+                        help="number of processes (simulation kernels)")
+    parser.add_argument("script", help="the simulation script to run")
+    parser.add_argument("args", nargs=argparse.REMAINDER,
+                        help="arguments for the simulation script")
+    arguments = parser.parse_args()
+    sys.exit(launch(arguments.script, arguments.processes, arguments.args))
@@ -62,6 +62,30 @@ def local(sim):
         raise DEVSException("There are no Atomic DEVS models present in your provided model")
     return sim.server.size == 1
 
+# Simulator and continuations of a running forkSimulate call, inherited by its forked worker processes
+fork_state = None
+
+def runContinuation(index):
+    """
+    Run a continuation of a forked simulation, in its worker process (see *Simulator.forkSimulate*)
+
+    :param index: index of the continuation to run
+    :returns: dict -- the full name of every atomic model mapped to its final state
+    """
+    sim, continuations = fork_state
+    # The tracers of the previous runs still write to the files of the parent
+    sim.removeTracers()
+    finish = continuations[index](sim)
+    sim.fetch_all = True
+    try:
+        sim.simulate()
+    except SystemExit as e:
+        # Don't let the worker process exit, as its task would never finish
+        raise DEVSException("Continuation %i failed with exit code %s" % (index, e.code))
+    if finish is not None:
+        finish(sim)
+    return dict((model.getModelFullName(), model.state) for model in sim.model.component_set)
+
 def loadCheckpoint(name):
     """
     Load a previously created simulation from a saved checkpoint.
@@ -185,6 +209,9 @@ class Simulator(object):
         self.checkpoint_name = "(none)"
         self.gvt_interval = 1
         self.state_saving = 2
+        self.state_interval = 1
+        self.state_memory_budget = None
+        self.lookahead = None
         self.msg_copy = 0
         self.realtime = False
         self.realtime_port_references = {}
@@ -279,6 +306,7 @@ class Simulator(object):
             for p in self.model.OPorts:
                 p.routing_inline = []
                 p.routing_outline = []
+                p.routing_table = ()
         else:
             raise DEVSException("Unkown model being simulated")
 
@@ -525,6 +553,12 @@ class Simulator(object):
                 if directive[1] in self.termination_models:
                     raise DEVSException("Termination model was found as a relocation directive!")
 
+            if self.lookahead is not None:
+                if self.relocations:
+                    raise DEVSException("Relocations are not possible in conservative simulation!")
+                if self.termination_condition is not None or self.termination_time == float('inf'):
+                    raise DEVSException("Conservative simulation requires a termination time!")
+
             # self.locations is now untrusted, as it is possible for migration to happen!
             self.locations = defaultdict(list)
 
@@ -575,7 +609,10 @@ class Simulator(object):
                              kernels=len(loclist),
                              statesaver=self.state_saving,
                              memoization=self.memoization,
-                             msg_copy=self.msg_copy)
+                             msg_copy=self.msg_copy,
+                             state_interval=self.state_interval,
+                             state_memory_budget=self.state_memory_budget,
+                             lookahead=self.lookahead)
 
         # Set the verbosity on the controller only, otherwise each kernel
         # would open the file itself, causing problems. Furthermore, all
@@ -617,6 +654,41 @@ class Simulator(object):
 
         self.real_simulate()
 
+    def forkSimulate(self, continuations, processes=None):
+        """
+        Continue the simulation from its current state in several ways, in parallel. Every continuation runs in a
+        worker process forked from this process, thus starting from a copy of the complete simulation state, so the
+        shared part of the continuations is simulated only once (by the *simulate()* calls before).
+
+        Only possible in local simulation, after the simulation was started, and on platforms where processes can be forked.
+
+        :param continuations: list of functions that are called with the simulator in the worker process of their continuation,
+                              before it is simulated. These configure the continuation as before a *simulate()* call: modify the
+                              model (e.g. with *setModelState*, *setModelStateAttr* or *setModelAttribute*), set the termination
+                              time and register the tracers of the continuation (the tracers of previous runs are removed).
+                              A continuation can return a function, which is called with the simulator after the continuation
+                              was simulated (e.g. to close files, as the worker processes exit without cleaning up).
+        :param processes: the maximal number of worker processes (defaults to the number of CPUs)
+        :returns: list -- for every continuation, a dict of the full name of every atomic model to its final state
+        """
+        if not self.setup:
+            raise DEVSException("Simulation should be started before it can be forked")
+        if self.server.size > 1:
+            raise DEVSException("Forking is only possible in local simulation")
+        import multiprocessing
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise DEVSException("Forking is not supported on this platform")
+        global fork_state
+        fork_state = (self, continuations)
+        try:
+            pool = multiprocessing.get_context("fork").Pool(processes)
+            try:
+                return pool.map(runContinuation, range(len(continuations)), chunksize=1)
+            finally:
+                pool.terminate()
+        finally:
+            fork_state = None
+
     def removeTracers(self):
         """
         Remove all currently registered tracers.
@@ -14,7 +14,7 @@
 # limitations under the License.
 
 from pypdevs.tracers.tracerBase import BaseTracer
-from pypdevs.util import runTraceAtController
+from pypdevs.util import traceAtController
 import sys
 
 class TracerVerbose(BaseTracer):
@@ -89,10 +89,10 @@ class TracerVerbose(BaseTracer):
         # Don't show the age
         text += "\t\tNext scheduled internal transition at time %.6f\n" \
                 % (aDEVS.time_next[0])
-        runTraceAtController(self.server, 
+        traceAtController(self.server, 
                              self.uid, 
                              aDEVS, 
-                             [aDEVS.time_last, '"' + text + '"'])
+                             [aDEVS.time_last, text])
 
     def traceConfluent(self, aDEVS):
         """
@@ -116,10 +116,10 @@ class TracerVerbose(BaseTracer):
         # Don't show the age
         text += "\t\tNext scheduled internal transition at time %.6f\n" \
                 % (aDEVS.time_next[0])
-        runTraceAtController(self.server, 
+        traceAtController(self.server, 
                              self.uid, 
                              aDEVS, 
-                             [aDEVS.time_last, '"' + text + '"'])
+                             [aDEVS.time_last, text])
 
     def traceExternal(self, aDEVS):
         """
@@ -138,10 +138,10 @@ class TracerVerbose(BaseTracer):
         # Don't show the age
         text += "\t\tNext scheduled internal transition at time %.6f\n" \
                 % (aDEVS.time_next[0])
-        runTraceAtController(self.server, 
+        traceAtController(self.server, 
                              self.uid, 
                              aDEVS, 
-                             [aDEVS.time_last, '"' + text + '"'])
+                             [aDEVS.time_last, text])
 
     def traceInit(self, aDEVS, t):
         """
@@ -156,10 +156,10 @@ class TracerVerbose(BaseTracer):
         # Don't show the age
         text += "\t\tNext scheduled internal transition at time %.6f\n" \
                 % (aDEVS.time_next[0])
-        runTraceAtController(self.server, 
+        traceAtController(self.server, 
                              self.uid, 
                              aDEVS, 
-                             [t, '"' + text + '"'])
+                             [t, text])
 
     def traceUser(self, time, aDEVS, variable, value):
         text = "\n"
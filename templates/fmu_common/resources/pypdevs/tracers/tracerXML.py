@@ -14,7 +14,7 @@
 # limitations under the License.
 
 from pypdevs.tracers.tracerBase import BaseTracer
-from pypdevs.util import runTraceAtController, toStr
+from pypdevs.util import traceAtController
 import sys, re
 
 class TracerXML(BaseTracer):
@@ -96,15 +96,15 @@ class TracerXML(BaseTracer):
                 for j in aDEVS.my_output.get(aDEVS.OPorts[I], []):
                     port_info += "<message>" + str(j) + "</message>\n"
                 port_info += "</port>\n"
-        runTraceAtController(self.server, 
+        traceAtController(self.server, 
                              self.uid, 
                              aDEVS, 
-                             [toStr(aDEVS.getModelFullName()), 
+                             [aDEVS.getModelFullName(), 
                                 aDEVS.time_last, 
-                                "'IN'", 
-                                toStr(port_info), 
-                                toStr(TracerXML.toXML(aDEVS.state)),
-                                toStr(aDEVS.state)])
+                                "IN", 
+                                port_info, 
+                                TracerXML.toXML(aDEVS.state),
+                                str(aDEVS.state)])
 
     def traceExternal(self, aDEVS):
         """
@@ -118,15 +118,15 @@ class TracerXML(BaseTracer):
             for j in aDEVS.my_input.get(aDEVS.IPorts[I], []):
                 port_info += "<message>" + str(j) + "</message>\n"
             port_info += "</port>\n"
-        runTraceAtController(self.server, 
+        traceAtController(self.server, 
                              self.uid, 
                              aDEVS, 
-                             [toStr(aDEVS.getModelFullName()), 
+                             [aDEVS.getModelFullName(), 
                                 aDEVS.time_last, 
-                                "'EX'", 
-                                toStr(port_info), 
-                                toStr(TracerXML.toXML(aDEVS.state)),
-                                toStr(aDEVS.state)])
+                                "EX", 
+                                port_info, 
+                                TracerXML.toXML(aDEVS.state),
+                                str(aDEVS.state)])
 
     def traceConfluent(self, aDEVS):
         """
@@ -140,15 +140,15 @@ class TracerXML(BaseTracer):
             for j in aDEVS.my_input.get(aDEVS.IPorts[I], []):
                 port_info += "<message>" + str(j) + "</message>\n"
             port_info += "</port>\n"
-        runTraceAtController(self.server, 
+        traceAtController(self.server, 
                              self.uid, 
                              aDEVS, 
-                             [toStr(aDEVS.getModelFullName()), 
+                             [aDEVS.getModelFullName(), 
                                 aDEVS.time_last, 
-                                "'EX'", 
-                                toStr(port_info), 
-                                toStr(TracerXML.toXML(aDEVS.state)),
-                                toStr(aDEVS.state)])
+                                "EX", 
+                                port_info, 
+                                TracerXML.toXML(aDEVS.state),
+                                str(aDEVS.state)])
         port_info = ""
         for I in range(len(aDEVS.OPorts)):
             if aDEVS.OPorts[I] in aDEVS.my_output:
@@ -156,15 +156,15 @@ class TracerXML(BaseTracer):
                 for j in aDEVS.my_output.get(aDEVS.OPorts[I], []):
                     port_info += "<message>" + str(j) + "</message>\n"
                 port_info += "</port>\n"
-        runTraceAtController(self.server, 
+        traceAtController(self.server, 
                              self.uid, 
                              aDEVS, 
-                             [toStr(aDEVS.getModelFullName()), 
+                             [aDEVS.getModelFullName(), 
                                 aDEVS.time_last, 
-                                "'IN'", 
-                                toStr(port_info), 
-                                toStr(TracerXML.toXML(aDEVS.state)),
-                                toStr(aDEVS.state)])
+                                "IN", 
+                                port_info, 
+                                TracerXML.toXML(aDEVS.state),
+                                str(aDEVS.state)])
 
     def traceInit(self, aDEVS, t):
         """
@@ -173,15 +173,15 @@ class TracerXML(BaseTracer):
         :param aDEVS: the model that transitioned
         :param t: time at which it should be traced
         """
-        runTraceAtController(self.server, 
+        traceAtController(self.server, 
                              self.uid, 
                              aDEVS, 
-                             [toStr(aDEVS.getModelFullName()), 
+                             [aDEVS.getModelFullName(), 
                                 t, 
-                                "'EX'", 
-                                "''", 
-                                toStr(TracerXML.toXML(aDEVS.state)),
-                                toStr(aDEVS.state)])
+                                "EX", 
+                                "", 
+                                TracerXML.toXML(aDEVS.state),
+                                str(aDEVS.state)])
 
     @staticmethod
     def toXML(state):
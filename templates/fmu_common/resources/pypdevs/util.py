@@ -100,35 +100,39 @@ def runTraceAtController(server, uid, model, args):
     """
     Run a trace command on our version that is running at the constroller
 
+    Kept for custom tracers: string arguments are enclosed by quotes (see *toStr*), the built-in tracers use *traceAtController*.
+
     :param server: the server to ask the proxy from
     :param uid: the UID of the tracer (identical throughout the simulation)
     :param model: the model that transitions
     :param args: the arguments for the trace function
     """
-    to_run = easyCommand("self.tracers.getByID(%i).trace" % uid, 
-                         args).replace("\n", "\\n")
+    traceAtController(server, uid, model, 
+                      [arg[1:-1] if isinstance(arg, str) else arg for arg in args])
+
+def traceAtController(server, uid, model, args):
+    """
+    Trace at the controller: the trace function of the tracer is called with the arguments as soon as this is safe (see *delayedAction*)
+
+    :param server: the server to ask the proxy from
+    :param uid: the UID of the tracer (identical throughout the simulation)
+    :param model: the model that transitions
+    :param args: the arguments for the trace function, should not be altered afterwards (e.g. strings of the state instead of the state)
+    """
     if server.getName() == 0:
-        server.getProxy(0).delayedAction(model.time_last, model.model_id, to_run)
+        server.getProxy(0).delayedAction(model.time_last, model.model_id, (uid, args))
     else:
-        server.queueMessage(model.time_last, model.model_id, to_run)
+        server.queueMessage(model.time_last, model.model_id, (uid, args))
 
-def easyCommand(function, args):
-    """ 
-    Easy wrapper to create a string representation of function calls
+def actionOrder(action):
+    """
+    Sort key of the delayed actions (see *performActions*): on time first, then on the traced arguments, not on the model
 
-    :param function: the function should be called
-    :param args: list of all the arguments for the function
-    :returns: str -- string representation to be passed to *exec*
+    :param action: a delayed action, of the form [time, model_id, (uid, args)]
+    :returns: sort key of the action
     """
-    text = str(function) + "("
-    for i in range(len(args)):
-        if i != 0:
-            text += ", "
-        if isinstance(args[i], str):
-            args[i] = '"%s"' % args[i][1:-1].replace('"', "\\\"").replace("'", "\\'")
-        text += str(args[i])
-    text += ")"
-    return text
+    uid, args = action[2]
+    return (action[0], uid, [arg if isinstance(arg, str) else str(arg) for arg in args])
 
 class DEVSException(Exception):
     """
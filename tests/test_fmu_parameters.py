@@ -0,0 +1,127 @@
+"""
+2025-SIMULATION-DEVS-FMI3.0
+Copyright (C) 2025 Cosys-lab, University of Antwerp
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import importlib.util
+import math
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+# The exporter and the models are used from the root of the repository
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from acc_models import Sine
+from devs_fmu_exporter import export_fmu, get_model_parameters, PARAMETER_VALUE_REFERENCE_OFFSET
+from port_codecs import decode_events
+
+# Value reference of the 'ta' clock of the generated FMUs
+TA = 1001
+
+
+def load_model_class(resource_path):
+    """Load the Model class of an exported FMU, as the backend of the FMU does."""
+    sys.path.append(resource_path)
+    spec = importlib.util.spec_from_file_location("fmu_model", os.path.join(resource_path, "model.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.Model
+
+
+def get_value_reference(model_description_path, name):
+    """Return the value reference of a variable of an FMU, from its model description."""
+    for variable in ET.parse(model_description_path).getroot().find("ModelVariables"):
+        if variable.get("name") == name:
+            return int(variable.get("valueReference"))
+    raise KeyError(name)
+
+
+def run(fmu, steps, output):
+    """Run the FMU for a number of internal events, returns the events of the output at each of them."""
+    events = []
+    time = 0.0
+    for _ in range(steps):
+        fmu.fmi3EnterStepMode()
+        _, intervals, _ = fmu.fmi3GetIntervalDecimal([TA])
+        fmu.fmi3DoStep(time, intervals[0], True)
+        time += intervals[0]
+        fmu.fmi3EnterEventMode()
+        fmu.fmi3SetClock([TA], [True])
+        events.append(decode_events(fmu.fmi3GetBinary([output])[1][0]))
+        fmu.fmi3UpdateDiscreteStates()
+    return events
+
+
+class TestFMUParameters(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.cwd = os.getcwd()
+        os.chdir(ROOT_DIR)
+        cls.output_dir = tempfile.mkdtemp()
+        cls.model = Sine(name="sine", interval=0.1, amplitude=0.6, omega=0.2)
+        export_fmu(cls.model, output_dir=cls.output_dir, precompile=False)
+        cls.Model = load_model_class(os.path.join(cls.output_dir, "sine", "resources"))
+        cls.value = get_value_reference(os.path.join(cls.output_dir, "sine", "modelDescription.xml"), "value_data")
+
+    @classmethod
+    def tearDownClass(cls):
+        os.chdir(cls.cwd)
+        shutil.rmtree(cls.output_dir)
+
+    def setUp(self):
+        parameters = [name for name, _, _ in get_model_parameters(self.model)]
+        self.assertEqual(parameters, ["interval", "amplitude", "omega", "offset"])
+        self.amplitude = PARAMETER_VALUE_REFERENCE_OFFSET + parameters.index("amplitude")
+        self.fmu = self.Model("sine", "", os.path.join(self.output_dir, "sine", "resources"), False, False, True,
+                              False, [])
+
+    def initialize(self):
+        self.fmu.fmi3EnterInitializationMode(False, 0.0, 0.0, False, 0.0)
+        self.fmu.fmi3ExitInitializationMode()
+
+    def test_parameter(self):
+        self.assertEqual(self.fmu.fmi3GetFloat64([self.amplitude])[1], [0.6])
+        self.fmu.fmi3SetFloat64([self.amplitude], [2.0])
+        self.initialize()
+        # The wrapped model is re-created with the value of the parameter
+        self.assertEqual(self.fmu.DEVS_wrapper.model.amplitude, 2.0)
+        self.assertEqual(self.fmu.DEVS_wrapper.model.omega, 0.2)
+
+    def test_reset(self):
+        self.fmu.fmi3SetFloat64([self.amplitude], [2.0])
+        self.initialize()
+        first_run = run(self.fmu, 20, self.value)
+        self.assertAlmostEqual(first_run[10][0], 2.0 * math.sin(0.2 * 1.0))
+        self.fmu.fmi3Terminate()
+
+        # Reset to the start values, the parameter too
+        self.fmu.fmi3Reset()
+        self.assertEqual(self.fmu.fmi3GetFloat64([self.amplitude])[1], [0.6])
+        self.assertEqual(self.fmu.DEVS_wrapper.model.amplitude, 0.6)
+
+        # A re-run with the same parameter reproduces the first run
+        self.fmu.fmi3SetFloat64([self.amplitude], [2.0])
+        self.initialize()
+        self.assertEqual(run(self.fmu, 20, self.value), first_run)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+2025-SIMULATION-DEVS-FMI3.0
+Copyright (C) 2025 Cosys-lab, University of Antwerp
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import xml.etree.ElementTree as ET
+
+
+def parse_time(time_str):
+    """Parse the time of an event, 0.0 if it is not a number."""
+    try:
+        return float(time_str)
+    except ValueError:
+        return 0.0
+
+
+def iter_xml_events(filename, models=None):
+    """
+    Iterate over the <event> elements of an XML trace or log, without loading the whole file.
+    Every event is cleared after it has been yielded, so it should not be kept.
+
+    :param models: Set of model names to yield the events of, or None for all events. Other events are skipped
+                   while parsing.
+    """
+    context = ET.iterparse(filename, events=("start", "end"))
+    _, root = next(context)
+    for event, elem in context:
+        if event == "end" and elem.tag == "event":
+            if models is None or elem.findtext("model", "").strip() in models:
+                yield elem
+            # Drop the processed event (and its children) from the tree
+            root.clear()
+
+
+class EventExtractor:
+    """
+    Parser target (see xml.etree.ElementTree.XMLParser) extracting the compared fields of every <event> of a log into
+    a compact tuple while parsing, without building its elements: (model, time, kind, mode, ports), with ports a tuple
+    of (name, category, first message) per <port>. The extracted events are appended to events.
+    """
+
+    def __init__(self):
+        self.events = []
+        self.depth = 0
+        self.text = []
+        self.fields = {}
+        self.ports = []
+        self.port = None
+
+    def start(self, tag, attrib):
+        # <trace> is at depth 1, <event> at 2 and its fields at 3
+        self.depth += 1
+        self.text = []
+        if self.depth == 2 and tag == "event":
+            self.fields = {}
+            self.ports = []
+        elif self.depth == 3 and tag == "port":
+            self.port = (attrib.get("name", "").strip(), attrib.get("category", "").strip())
+            self.fields["message"] = None
+
+    def data(self, data):
+        self.text.append(data)
+
+    def end(self, tag):
+        self.depth -= 1
+        if self.depth == 1 and tag == "event":
+            fields = self.fields
+            time_str = (fields.get("time") or "0.0").strip()
+            self.events.append((fields.get("model", "").strip(),
+                                parse_time(time_str),
+                                fields.get("kind", "").strip(),
+                                fields.get("mode", "").strip(),
+                                tuple(self.ports)))
+        elif self.depth == 2:
+            if tag == "port":
+                self.ports.append(self.port + ((self.fields["message"] or "").strip(),))
+            else:
+                self.fields[tag] = "".join(self.text)
+        elif self.depth == 3 and tag in ("mode", "message") and self.fields.get(tag) is None:
+            # The first <mode> of the <state> and the first <message> of a <port>
+            self.fields[tag] = "".join(self.text)
+        self.text = []
+
+    def close(self):
+        pass
+
+
+def iter_extracted_events(filename, block_size=1 << 16):
+    """Iterate over the extracted events (see EventExtractor) of an XML log, reading it in blocks of block_size."""
+    target = EventExtractor()
+    parser = ET.XMLParser(target=target)
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            parser.feed(block)
+            yield from target.events
+            target.events = []
+    parser.close()
+    yield from target.events